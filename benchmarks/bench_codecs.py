@@ -0,0 +1,100 @@
+"""
+Size and encode/decode throughput of the storage codecs on headline days.
+
+Usage:
+    python benchmarks/bench_codecs.py [--data-dir DATA_DIR] [--days 7]
+        [--repeat 20]
+
+Each day's headlines are read from DATA_DIR/headlines/*.json (in any stored
+encoding) when given, otherwise synthetic days are generated. Sizes are
+reported relative to the legacy pretty-printed JSON (`indent=2`).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+WORDS = (
+    "stocks shares market nasdaq inflation rates fed earnings revenue guidance "
+    "apple microsoft tesla amazon rally slump record high low quarter outlook "
+    "investors analysts upgrade downgrade surge plunge beats misses forecast"
+).split()
+
+
+def _days(data_dir: str | None, n_days: int) -> list[list[dict]]:
+    from storage._codecs import decode
+
+    if data_dir:
+        paths = sorted(Path(data_dir, "headlines").glob("*.json"))[-n_days:]
+        days = [decode(p.read_bytes()) for p in paths if p.stat().st_size]
+        if days:
+            return days
+
+    rng = random.Random(0)
+    topics = ["AAPL", "MSFT", "TSLA", "stock market", "inflation", "interest rates"]
+    labels = ["Positive", "Negative", "Neutral"]
+    return [
+        [
+            {
+                "headline": " ".join(rng.choices(WORDS, k=rng.randint(6, 16))),
+                "link": f"https://news.example.com/{rng.getrandbits(64):x}",
+                "pub_date": "Wed, 08 Oct 2025 12:00:00 GMT",
+                "topic": rng.choice(topics),
+                "sentiment_label": rng.choice(labels),
+                "sentiment_score": rng.random(),
+            }
+            for _ in range(rng.randint(500, 1500))
+        ]
+        for _ in range(n_days)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from core.env import StorageCodec
+    from storage._codecs import decode, get_codec
+
+    days = _days(args.data_dir, args.days)
+    legacy = sum(len(json.dumps(day, indent=2).encode("utf-8")) for day in days)
+    print(f"{len(days)} days, {sum(map(len, days))} headlines, {legacy} B legacy")
+    print(f"{'codec':<6} {'bytes':>10} {'ratio':>7} {'enc MB/s':>10} {'dec MB/s':>10}")
+
+    for name in StorageCodec:
+        try:
+            codec = get_codec(name)
+        except ImportError as e:
+            print(f"{name:<6} skipped: {e}")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            blobs = [codec.encode(day) for day in days]
+        encode_s = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for blob in blobs:
+                decode(blob)
+        decode_s = (time.perf_counter() - start) / args.repeat
+
+        size = sum(map(len, blobs))
+        mb = legacy / 1e6
+        print(
+            f"{name:<6} {size:>10} {size / legacy:>7.3f} "
+            f"{mb / encode_s:>10.1f} {mb / decode_s:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
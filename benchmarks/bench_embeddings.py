@@ -0,0 +1,95 @@
+"""
+Top-k cosine search over stored headline embeddings: brute force over the
+memory-mapped day segments against the IVF index, at 1M vectors by default.
+
+Usage:
+    python benchmarks/bench_embeddings.py [--n 1000000] [--dim 768] [--nprobe 8 16 32]
+
+Vectors are synthetic: noisy copies of random topic centres, so that they
+cluster the way headline embeddings do. They are written as 100 day
+segments to a temporary directory, which is removed afterwards. Recall is the
+share of the exact top 10 that the index also returns.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+DAYS = 100
+
+
+def _fill(store, n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Append `n` clustered unit vectors; returns a few of them as queries."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(n // 1000, 1), dim)).astype(np.float32)
+    per_day = -(-n // DAYS)
+    queries = []
+    for day in range(DAYS):
+        start = day * per_day
+        count = min(per_day, n - start)
+        if count <= 0:
+            break
+        picks = rng.integers(0, len(centres), count)
+        vectors = centres[picks] + rng.normal(size=(count, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = np.arange(start, start + count, dtype=np.uint64)
+        store.append((date(2025, 1, 1) + timedelta(days=day)).isoformat(), ids, vectors)
+        queries.append(vectors[0])
+    return np.array(queries)
+
+
+def _timed(search, queries: np.ndarray) -> tuple[float, list[set[int]]]:
+    start = time.perf_counter()
+    results = [{m.id for m in search(q)} for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    args = parser.parse_args()
+
+    from storage import EmbeddingStore, IVFIndex
+
+    with tempfile.TemporaryDirectory() as root:
+        store = EmbeddingStore(root)
+        start = time.perf_counter()
+        queries = _fill(store, args.n, args.dim)[: args.queries]
+        size = sum(p.stat().st_size for p in Path(root).glob("*.f16")) / 2**20
+        print(
+            f"{len(store)} vectors x {args.dim} float16 in {len(store.dates())} days, "
+            f"{size:.0f} MiB, appended in {time.perf_counter() - start:.1f}s"
+        )
+
+        start = time.perf_counter()
+        index = IVFIndex.build(store)
+        print(
+            f"IVF index of {len(index.centroids)} lists built in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+        exact_ms, exact = _timed(lambda q: store.search(q, k=10), queries)
+        print(f"{'brute force (mmap)':<22} {exact_ms:>9.1f} ms/query  recall@10 1.000")
+        for nprobe in args.nprobe:
+            ms, found = _timed(
+                lambda q: index.search(q, k=10, nprobe=nprobe), queries  # noqa: B023
+            )
+            recall = np.mean([len(f & e) / len(e) for f, e in zip(found, exact)])
+            print(
+                f"{f'IVF nprobe={nprobe}':<22} {ms:>9.1f} ms/query  recall@10 {recall:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Memory per 1M headlines and load throughput: the plain `Headline(**item)`
+dataclass path against the slotted, interned `Headline` with bulk decoding.
+
+Usage:
+    python benchmarks/bench_headlines.py [--n 1000000]
+
+Headlines are synthetic and round-tripped through compact JSON, so every
+string is a fresh object exactly as when loading stored history.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+WORDS = (
+    "stocks shares market nasdaq inflation rates fed earnings revenue guidance "
+    "apple microsoft tesla amazon rally slump record high low quarter outlook "
+    "investors analysts upgrade downgrade surge plunge beats misses forecast"
+).split()
+
+
+@dataclass
+class PlainHeadline:
+    """The previous, unslotted `Headline`."""
+
+    headline: str
+    link: str
+    pub_date: str | None
+    topic: str
+    sentiment_label: str | None = None
+    sentiment_score: float | None = None
+
+
+def _payload(n: int) -> bytes:
+    rng = random.Random(0)
+    topics = ["AAPL", "MSFT", "TSLA", "stock market", "inflation", "interest rates"]
+    labels = ["Positive", "Negative", "Neutral"]
+    records = [
+        {
+            "headline": " ".join(rng.choices(WORDS, k=rng.randint(6, 16))),
+            "link": f"https://news.example.com/{i:x}",
+            "pub_date": "Wed, 08 Oct 2025 12:00:00 GMT",
+            "topic": rng.choice(topics),
+            "sentiment_label": rng.choice(labels),
+            "sentiment_score": rng.random(),
+        }
+        for i in range(n)
+    ]
+    return json.dumps(records, separators=(",", ":")).encode("utf-8")
+
+
+def _measure(name: str, load, payload: bytes, n: int) -> None:
+    gc.collect()
+    start = time.perf_counter()
+    load(payload)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    headlines = load(payload)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del headlines
+
+    per_million = retained / n * 1_000_000 / 2**20
+    print(f"{name:<30} {per_million:>10.0f} MiB/1M {n / seconds:>12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    from data_models import headlines_from_records
+    from storage._codecs import loads
+
+    payload = _payload(args.n)
+    print(f"{args.n} headlines, {len(payload) / 2**20:.0f} MiB of JSON")
+
+    _measure(
+        "json + PlainHeadline(**item)",
+        lambda data: [PlainHeadline(**item) for item in json.loads(data)],
+        payload,
+        args.n,
+    )
+    _measure(
+        "loads + headlines_from_records",
+        lambda data: headlines_from_records(loads(data)),
+        payload,
+        args.n,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare FinBERT load time and memory: `from_pretrained` vs the mmap artifact.
+
+Each variant runs in a fresh interpreter. RSS is split into anonymous memory
+(private to the process) and file-backed memory (page cache, shared between
+processes mapping the same artifact).
+
+Usage:
+    python benchmarks/bench_model_load.py --artifact-dir /opt/finbert
+    python benchmarks/bench_model_load.py --artifact-dir DIR --model PATH_OR_HUB_ID
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+
+def _rss_mib() -> dict[str, float]:
+    fields: dict[str, float] = {}
+    for line in Path("/proc/self/status").read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in {"VmRSS", "RssAnon", "RssFile"}:
+            fields[key] = int(value.split()[0]) / 1024
+    return fields
+
+
+def _child(variant: str, source: str) -> None:
+    import torch
+    from transformers import BertForSequenceClassification
+
+    from sentiment._artifacts import load_model_artifact
+
+    before = _rss_mib()
+    start = time.perf_counter()
+    if variant == "from_pretrained":
+        model = BertForSequenceClassification.from_pretrained(source).eval()
+    else:
+        model = load_model_artifact(source)
+    load_seconds = time.perf_counter() - start
+    after_load = _rss_mib()
+
+    # One forward pass touches every weight page
+    with torch.no_grad():
+        model(input_ids=torch.ones((1, 16), dtype=torch.long))
+    after_forward = _rss_mib()
+
+    print(
+        json.dumps(
+            {
+                "variant": variant,
+                "load_seconds": load_seconds,
+                "rss_load_mib": after_load["VmRSS"] - before["VmRSS"],
+                "anon_mib": after_forward["RssAnon"] - before["RssAnon"],
+                "file_mib": after_forward["RssFile"] - before["RssFile"],
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--artifact-dir", required=True)
+    parser.add_argument("--model", default="yiyanghkust/finbert-tone")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(
+        f"{'variant':<16} {'load s':>8} {'RSS MiB':>8} {'anon MiB':>9} {'file MiB':>9}"
+    )
+    for variant, source in [
+        ("from_pretrained", args.model),
+        ("mmap_artifact", args.artifact_dir),
+    ]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--artifact-dir", args.artifact_dir]
+            + ["--child", variant, source],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{r['variant']:<16} {r['load_seconds']:>8.2f} {r['rss_load_mib']:>8.0f} "
+            f"{r['anon_mib']:>9.0f} {r['file_mib']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Tokenization time per 1k headlines: per-text BertTokenizer (the old pipeline
+path), batch encoding with the fast tokenizer, and the token-id cache.
+
+Usage:
+    python benchmarks/bench_tokenizer.py [--tokenizer PATH_OR_HUB_ID]
+        [--data-dir DATA_DIR] [--n 10000] [--repeat-ratio 0.5]
+
+Headlines come from DATA_DIR/headlines/*.json when given, otherwise they are
+synthesised. `--repeat-ratio` controls how many headlines of the second
+("next hour") pass were already seen in the first.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+WORDS = (
+    "stocks shares market nasdaq inflation rates fed earnings revenue guidance "
+    "apple microsoft tesla amazon rally slump record high low quarter outlook "
+    "investors analysts upgrade downgrade surge plunge beats misses forecast"
+).split()
+
+
+def _headlines(data_dir: str | None, n: int) -> list[str]:
+    if data_dir:
+        texts = [
+            item["headline"]
+            for path in sorted(Path(data_dir, "headlines").glob("*.json"))
+            for item in json.loads(path.read_text() or "[]")
+        ]
+        if texts:
+            return (texts * (n // len(texts) + 1))[:n]
+    rng = random.Random(0)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(6, 16))) for _ in range(n)]
+
+
+def _per_1k(seconds: float, n: int) -> float:
+    return seconds / n * 1000 * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokenizer", default="yiyanghkust/finbert-tone")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--n", type=int, default=10_000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    from transformers import BertTokenizer, BertTokenizerFast
+
+    from sentiment._tokens import TokenCache, encode_texts
+
+    texts = _headlines(args.data_dir, args.n)
+    repeats = int(len(texts) * args.repeat_ratio)
+    next_hour = texts[:repeats] + [t + " update" for t in texts[repeats:]]
+
+    slow = BertTokenizer.from_pretrained(args.tokenizer)
+    fast = BertTokenizerFast.from_pretrained(args.tokenizer)
+
+    start = time.perf_counter()
+    for text in texts:
+        slow(text, truncation=True)
+    per_text = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encode_texts(fast, texts)
+    batched = time.perf_counter() - start
+
+    cache = TokenCache()
+    encode_texts(fast, texts, cache)
+    start = time.perf_counter()
+    encode_texts(fast, next_hour, cache)
+    cached = time.perf_counter() - start
+
+    print(f"{len(texts)} headlines, {args.repeat_ratio:.0%} repeated in 2nd pass")
+    print(
+        f"{type(slow).__name__} per text:      {_per_1k(per_text, len(texts)):8.1f} ms/1k"
+    )
+    print(f"fast tokenizer, batched:     {_per_1k(batched, len(texts)):8.1f} ms/1k")
+    print(f"fast + token cache (warm):   {_per_1k(cached, len(texts)):8.1f} ms/1k")
+    print(f"cache: {len(cache)} entries, {cache.tokens} tokens")
+
+
+if __name__ == "__main__":
+    main()
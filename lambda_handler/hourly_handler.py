@@ -1,7 +1,37 @@
-from automation import run_hourly_pipeline
+from automation import merge_shard_runs, run_hourly_pipeline
 
 def lambda_handler(event, context): # type: ignore
-    """AWS Lambda entry point for hourly updates"""
+    """
+    AWS Lambda entry point for hourly updates.
+
+    Event parameters (all optional):
+        shard / shards: run as worker `shard` of `shards`
+        merge: merge the partial outputs of a sharded run of `shards` workers
+        run_id: run the shard or merge belongs to (defaults to the UTC hour);
+            full runs default to the invocation's request id
+    """
+    event = event or {}
+    shards = int(event.get("shards", 1))
+    run_id = event.get("run_id")
+
+    if event.get("merge"):
+        print(f"Merging {shards} shards...")
+        merged = merge_shard_runs(shards, run_id=run_id)
+        return {"status": "ok" if merged else "incomplete"}
+
+    shard = event.get("shard")
+    if shard is None:
+        # Asynchronous retries of an invocation keep its request id
+        run_id = run_id or getattr(context, "aws_request_id", None)
     print("Running hourly pipeline...")
-    run_hourly_pipeline()
+    # Bound the run by the time Lambda has left, rather than a fixed budget
+    time_budget = None
+    if hasattr(context, "get_remaining_time_in_millis"):
+        time_budget = context.get_remaining_time_in_millis() / 1000
+    run_hourly_pipeline(
+        shard=None if shard is None else int(shard),
+        shards=shards,
+        run_id=run_id,
+        time_budget=time_budget,
+    )
     return {"status": "ok"}
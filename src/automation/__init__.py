@@ -2,8 +2,38 @@
 automation
 ----------
 High-level automation package that orchestrates hourly and daily workflows.
+
+Entry points are resolved lazily so that importing the package (e.g. from the
+Lambda handler) does not pull in the dependencies of every workflow.
 """
 
-from automation._hourly import run_hourly_pipeline
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from automation._backfill import run_backfill
+    from automation._hourly import run_hourly_pipeline
+    from automation._rebuild import rebuild_aggregates
+    from automation._sharding import merge_shard_runs
+
+_EXPORTS = {
+    "merge_shard_runs": "automation._sharding",
+    "rebuild_aggregates": "automation._rebuild",
+    "run_backfill": "automation._backfill",
+    "run_hourly_pipeline": "automation._hourly",
+}
+
+__all__ = [
+    "merge_shard_runs",
+    "rebuild_aggregates",
+    "run_backfill",
+    "run_hourly_pipeline",
+]
+
 
-__all__ = ["run_hourly_pipeline"]
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,140 @@
+"""
+automation.backfill
+-------------------
+Re-score every stored headline with the current model and rebuild the
+aggregates, e.g. after a model change.
+
+Stored days are sharded across a process pool. Each worker loads the model
+once in its initializer, scores a whole day in large batches and atomically
+replaces that day's headlines. The parent process owns every aggregate write
+and a checkpoint of completed days, so an interrupted backfill resumes where
+it stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any
+
+from core.env import get_env
+from data_models import Headline, RunningAggregate
+from storage import StorageInterface, get_storage, reset_compacted_aggregates
+
+from ._helpers import update_running_aggregate
+
+CHECKPOINT_ARTIFACT = "backfill/checkpoint.json"
+
+# Per-process state populated by `_init_worker`
+_worker_storage: StorageInterface | None = None
+
+
+def _init_worker(torch_threads: int) -> None:
+    """Load the storage backend and the model once per worker process."""
+    global _worker_storage  # pylint: disable=global-statement
+
+    import torch
+
+    from sentiment.analyzer import load_classifier
+
+    torch.set_num_threads(torch_threads)
+    load_classifier()
+
+    _worker_storage = get_storage(get_env().storage_mode)
+
+
+def _rescore_day(date: str, batch_size: int) -> tuple[str, RunningAggregate]:
+    """Re-score one stored day and write it back; returns the day's aggregate."""
+    from sentiment.analyzer import analyze_headlines
+
+    assert _worker_storage is not None
+    headlines: list[Headline] = list(_worker_storage.load_headlines(date))
+    for h in headlines:
+        h.sentiment_label = None
+        h.sentiment_score = None
+
+    if headlines:
+        headlines = analyze_headlines(headlines, batch_size=batch_size)
+    _worker_storage.replace_headlines(date, headlines)
+
+    aggregate = update_running_aggregate(RunningAggregate(date=date), headlines)
+    return date, aggregate
+
+
+def _load_checkpoint(storage: StorageInterface) -> set[str]:
+    raw = storage.load_artifact(CHECKPOINT_ARTIFACT)
+    if raw is None:
+        return set()
+    try:
+        return set(json.loads(raw)["completed"])
+    except (json.JSONDecodeError, KeyError):
+        return set()
+
+
+def _save_checkpoint(storage: StorageInterface, completed: set[str]) -> None:
+    checkpoint: dict[str, Any] = {
+        "completed": sorted(completed),
+        "updated": datetime.now(timezone.utc).isoformat(),
+    }
+    storage.save_artifact(
+        CHECKPOINT_ARTIFACT,
+        json.dumps(checkpoint, indent=2).encode("utf-8"),
+        content_type="application/json",
+    )
+
+
+def run_backfill(
+    workers: int | None = None, batch_size: int = 256, restart: bool = False
+) -> None:
+    """
+    Re-score all stored headlines and rebuild the daily and current aggregates.
+
+    Args:
+        workers (int | None): Worker processes, defaults to the CPU count.
+        batch_size (int): Forward-pass batch size inside each worker.
+        restart (bool): Ignore the checkpoint and re-score every day.
+    """
+    storage = get_storage(get_env().storage_mode)
+    workers = workers or os.cpu_count() or 1
+
+    completed = set() if restart else _load_checkpoint(storage)
+    pending = [d for d in storage.list_headline_dates() if d not in completed]
+    if not pending:
+        print(f"[{datetime.now(timezone.utc)}] Backfill: nothing to do.")
+        return
+
+    print(
+        f"[{datetime.now(timezone.utc)}] Backfill: {len(pending)} days "
+        f"({len(completed)} already done) on {workers} workers."
+    )
+    current_date = storage.load_current_aggregate().date
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(torch_threads,),
+    ) as pool:
+        futures = [pool.submit(_rescore_day, d, batch_size) for d in pending]
+        for future in as_completed(futures):
+            date, aggregate = future.result()
+            if date == current_date:
+                storage.save_current_aggregate(aggregate)
+            else:
+                storage.save_daily_aggregate(date=date, aggregate_score=aggregate)
+            reset_compacted_aggregates(storage, {date: aggregate})
+
+            completed.add(date)
+            _save_checkpoint(storage, completed)
+            print(
+                f"[{datetime.now(timezone.utc)}] Backfill: re-scored {date} "
+                f"({aggregate.count} headlines)."
+            )
+
+    # A finished backfill starts from scratch the next time it is run
+    _save_checkpoint(storage, set())
+    print(f"[{datetime.now(timezone.utc)}] Backfill complete.")
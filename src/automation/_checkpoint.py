@@ -0,0 +1,183 @@
+"""
+automation.checkpoint
+---------------------
+Resumable, idempotent hourly runs.
+
+As a run progresses it records a checkpoint artifact under its run id: the
+scraped batch once scraping is done, the scored batch once inference is done,
+and the name of each persist step as that step commits. A retry with the same
+run id resumes from the checkpoint. Lambda retries keep the request id, and
+shard workers share the UTC hour. Stages the checkpoint already covers are
+not run again. A retry does not re-scrape or re-score a batch it already has.
+It skips persist steps that have committed, so it does not append the
+headlines twice or fold them into the aggregate twice. A finished run keeps
+only its stage and steps, and retrying it is a no-op.
+
+The poll state is checkpointed together with each batch. A resumed run
+therefore advances the scheduler as if it had scraped the batch itself.
+
+Streaming runs overlap scraping, inference and headline writes, so their
+first checkpoint is the scored batch. A streaming run that fails mid-stream
+scrapes again on retry. The dedup index drops the headlines that were
+already written.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+from data_models import Headline, headlines_from_records, headlines_to_records
+from storage import StorageInterface
+
+if TYPE_CHECKING:
+    from scraping import PollScheduler, Shard
+    from storage._batch import StorageBatch
+
+RUN_ARTIFACT_PREFIX = "runs"
+
+
+class RunStage(IntEnum):
+    """How far a run got; stages only ever advance."""
+
+    STARTED = 0
+    SCRAPED = 1
+    SCORED = 2
+    DONE = 3
+
+
+def checkpoint_artifact(run_id: str, shard: Shard | None = None) -> str:
+    """Artifact holding the checkpoint of a run, or of one shard worker's."""
+    if shard is None:
+        return f"{RUN_ARTIFACT_PREFIX}/{run_id}/checkpoint.json"
+    return f"{RUN_ARTIFACT_PREFIX}/{run_id}/checkpoint-{shard.label}.json"
+
+
+@dataclass
+class RunCheckpoint:
+    """The progress of one run and the batch it is working on."""
+
+    run_id: str
+    artifact: str
+    started: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    stage: RunStage = RunStage.STARTED
+    headlines: list[Headline] = field(default_factory=list)
+    poll_state: str | None = None
+    committed: set[str] = field(default_factory=set)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def date(self) -> str:
+        """Day the run stores its headlines under, fixed when it first started."""
+        return self.started.date().isoformat()
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "run_id": self.run_id,
+                "started": self.started.isoformat(),
+                "stage": self.stage.name.lower(),
+                "headlines": headlines_to_records(self.headlines),
+                "poll_state": self.poll_state,
+                "committed": sorted(self.committed),
+                "updated": datetime.now(timezone.utc).isoformat(),
+            }
+        ).encode("utf-8")
+
+    @staticmethod
+    def load(
+        storage: StorageInterface, run_id: str, shard: Shard | None = None
+    ) -> RunCheckpoint:
+        """The checkpoint of a run, or a fresh one if it has not got any."""
+        artifact = checkpoint_artifact(run_id, shard)
+        raw = storage.load_artifact(artifact)
+        if raw:
+            try:
+                data: dict[str, Any] = json.loads(raw)
+                return RunCheckpoint(
+                    run_id=run_id,
+                    artifact=artifact,
+                    started=datetime.fromisoformat(data["started"]),
+                    stage=RunStage[data["stage"].upper()],
+                    headlines=headlines_from_records(data["headlines"]),
+                    poll_state=data.get("poll_state"),
+                    committed=set(data["committed"]),
+                )
+            except (ValueError, TypeError, KeyError):
+                pass
+        return RunCheckpoint(run_id=run_id, artifact=artifact)
+
+    def save(self, storage: StorageInterface) -> None:
+        with self._lock:
+            data = self.to_bytes()
+            storage.save_artifact(self.artifact, data, "application/json")
+
+    def advance(
+        self,
+        storage: StorageInterface,
+        stage: RunStage,
+        headlines: Sequence[Headline],
+        scheduler: PollScheduler,
+        committed: Iterable[str] = (),
+    ) -> None:
+        """
+        Record that the run reached `stage` with `headlines`.
+
+        Args:
+            storage (StorageInterface): Backend holding the checkpoint.
+            stage (RunStage): Stage just completed.
+            headlines (Sequence[Headline]): The batch as of that stage.
+            scheduler (PollScheduler): Poll state after scraping the batch.
+            committed (Iterable[str]): Persist steps already done along the way.
+        """
+        self.stage = stage
+        self.headlines = list(headlines)
+        self.poll_state = scheduler.to_bytes().decode("utf-8")
+        self.committed.update(committed)
+        self.save(storage)
+
+    def resume(self, scheduler: PollScheduler) -> None:
+        """Restore the poll state checkpointed with the batch."""
+        if self.poll_state is not None:
+            scheduler.restore(self.poll_state.encode("utf-8"))
+        print(
+            f"[{datetime.now(timezone.utc)}] Resuming run {self.run_id} after "
+            f"stage {self.stage.name.lower()} ({len(self.headlines)} headlines, "
+            f"{len(self.committed)} steps committed)."
+        )
+
+    def step(
+        self, storage: StorageInterface, name: str, fn: Callable[..., Any], *args: Any
+    ) -> None:
+        """Run the persist step `name`, then record it as committed."""
+        fn(*args)
+        with self._lock:
+            self.committed.add(name)
+        self.save(storage)
+
+    def write(
+        self,
+        batch: StorageBatch,
+        storage: StorageInterface,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        stage: int = 0,
+    ) -> None:
+        """Queue `fn(*args)` on `batch` as step `name`, unless it already committed."""
+        if name not in self.committed:
+            batch.write(self.step, storage, name, fn, *args, stage=stage)
+
+    def finish(self, storage: StorageInterface) -> None:
+        """Mark the run done, dropping the batch it no longer needs."""
+        self.stage = RunStage.DONE
+        self.headlines = []
+        self.poll_state = None
+        self.save(storage)
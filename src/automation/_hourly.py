@@ -9,33 +9,244 @@ This module defines the hourly pipeline that:
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import List
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List
 
-from core.env import ENV
-from data_models import Headline
-from scraping import scrape_headlines
-from sentiment.analyzer import analyze_headlines
-from storage import get_storage
+from core.env import EnvConfig, PipelineMode, get_env
+from dashboard import publish_snapshots
+from data_models import Headline, RunningAggregate
+from profiling import Profiler
+from storage import (
+    StorageInterface,
+    compact_aggregates,
+    get_storage,
+    record_aggregate_delta,
+)
 
+from ._checkpoint import RunCheckpoint, RunStage
 from ._helpers import update_running_aggregate
+from ._sharding import current_run_id, save_partial
+from ._streaming import stream_headlines
 
+if TYPE_CHECKING:
+    import numpy as np
 
-def run_hourly_pipeline() -> None:
+    from entities import EntityMatcher
+    from scraping import (
+        ArticleFetcher,
+        Deadline,
+        HedgedCaller,
+        PollScheduler,
+        ScrapeResult,
+        Shard,
+    )
+
+
+def run_hourly_pipeline(
+    shard: int | None = None,
+    shards: int = 1,
+    run_id: str | None = None,
+    time_budget: float | None = None,
+) -> None:
     """
     Runs every hour via cron or AWS EventBridge:
-    1. Scrapes new headlines from Yahoo + Google
-    2. Runs sentiment analysis
-    3. Updates running daily aggregates in storage
+    1. Scrapes new headlines from Yahoo + Google, tagging the tickers they
+       mention (`ENTITY_ATTRIBUTION`)
+    2. Runs sentiment analysis, and with `EMBEDDINGS` stores each headline's
+       embedding from the same forward pass
+    3. Optionally (`ARTICLE_ENRICHMENT`) fetches and scores the full articles
+    4. Updates running daily aggregates in storage
+
+    Progress is checkpointed under the run id (see `automation.checkpoint`),
+    so a retried run skips the scraping, inference and writes it already did.
+
+    With `shard`, runs as worker `shard` of `shards`: only the sources that
+    shard owns are scraped, and the scored headlines and partial aggregate
+    are written as a partial artifact for `merge_shard_runs` instead of
+    being persisted directly. Shard workers always use the staged pipeline.
 
     Args:
-        tickers (List[str]): List of ticker symbols to analyze.
+        shard (int | None): Index of this worker, or None for a full run.
+        shards (int): Number of workers the sources are split across.
+        run_id (str | None): Id under which the run's checkpoint and
+            aggregate delta are recorded; a retry with the same id resumes
+            at the first stage the failed attempt did not finish. Shard
+            workers default to the current UTC hour, full runs to a fresh id.
+        time_budget (float | None): Seconds the run may take, e.g. the Lambda
+            context's remaining time; defaults to `RUN_BUDGET_SECONDS`.
+            Scraping gets `SCRAPE_BUDGET_FRACTION` of it, and sources that
+            miss that deadline are skipped and reported.
     """
 
-    storage = get_storage(ENV.storage_mode)  # returns your S3 or local storage backend
-    today = datetime.now(timezone.utc).date().isoformat()
+    env = get_env()
+    storage = get_storage(env.storage_mode)  # returns your S3 or local storage backend
+    profiler = Profiler.from_env(env, storage)
+
+    with profiler.stage("pipeline"):
+        caller = _load_caller(env, storage, time_budget)
+        try:
+            if shard is not None:
+                from scraping import Shard
+
+                worker = Shard(shard, shards)
+                scheduler = _load_scheduler(env, storage, worker)
+                _run_stages(
+                    storage,
+                    profiler,
+                    scheduler,
+                    caller,
+                    run_id or current_run_id(),
+                    worker,
+                )
+                return
+
+            run_id = run_id or uuid.uuid4().hex
+            scheduler = _load_scheduler(env, storage)
+            if env.pipeline_mode == PipelineMode.STREAMING:
+                _run_streaming(env, storage, profiler, scheduler, caller, run_id)
+            else:
+                _run_stages(storage, profiler, scheduler, caller, run_id)
+        finally:
+            caller.save(storage)
+
+
+def _load_scheduler(
+    env: EnvConfig, storage: StorageInterface, shard: Shard | None = None
+) -> PollScheduler:
+    # Imported here: scraping pulls in bs4 and yahoo_fin
+    from scraping import PollScheduler, poll_state_artifact
+
+    return PollScheduler.load(
+        storage,
+        min_interval=timedelta(minutes=env.poll_min_minutes),
+        max_interval=timedelta(minutes=env.poll_max_minutes),
+        target_items=env.poll_target_items,
+        artifact=poll_state_artifact(shard),
+    )
+
+
+def _load_caller(
+    env: EnvConfig, storage: StorageInterface, time_budget: float | None
+) -> HedgedCaller:
+    """Deadline-bounded requests, leaving the rest of the budget for scoring."""
+    from scraping import Deadline, HedgedCaller
+
+    budget = env.run_budget_seconds if time_budget is None else time_budget
+    return HedgedCaller.load(
+        storage,
+        Deadline(budget * env.scrape_budget_fraction),
+        timeout=env.fetch_timeout_seconds,
+        hedge=env.hedge_requests,
+    )
+
+
+def _report_unfetched(result: ScrapeResult) -> None:
+    if result.skipped:
+        print(
+            f"[{datetime.now(timezone.utc)}] Skipped {len(result.skipped)} sources "
+            f"past the scrape deadline: {', '.join(sorted(result.skipped))}"
+        )
+    if result.failed:
+        print(
+            f"[{datetime.now(timezone.utc)}] {len(result.failed)} sources failed: "
+            f"{', '.join(sorted(result.failed))}"
+        )
+
+
+def _load_entity_matcher(env: EnvConfig, storage: StorageInterface) -> EntityMatcher:
+    """The matcher of the ticker universe plus `ENTITY_DICTIONARY_FILE`."""
+    from entities import load_entity_matcher
+    from scraping import load_ticker_universe, ticker_universe
+
+    dictionary = {symbol: list(names) for symbol, names in ticker_universe().items()}
+    if env.entity_dictionary_file:
+        extra = load_ticker_universe((), env.entity_dictionary_file)
+        for symbol, names in extra.items():
+            dictionary[symbol] = list(
+                dict.fromkeys([*dictionary.get(symbol, ()), *names])
+            )
+    return load_entity_matcher(storage, dictionary)
+
+
+def _analyze(
+    env: EnvConfig, headlines: List[Headline]
+) -> tuple[List[Headline], np.ndarray | None]:
+    """Score headlines, embedding them in the same pass when `EMBEDDINGS` is on."""
+    if env.embeddings:
+        from sentiment.analyzer import analyze_and_embed
+
+        return analyze_and_embed(headlines)
+
+    from sentiment.analyzer import analyze_headlines
+
+    return analyze_headlines(headlines), None
+
+
+def _save_embeddings(
+    today: str, headlines: List[Headline], embeddings: np.ndarray
+) -> None:
+    from storage import EmbeddingStore, headline_ids
+
+    store = EmbeddingStore(get_env().embedding_path)
+    store.append(today, headline_ids(headlines), embeddings)
+
+
+def _article_fetcher(storage: StorageInterface) -> tuple[ArticleFetcher, Deadline]:
+    """
+    The run's article fetcher and article budget.
+
+    Created once per run: streaming runs enrich batch by batch, and every
+    batch must share the per-domain rate limiters and the one deadline.
+    """
+    from scraping import ArticleFetcher, Deadline
+
+    env = get_env()
+    fetcher = ArticleFetcher(
+        storage,
+        workers=env.article_fetch_workers,
+        rate_per_domain=env.article_rate_per_domain,
+        timeout=env.fetch_timeout_seconds,
+    )
+    return fetcher, Deadline(env.article_budget_seconds)
+
+
+def _enrich_articles(
+    headlines: List[Headline], fetcher: ArticleFetcher, deadline: Deadline
+) -> List[Headline]:
+    """Score the full articles behind headlines, within the article budget."""
+    from sentiment.analyzer import analyze_articles
+
+    texts = fetcher.fetch_all([h.link for h in headlines], deadline)
+    return analyze_articles(headlines, texts)
 
-    all_headlines: List[Headline] = []
+
+def _run_stages(
+    storage: StorageInterface,
+    profiler: Profiler,
+    scheduler: PollScheduler,
+    caller: HedgedCaller,
+    run_id: str,
+    shard: Shard | None = None,
+) -> None:
+    """
+    Scrape, analyze and persist, profiling each stage when requested.
+
+    Stages the run's checkpoint already covers are skipped.
+    """
+    # Imported here: scraping and inference pull in bs4, yahoo_fin and torch
+    from scraping import scrape_due_headlines
+
+    checkpoint = RunCheckpoint.load(storage, run_id, shard)
+    if checkpoint.stage == RunStage.DONE:
+        print(f"[{datetime.now(timezone.utc)}] Run {run_id} is already complete.")
+        return
+    if checkpoint.stage > RunStage.STARTED:
+        checkpoint.resume(scheduler)
+
+    today = checkpoint.date
+    env = get_env()
+    all_headlines: List[Headline] = checkpoint.headlines
 
     # 1. Scrape both Yahoo and Google
     # for ticker in tickers:
@@ -43,30 +254,191 @@ def run_hourly_pipeline() -> None:
     #    google_news = _fetch_google_news_headlines(ticker)
     #    all_headlines.extend(yahoo_news + google_news)
 
-    all_headlines = scrape_headlines()
+    if checkpoint.stage < RunStage.SCRAPED:
+        with profiler.stage("scrape"):
+            result = scrape_due_headlines(scheduler, checkpoint.started, shard, caller)
+        _report_unfetched(result)
+        all_headlines = result.headlines
+
+        if all_headlines:
+            if env.entity_attribution:
+                with profiler.stage("entities"):
+                    _load_entity_matcher(env, storage).tag(all_headlines)
+            checkpoint.advance(storage, RunStage.SCRAPED, all_headlines, scheduler)
+
+    # 2. Analyze sentiment
+    if checkpoint.stage < RunStage.SCORED and all_headlines:
+        with profiler.stage("analyze"), profiler.torch("analyze"):
+            all_headlines, embeddings = _analyze(env, all_headlines)
+            if embeddings is not None:
+                _save_embeddings(today, all_headlines, embeddings)
+
+        if env.article_enrichment:
+            with profiler.stage("enrich"), profiler.torch("enrich"):
+                all_headlines = _enrich_articles(
+                    all_headlines, *_article_fetcher(storage)
+                )
+        checkpoint.advance(storage, RunStage.SCORED, all_headlines, scheduler)
+
+    if shard is not None:
+        with profiler.stage("persist"), storage.batch() as batch:
+            checkpoint.write(
+                batch,
+                storage,
+                "partial",
+                save_partial,
+                storage,
+                run_id,
+                shard.index,
+                shard.count,
+                today,
+                all_headlines,
+            )
+            checkpoint.write(
+                batch, storage, "poll_state", scheduler.save, storage, stage=1
+            )
+            batch.write(checkpoint.finish, storage, stage=2)
+
+        print(
+            f"[{datetime.now(timezone.utc)}] Shard {shard.index} of {shard.count} "
+            f"processed {len(all_headlines)} headlines."
+        )
+        return
 
     if not all_headlines:
+        scheduler.save(storage)
+        checkpoint.finish(storage)
         print(f"[{datetime.now(timezone.utc)}] No new headlines found.")
         return
 
-    # 2. Analyze sentiment
-    analyzed_headlines = analyze_headlines(all_headlines)
+    with profiler.stage("persist"):
+        # 3. Persist headlines, aggregates, poll state and snapshots
+        _persist_run(storage, scheduler, checkpoint, all_headlines)
 
-    # 3. Persist raw headlines
-    storage.append_headlines(today, analyzed_headlines)
+    print(f"[{datetime.now(timezone.utc)}] Processed {len(all_headlines)} headlines.")
 
-    # 4. Update and persist running aggregate
-    current_aggregate = storage.load_current_aggregate()
 
-    if current_aggregate.date != today:
-        storage.save_daily_aggregate(
-            date=current_aggregate.date, aggregate_score=current_aggregate
-        )
-        storage.clear_current_aggregate()
+def _run_streaming(
+    env: EnvConfig,
+    storage: StorageInterface,
+    profiler: Profiler,
+    scheduler: PollScheduler,
+    caller: HedgedCaller,
+    run_id: str,
+) -> None:
+    """Overlap scraping, inference and headline writes, then fold the aggregate."""
+    from scraping import ScrapeResult, scheduled_fetchers
+
+    checkpoint = RunCheckpoint.load(storage, run_id)
+    if checkpoint.stage == RunStage.DONE:
+        print(f"[{datetime.now(timezone.utc)}] Run {run_id} is already complete.")
+        return
+
+    today = checkpoint.date
+    if checkpoint.stage == RunStage.SCORED:
+        checkpoint.resume(scheduler)
+        analyzed_headlines = checkpoint.headlines
+    else:
+        matcher = _load_entity_matcher(env, storage) if env.entity_attribution else None
+        articles = _article_fetcher(storage) if env.article_enrichment else None
 
-    updated_aggregate = update_running_aggregate(current_aggregate, analyzed_headlines)
-    storage.save_current_aggregate(updated_aggregate)
+        def analyze(batch: List[Headline]) -> List[Headline]:
+            if matcher is not None:
+                matcher.tag(batch)
+            batch, embeddings = _analyze(env, batch)
+            if embeddings is not None:
+                _save_embeddings(today, batch, embeddings)
+            return batch if articles is None else _enrich_articles(batch, *articles)
+
+        stored: List[Headline] = []
+        unfetched = ScrapeResult(headlines=[])
+
+        def write(batch: List[Headline]) -> None:
+            stored.extend(storage.append_headlines(today, batch))
+
+        with profiler.stage("stream"), profiler.torch("stream"):
+            stream_headlines(
+                scheduled_fetchers(
+                    scheduler, checkpoint.started, caller=caller, report=unfetched
+                ),
+                analyze=analyze,
+                write=write,
+                batch_size=env.stream_batch_size,
+                flush_seconds=env.stream_flush_seconds,
+                queue_size=env.stream_queue_size,
+                fetch_workers=env.stream_fetch_workers,
+            )
+        _report_unfetched(unfetched)
+        analyzed_headlines = stored
+        if analyzed_headlines:
+            # Headlines were written while streaming; only the stored ones count
+            checkpoint.advance(
+                storage,
+                RunStage.SCORED,
+                analyzed_headlines,
+                scheduler,
+                committed=("headlines",),
+            )
+
+    if not analyzed_headlines:
+        scheduler.save(storage)
+        checkpoint.finish(storage)
+        print(f"[{datetime.now(timezone.utc)}] No new headlines found.")
+        return
+
+    with profiler.stage("persist"):
+        _persist_run(storage, scheduler, checkpoint, analyzed_headlines)
 
     print(
         f"[{datetime.now(timezone.utc)}] Processed {len(analyzed_headlines)} headlines."
     )
+
+
+def _persist_run(
+    storage: StorageInterface,
+    scheduler: PollScheduler,
+    checkpoint: RunCheckpoint,
+    analyzed_headlines: List[Headline],
+) -> None:
+    """
+    Commit the run's writes as one storage unit of work.
+
+    Every write is a step of the run's checkpoint, recorded once it succeeds;
+    a retried run only runs the steps that have not committed.
+
+    1. The raw headlines. The dedup index drops those already stored (by an
+       overlapping poll window, another topic or an earlier run), and the
+       checkpoint keeps the ones actually stored.
+    2. The aggregate delta of the stored headlines. The delta is written once
+       per run id, so a retried run never counts its headlines twice, and
+       overlapping runs never overwrite each other.
+    3. Compaction of the delta (skipped if another run is compacting) and the
+       poll state, which only advances once the polled headlines are stored.
+    4. The dashboard snapshots, built from everything above.
+    5. The checkpoint, marked done.
+    """
+    today = checkpoint.date
+
+    def append() -> None:
+        checkpoint.headlines = storage.append_headlines(today, analyzed_headlines)
+
+    def record_delta() -> None:
+        if checkpoint.headlines:
+            delta = update_running_aggregate(
+                RunningAggregate(date=today), checkpoint.headlines
+            )
+            record_aggregate_delta(storage, checkpoint.run_id, delta)
+
+    with storage.batch() as batch:
+        checkpoint.write(batch, storage, "headlines", append)
+        checkpoint.write(batch, storage, "aggregate_delta", record_delta, stage=1)
+
+        checkpoint.write(
+            batch, storage, "compaction", compact_aggregates, storage, stage=2
+        )
+        checkpoint.write(batch, storage, "poll_state", scheduler.save, storage, stage=2)
+
+        checkpoint.write(
+            batch, storage, "snapshots", publish_snapshots, storage, stage=3
+        )
+        batch.write(checkpoint.finish, storage, stage=4)
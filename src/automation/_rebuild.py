@@ -0,0 +1,151 @@
+"""
+automation.rebuild
+------------------
+Recompute the daily, per-topic, per-entity and current aggregates directly
+from the stored, already-scored headlines, without running the model.
+
+Each day is loaded as raw records, turned into NumPy columns and reduced
+with vectorised group-bys (`np.unique` + `np.bincount`). Days are processed
+in parallel worker processes; the parent performs the writes in one batch.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from core.env import get_env
+from data_models import RunningAggregate
+from storage import StorageInterface, get_storage, reset_compacted_aggregates
+
+# Per-process state populated by `_init_worker`
+_worker_storage: StorageInterface | None = None
+
+
+@dataclass
+class DayAggregates:
+    """Aggregates rebuilt for a single day."""
+
+    date: str
+    total: RunningAggregate
+    topics: dict[str, RunningAggregate]
+    entities: dict[str, RunningAggregate] = field(default_factory=dict)
+
+
+def _init_worker() -> None:
+    global _worker_storage  # pylint: disable=global-statement
+    _worker_storage = get_storage(get_env().storage_mode)
+
+
+def aggregate_records(date: str, records: Sequence[dict[str, Any]]) -> DayAggregates:
+    """
+    Reduce a day's scored headline records to total, per-topic and per-entity
+    aggregates.
+
+    Uses the same rules as `update_running_aggregate`: "Positive" adds the
+    score, "Negative" subtracts it, and every scored headline is counted. A
+    headline mentioning several entities counts once towards each of them.
+
+    Args:
+        date (str): Day the records belong to.
+        records (Sequence[dict[str, Any]]): Raw headline records.
+
+    Returns:
+        DayAggregates: Total, per-topic and per-entity aggregates for the day.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+
+    labels = np.array([r.get("sentiment_label") for r in records], dtype=object)
+    scores = np.array([r.get("sentiment_score") for r in records], dtype=np.float64)
+    topics = np.array([r.get("topic", "") for r in records], dtype=object)
+
+    entity_lists = [r.get("entities") or () for r in records]
+    # One row per (headline, entity) mention
+    owners = np.repeat(np.arange(len(records)), [len(e) for e in entity_lists])
+    entities = np.array([e for es in entity_lists for e in es], dtype=object)
+
+    scored = ~np.isnan(scores) & (labels != None)  # noqa: E711  # element-wise
+    sign = (labels == "Positive").astype(np.float64) - (labels == "Negative")
+    all_signed = sign * np.nan_to_num(scores)
+    signed = all_signed[scored]
+
+    def _aggregate(total: float, count: int) -> RunningAggregate:
+        return RunningAggregate(
+            date=date,
+            last_updated=now,
+            sum_sentiment=total,
+            count=count,
+            average=total / count if count else 0.0,
+        )
+
+    def _group_by(keys: np.ndarray, values: np.ndarray) -> dict[str, RunningAggregate]:
+        names, index = np.unique(keys.astype(str), return_inverse=True)
+        sums = np.bincount(index, weights=values, minlength=len(names))
+        counts = np.bincount(index, minlength=len(names))
+        return {
+            str(name): _aggregate(float(total), int(count))
+            for name, total, count in zip(names, sums, counts)
+        }
+
+    mentioned = scored[owners]
+    return DayAggregates(
+        date=date,
+        total=_aggregate(float(signed.sum()), int(scored.sum())),
+        topics=_group_by(topics[scored], signed),
+        entities=_group_by(entities[mentioned], all_signed[owners][mentioned]),
+    )
+
+
+def _rebuild_day(date: str) -> DayAggregates:
+    assert _worker_storage is not None
+    return aggregate_records(date, _worker_storage.load_headline_records(date))
+
+
+def rebuild_aggregates(
+    dates: Sequence[str] | None = None, workers: int | None = None
+) -> list[DayAggregates]:
+    """
+    Rebuild aggregates from stored headlines.
+
+    Today's (UTC) numbers become the current aggregate; every other day is
+    written to the daily history. Per-topic and per-entity aggregates are
+    written for all days.
+
+    Args:
+        dates (Sequence[str] | None): Days to rebuild, all stored days if None.
+        workers (int | None): Worker processes, defaults to the CPU count.
+
+    Returns:
+        list[DayAggregates]: The rebuilt aggregates, oldest day first.
+    """
+    storage = get_storage(get_env().storage_mode)
+    dates = list(dates) if dates else storage.list_headline_dates()
+    if not dates:
+        print(f"[{datetime.now(timezone.utc)}] Rebuild: no stored headlines.")
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(dates))
+    if workers == 1:
+        _init_worker()
+        rebuilt = [_rebuild_day(d) for d in dates]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            rebuilt = list(pool.map(_rebuild_day, dates, chunksize=8))
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    storage.save_daily_aggregates({d.date: d.total for d in rebuilt if d.date != today})
+    storage.save_topic_aggregates({d.date: d.topics for d in rebuilt})
+    storage.save_entity_aggregates({d.date: d.entities for d in rebuilt})
+    for day in rebuilt:
+        if day.date == today:
+            storage.save_current_aggregate(day.total)
+    reset_compacted_aggregates(storage, {d.date: d.total for d in rebuilt})
+
+    print(f"[{datetime.now(timezone.utc)}] Rebuilt aggregates for {len(rebuilt)} days.")
+    return rebuilt
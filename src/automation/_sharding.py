@@ -0,0 +1,219 @@
+"""
+automation.sharding
+-------------------
+Sharded hourly runs: N workers split the source universe, then one merge step
+folds their output into storage.
+
+Each worker (`run_hourly_pipeline(shard=i, shards=N)`) scrapes and scores only
+the sources it owns and writes a partial artifact holding its scored
+headlines and their partial `RunningAggregate`. Workers never touch the
+shared headline or aggregate objects, so they can run concurrently.
+
+`merge_shard_runs` waits for all N partials of a run, then appends the
+headlines, records the aggregate of the headlines actually stored (the dedup
+index drops ones already stored, e.g. by an earlier run or another shard) as
+the run's aggregate deltas, refreshes the dashboard snapshots and marks the
+run as merged, so invoking it again for the same run is a no-op.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from core.env import get_env
+from dashboard import publish_snapshots
+from data_models import (
+    Headline,
+    RunningAggregate,
+    headlines_from_records,
+    headlines_to_records,
+)
+from storage import (
+    StorageInterface,
+    compact_aggregates,
+    get_storage,
+    record_aggregate_delta,
+)
+
+from ._helpers import update_running_aggregate
+
+SHARD_ARTIFACT_PREFIX = "shards"
+
+
+def current_run_id(now: datetime | None = None) -> str:
+    """Default run id: the UTC hour, shared by every worker of a scheduled run."""
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H")
+
+
+def partial_artifact(run_id: str, shard: int, shards: int) -> str:
+    return f"{SHARD_ARTIFACT_PREFIX}/{run_id}/part-{shard:03d}-of-{shards:03d}.json"
+
+
+def _merged_marker(run_id: str, shards: int) -> str:
+    return f"{SHARD_ARTIFACT_PREFIX}/{run_id}/merged-{shards:03d}"
+
+
+def _stored_artifact(run_id: str, shards: int) -> str:
+    return f"{SHARD_ARTIFACT_PREFIX}/{run_id}/stored-{shards:03d}.json"
+
+
+@dataclass
+class PartialRun:
+    """The output of one shard worker."""
+
+    run_id: str
+    shard: int
+    shards: int
+    date: str
+    aggregate: RunningAggregate
+    headlines: list[Headline]
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "run_id": self.run_id,
+                "shard": self.shard,
+                "shards": self.shards,
+                "date": self.date,
+                "aggregate": asdict(self.aggregate),
+                "headlines": headlines_to_records(self.headlines),
+            }
+        ).encode("utf-8")
+
+    @staticmethod
+    def from_bytes(data: bytes) -> PartialRun:
+        raw = json.loads(data)
+        return PartialRun(
+            run_id=raw["run_id"],
+            shard=raw["shard"],
+            shards=raw["shards"],
+            date=raw["date"],
+            aggregate=RunningAggregate(**raw["aggregate"]),
+            headlines=headlines_from_records(raw["headlines"]),
+        )
+
+
+def save_partial(
+    storage: StorageInterface,
+    run_id: str,
+    shard: int,
+    shards: int,
+    today: str,
+    analyzed_headlines: Sequence[Headline],
+) -> PartialRun:
+    """
+    Write a worker's scored headlines and partial aggregate.
+
+    Headlines the dedup index already holds are left out, so the partial
+    aggregate only counts headlines that are new as of this run. Workers that
+    found nothing new still write an empty partial, so the merge step can
+    tell a quiet shard from one that has not finished.
+    """
+    analyzed_headlines = storage.new_headlines(today, analyzed_headlines)
+    partial = PartialRun(
+        run_id=run_id,
+        shard=shard,
+        shards=shards,
+        date=today,
+        aggregate=update_running_aggregate(
+            RunningAggregate(date=today), list(analyzed_headlines)
+        ),
+        headlines=list(analyzed_headlines),
+    )
+    storage.save_artifact(
+        partial_artifact(run_id, shard, shards), partial.to_bytes(), "application/json"
+    )
+    return partial
+
+
+def merge_shard_runs(shards: int, run_id: str | None = None) -> bool:
+    """
+    Merge the partial outputs of a sharded run into storage.
+
+    Args:
+        shards (int): Number of workers the run was split across.
+        run_id (str | None): Run to merge; defaults to the current UTC hour.
+
+    Returns:
+        bool: True once the run is merged, False if partials are missing.
+    """
+    storage = get_storage(get_env().storage_mode)
+    run_id = run_id or current_run_id()
+    marker = _merged_marker(run_id, shards)
+
+    if storage.load_artifact(marker) is not None:
+        print(f"[{datetime.now(timezone.utc)}] Run {run_id} is already merged.")
+        return True
+
+    partials: list[PartialRun] = []
+    missing: list[int] = []
+    for shard in range(shards):
+        raw = storage.load_artifact(partial_artifact(run_id, shard, shards))
+        if raw is None:
+            missing.append(shard)
+        else:
+            partials.append(PartialRun.from_bytes(raw))
+
+    if missing:
+        print(
+            f"[{datetime.now(timezone.utc)}] Run {run_id} is missing "
+            f"shards {missing} of {shards}; not merging yet."
+        )
+        return False
+
+    headlines_by_date: dict[str, list[Headline]] = defaultdict(list)
+    for partial in partials:
+        headlines_by_date[partial.date].extend(partial.headlines)
+
+    stored_artifact = _stored_artifact(run_id, shards)
+    stored: dict[str, list[Headline]] = {}
+
+    def append_all() -> None:
+        # A retry of a merge that already appended reuses what it stored: the
+        # dedup index would now drop every headline of the run
+        raw = storage.load_artifact(stored_artifact)
+        if raw is not None:
+            for date, records in json.loads(raw).items():
+                stored[date] = headlines_from_records(records)
+            return
+        # Sequential: every day's append updates the shared dedup index
+        for date, headlines in sorted(headlines_by_date.items()):
+            if headlines:
+                stored[date] = storage.append_headlines(date, headlines)
+        storage.save_artifact(
+            stored_artifact,
+            json.dumps(
+                {date: headlines_to_records(h) for date, h in stored.items()}
+            ).encode("utf-8"),
+            "application/json",
+        )
+
+    def record_deltas() -> None:
+        for date, headlines in stored.items():
+            if headlines:
+                delta = update_running_aggregate(RunningAggregate(date=date), headlines)
+                record_aggregate_delta(storage, run_id, delta)
+
+    with storage.batch() as batch:
+        batch.write(append_all)
+        batch.write(record_deltas, stage=1)
+
+        batch.write(compact_aggregates, storage, stage=2)
+        batch.write(publish_snapshots, storage, stage=3)
+        batch.write(
+            storage.save_artifact,
+            marker,
+            datetime.now(timezone.utc).isoformat().encode(),
+            stage=4,
+        )
+
+    total = sum(len(h) for h in stored.values())
+    print(
+        f"[{datetime.now(timezone.utc)}] Merged {shards} shards of run {run_id} "
+        f"({total} headlines)."
+    )
+    return True
@@ -0,0 +1,151 @@
+"""
+automation.streaming
+--------------------
+Streaming execution of the hourly pipeline.
+
+Instead of waiting for every feed before running inference, fetchers push
+headlines into a bounded queue as soon as their feed returns. A single
+inference worker micro-batches whatever has arrived (flushing on batch size
+or on a timeout) and hands scored batches to the writer, which persists them
+while the remaining feeds are still downloading. Bounded queues provide
+backpressure, so at most `queue_size` raw headlines and `queue_size` scored
+batches are in flight at any time.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from data_models import Headline
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[], list[Headline]]
+Analyzer = Callable[[list[Headline]], list[Headline]]
+Writer = Callable[[list[Headline]], None]
+
+
+class _Done:
+    """Sentinel marking the end of a queue."""
+
+
+_DONE = _Done()
+
+
+@dataclass
+class _Failed:
+    """Wraps an exception raised by a worker thread."""
+
+    error: BaseException
+
+
+def stream_headlines(
+    fetchers: list[Fetcher],
+    analyze: Analyzer,
+    write: Writer,
+    batch_size: int = 32,
+    flush_seconds: float = 2.0,
+    queue_size: int = 256,
+    fetch_workers: int = 4,
+) -> list[Headline]:
+    """
+    Fetch, score and persist headlines as a producer/consumer pipeline.
+
+    Args:
+        fetchers (list[Fetcher]): Zero-argument callables, one per feed.
+        analyze (Analyzer): Scores a micro-batch of headlines.
+        write (Writer): Persists a scored micro-batch.
+        batch_size (int): Flush a micro-batch once it holds this many headlines.
+        flush_seconds (float): Flush a non-empty micro-batch after this long.
+        queue_size (int): Capacity of the raw headline and scored batch queues.
+        fetch_workers (int): Number of feeds fetched concurrently.
+
+    Returns:
+        list[Headline]: Every scored headline, in the order it was written.
+    """
+    raw: queue.Queue[Headline | _Done] = queue.Queue(maxsize=queue_size)
+    scored: queue.Queue[list[Headline] | _Done | _Failed] = queue.Queue(
+        maxsize=queue_size
+    )
+    stop = threading.Event()
+
+    def put(q: queue.Queue, item: object) -> bool:  # type: ignore
+        # Block for backpressure, but give up once the pipeline is stopping
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch(fetcher: Fetcher) -> None:
+        try:
+            headlines = fetcher()
+        except Exception as e:  # one broken feed must not stall the stream
+            logger.error("Fetcher %r failed: %s", fetcher, e)
+            return
+        for h in headlines:
+            if not put(raw, h):
+                return
+
+    def produce() -> None:
+        with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+            list(pool.map(fetch, fetchers))
+        put(raw, _DONE)
+
+    def infer() -> None:
+        batch: list[Headline] = []
+        deadline = time.monotonic() + flush_seconds
+        try:
+            while not stop.is_set():
+                timeout = max(deadline - time.monotonic(), 0.0)
+                try:
+                    item = raw.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, Headline):
+                    batch.append(item)
+                finished = isinstance(item, _Done)
+                if batch and (
+                    finished or len(batch) >= batch_size or time.monotonic() >= deadline
+                ):
+                    if not put(scored, analyze(batch)):
+                        return
+                    batch = []
+                if not batch:
+                    deadline = time.monotonic() + flush_seconds
+                if finished:
+                    put(scored, _DONE)
+                    return
+        except BaseException as e:  # surface inference errors to the writer
+            put(scored, _Failed(e))
+
+    producer = threading.Thread(target=produce, name="stream-fetch", daemon=True)
+    inferrer = threading.Thread(target=infer, name="stream-infer", daemon=True)
+    producer.start()
+    inferrer.start()
+
+    written: list[Headline] = []
+    try:
+        while True:
+            item = scored.get()
+            if isinstance(item, _Done):
+                break
+            if isinstance(item, _Failed):
+                raise item.error
+            write(item)
+            written.extend(item)
+    finally:
+        stop.set()
+        producer.join()
+        inferrer.join()
+
+    return written
@@ -3,19 +3,47 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from enum import StrEnum, auto
+from functools import cache
 from pathlib import Path
 from typing import Optional
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
 
 class StorageMode(StrEnum):
     LOCAL = auto()
     S3 = auto()
 
 
+class StorageCodec(StrEnum):
+    JSON = auto()
+    GZIP = auto()
+    ZSTD = auto()
+
+
+class PipelineMode(StrEnum):
+    STAGED = auto()
+    STREAMING = auto()
+
+
+class ProfileMode(StrEnum):
+    OFF = auto()
+    CPROFILE = auto()
+    SAMPLING = auto()
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_list(name: str, default: str = "") -> tuple[str, ...]:
+    """Split a comma separated environment variable into a tuple of values."""
+    raw = os.getenv(name, default)
+    return tuple(part.strip() for part in raw.split(",") if part.strip())
+
+
 @dataclass(frozen=True)
 class EnvConfig:
     """Strongly-typed environment configuration for the app."""
@@ -24,10 +52,51 @@ class EnvConfig:
     aws_region: Optional[str]
     s3_bucket: Optional[str]
     local_data_path: str
+    storage_codec: StorageCodec = StorageCodec.GZIP
+    dedup_retention_days: int = 7
+    model_artifact_dir: Optional[str] = None
+    token_cache_max_tokens: int = 2_000_000
+    inference_server_url: Optional[str] = None
+    inference_server_timeout: float = 30.0
+    pipeline_mode: PipelineMode = PipelineMode.STAGED
+    poll_min_minutes: float = 60.0
+    poll_max_minutes: float = 720.0
+    poll_target_items: float = 5.0
+    yahoo_tickers: tuple[str, ...] = ()
+    yahoo_tickers_file: Optional[str] = None
+    yahoo_batch_size: int = 20
+    yahoo_fetch_workers: int = 4
+    yahoo_rate_per_second: float = 2.0
+    run_budget_seconds: float = 840.0
+    scrape_budget_fraction: float = 0.5
+    fetch_timeout_seconds: float = 10.0
+    hedge_requests: bool = True
+    entity_attribution: bool = True
+    entity_dictionary_file: Optional[str] = None
+    embeddings: bool = False
+    embedding_path: str = ""
+    article_enrichment: bool = False
+    article_fetch_workers: int = 8
+    article_rate_per_domain: float = 1.0
+    article_budget_seconds: float = 120.0
+    article_max_windows: int = 8
+    stream_batch_size: int = 32
+    stream_flush_seconds: float = 2.0
+    stream_queue_size: int = 256
+    stream_fetch_workers: int = 4
+    profile_mode: ProfileMode = ProfileMode.OFF
+    profile_stages: tuple[str, ...] = ("pipeline",)
+    profile_torch: bool = False
+    profile_tracemalloc: bool = False
+    profile_top_n: int = 25
 
     @staticmethod
     def load() -> EnvConfig:
         """Load environment variables and ensure paths exist."""
+        from dotenv import load_dotenv
+
+        load_dotenv()
+
         raw_mode = os.getenv("STORAGE_MODE", StorageMode.LOCAL.value).lower()
         storage_mode = StorageMode(raw_mode)
 
@@ -50,13 +119,70 @@ class EnvConfig:
         if storage_mode == StorageMode.S3 and not s3_bucket:
             raise EnvironmentError("S3_BUCKET is required when STORAGE_MODE=s3")
 
+        pipeline_mode = PipelineMode(
+            os.getenv("PIPELINE_MODE", PipelineMode.STAGED).lower()
+        )
+
+        # Opt-in profiling of the hourly job
+        profile_mode = ProfileMode(os.getenv("PROFILE_MODE", ProfileMode.OFF).lower())
+
         return EnvConfig(
             storage_mode=storage_mode,
             aws_region=aws_region,
             s3_bucket=s3_bucket,
             local_data_path=str(local_data_path),
+            storage_codec=StorageCodec(
+                os.getenv("STORAGE_CODEC", StorageCodec.GZIP).lower()
+            ),
+            dedup_retention_days=int(os.getenv("DEDUP_RETENTION_DAYS", "7")),
+            model_artifact_dir=os.getenv("MODEL_ARTIFACT_DIR") or None,
+            token_cache_max_tokens=int(os.getenv("TOKEN_CACHE_MAX_TOKENS", "2000000")),
+            inference_server_url=os.getenv("INFERENCE_SERVER_URL") or None,
+            inference_server_timeout=float(os.getenv("INFERENCE_SERVER_TIMEOUT", "30")),
+            pipeline_mode=pipeline_mode,
+            poll_min_minutes=float(os.getenv("POLL_MIN_MINUTES", "60")),
+            poll_max_minutes=float(os.getenv("POLL_MAX_MINUTES", "720")),
+            poll_target_items=float(os.getenv("POLL_TARGET_ITEMS", "5")),
+            yahoo_tickers=_env_list("YAHOO_TICKERS"),
+            yahoo_tickers_file=os.getenv("YAHOO_TICKERS_FILE") or None,
+            yahoo_batch_size=int(os.getenv("YAHOO_BATCH_SIZE", "20")),
+            yahoo_fetch_workers=int(os.getenv("YAHOO_FETCH_WORKERS", "4")),
+            yahoo_rate_per_second=float(os.getenv("YAHOO_RATE_PER_SECOND", "2")),
+            run_budget_seconds=float(os.getenv("RUN_BUDGET_SECONDS", "840")),
+            scrape_budget_fraction=float(os.getenv("SCRAPE_BUDGET_FRACTION", "0.5")),
+            fetch_timeout_seconds=float(os.getenv("FETCH_TIMEOUT_SECONDS", "10")),
+            hedge_requests=_env_flag("HEDGE_REQUESTS", True),
+            entity_attribution=_env_flag("ENTITY_ATTRIBUTION", True),
+            entity_dictionary_file=os.getenv("ENTITY_DICTIONARY_FILE") or None,
+            embeddings=_env_flag("EMBEDDINGS"),
+            embedding_path=os.getenv("EMBEDDING_PATH")
+            or str(local_data_path / "embeddings"),
+            article_enrichment=_env_flag("ARTICLE_ENRICHMENT"),
+            article_fetch_workers=int(os.getenv("ARTICLE_FETCH_WORKERS", "8")),
+            article_rate_per_domain=float(os.getenv("ARTICLE_RATE_PER_DOMAIN", "1")),
+            article_budget_seconds=float(os.getenv("ARTICLE_BUDGET_SECONDS", "120")),
+            article_max_windows=int(os.getenv("ARTICLE_MAX_WINDOWS", "8")),
+            stream_batch_size=int(os.getenv("STREAM_BATCH_SIZE", "32")),
+            stream_flush_seconds=float(os.getenv("STREAM_FLUSH_SECONDS", "2.0")),
+            stream_queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "256")),
+            stream_fetch_workers=int(os.getenv("STREAM_FETCH_WORKERS", "4")),
+            profile_mode=profile_mode,
+            profile_stages=_env_list("PROFILE_STAGES", "pipeline"),
+            profile_torch=_env_flag("PROFILE_TORCH"),
+            profile_tracemalloc=_env_flag("PROFILE_TRACEMALLOC"),
+            profile_top_n=int(os.getenv("PROFILE_TOP_N", "25")),
         )
 
 
-# Global singleton config
-ENV = EnvConfig.load()
+@cache
+def get_env() -> EnvConfig:
+    """Return the process-wide config, loading it on first access."""
+    return EnvConfig.load()
+
+
+def __getattr__(name: str) -> EnvConfig:
+    # `ENV` is kept as a lazily loaded alias of `get_env()` so that importing
+    # this module never touches `.env` files or the filesystem.
+    if name == "ENV":
+        return get_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
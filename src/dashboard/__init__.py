@@ -0,0 +1,9 @@
+"""
+dashboard
+---------
+Read side of the dashboard: precomputed snapshots and the HTTP query service.
+"""
+
+from ._snapshots import SNAPSHOTS, publish_snapshots
+
+__all__ = ["SNAPSHOTS", "publish_snapshots"]
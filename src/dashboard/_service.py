@@ -0,0 +1,172 @@
+"""
+dashboard.service
+-----------------
+Lightweight read API for dashboard clients.
+
+    GET /api/current     current running aggregate
+    GET /api/history     daily aggregate history
+    GET /api/headlines   most recent scored headlines
+
+Responses are served from the snapshots published by the hourly job and kept
+in an in-memory cache for `ttl` seconds, together with a gzip-compressed copy
+and a content-hash ETag. Clients revalidating with `If-None-Match` get a 304,
+so any number of dashboards costs at most one storage read per snapshot per
+TTL.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from storage import StorageInterface
+
+from ._snapshots import SNAPSHOTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedSnapshot:
+    """A snapshot body ready to be served."""
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    fetched_at: float
+
+
+class SnapshotCache:
+    """TTL cache of published snapshots."""
+
+    def __init__(self, storage: StorageInterface, ttl: float = 30.0) -> None:
+        self.storage = storage
+        self.ttl = ttl
+        self.reads = 0
+        self._entries: dict[str, CachedSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CachedSnapshot | None:
+        """Return the cached snapshot, re-reading it from storage once expired."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.ttl:
+                return entry
+
+            self.reads += 1
+            body = self.storage.load_artifact(SNAPSHOTS[name])
+            if body is None:
+                return entry  # keep serving the last good copy, if any
+
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            if entry is not None and entry.etag == etag:
+                gzip_body = entry.gzip_body
+            else:
+                gzip_body = gzip.compress(body, compresslevel=6)
+            entry = CachedSnapshot(body, gzip_body, etag, time.monotonic())
+            self._entries[name] = entry
+            return entry
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one snapshot cache."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], cache: SnapshotCache) -> None:
+        super().__init__(address, DashboardHandler)
+        self.cache = cache
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Serve snapshots with ETag revalidation and gzip."""
+
+    server: DashboardServer
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+            return
+
+        name = path.removeprefix("/api/")
+        if name not in SNAPSHOTS or not path.startswith("/api/"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        snapshot = self.server.cache.get(name)
+        if snapshot is None:
+            self._send_json(503, {"error": "snapshot not published yet"})
+            return
+
+        common: dict[str, Any] = {
+            "ETag": snapshot.etag,
+            "Cache-Control": f"public, max-age={int(self.server.cache.ttl)}",
+            "Vary": "Accept-Encoding",
+        }
+        if snapshot.etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            for header, value in common.items():
+                self.send_header(header, value)
+            self.end_headers()
+            return
+
+        body = snapshot.body
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = snapshot.gzip_body
+            common["Content-Encoding"] = "gzip"
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in common.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug(format, *args)
+
+
+def make_dashboard_server(
+    storage: StorageInterface,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    ttl: float = 30.0,
+) -> DashboardServer:
+    """Build (but do not start) the dashboard query service."""
+    return DashboardServer((host, port), SnapshotCache(storage, ttl=ttl))
+
+
+def serve_dashboard(
+    host: str = "127.0.0.1", port: int = 8080, ttl: float = 30.0
+) -> None:
+    """Serve the dashboard API from the configured storage until interrupted."""
+    from core.env import get_env
+    from storage import get_storage
+
+    server = make_dashboard_server(
+        get_storage(get_env().storage_mode), host=host, port=port, ttl=ttl
+    )
+    print(f"Serving dashboard API on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,72 @@
+"""
+dashboard.snapshots
+-------------------
+Precomputed, ready-to-serve JSON snapshots of the dashboard data.
+
+The hourly job publishes one artifact per endpoint after it has persisted
+its results, so the query service never has to parse headline files or
+aggregate history on a request.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any
+
+from storage import StorageInterface, load_live_aggregates
+
+# Endpoint name -> artifact holding its snapshot
+SNAPSHOTS = {
+    "current": "snapshots/current.json",
+    "history": "snapshots/history.json",
+    "headlines": "snapshots/headlines.json",
+}
+
+
+def _dump(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def publish_snapshots(
+    storage: StorageInterface, recent_days: int = 2, recent_limit: int = 200
+) -> None:
+    """
+    Build the dashboard snapshots from storage and publish them as artifacts.
+
+    Args:
+        storage (StorageInterface): Active storage backend.
+        recent_days (int): How many of the latest stored days feed `headlines`.
+        recent_limit (int): Maximum number of recent headlines published.
+    """
+    generated = datetime.now(timezone.utc).isoformat()
+
+    with storage.batch() as batch:
+        # The aggregates and the recent headline days are read concurrently
+        aggregates = batch.read(load_live_aggregates, storage)
+        dates = storage.list_headline_dates()[-recent_days:]
+        days = [batch.read(storage.load_headline_records, d) for d in dates]
+
+        current_aggregate, daily = aggregates.result()
+        current = asdict(current_aggregate)
+        history = {date: asdict(agg) for date, agg in daily.items()}
+
+        recent: list[dict[str, Any]] = []
+        for day in reversed(days):
+            recent.extend(reversed(day.result()))
+            if len(recent) >= recent_limit:
+                break
+
+        payloads = {
+            "current": {"generated": generated, "aggregate": current},
+            "history": {"generated": generated, "days": history},
+            "headlines": {"generated": generated, "headlines": recent[:recent_limit]},
+        }
+        for name, payload in payloads.items():
+            batch.write(
+                storage.save_artifact,
+                SNAPSHOTS[name],
+                _dump(payload),
+                "application/json",
+            )
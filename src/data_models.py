@@ -1,10 +1,24 @@
+import sys
+from collections.abc import Iterable
 from dataclasses import dataclass
+from typing import Any
 
 
-@dataclass
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
 class Headline:
     """
     Data class to represent headlines
+
+    Slotted, with `topic` and the labels interned: they take only a handful
+    of distinct values, so every headline shares one string object.
+
+    `article_label` / `article_score` hold the sentiment of the full article
+    body, pooled over its token windows, when article enrichment is enabled.
+    `entities` are the symbols the headline mentions, whatever its topic.
     """
 
     headline: str
@@ -13,6 +27,53 @@ class Headline:
     topic: str
     sentiment_label: str | None = None
     sentiment_score: float | None = None
+    article_label: str | None = None
+    article_score: float | None = None
+    entities: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        self.topic = sys.intern(self.topic)
+        self.sentiment_label = _intern(self.sentiment_label)
+        self.article_label = _intern(self.article_label)
+        if self.entities:
+            self.entities = tuple(map(sys.intern, self.entities))
+
+    def to_record(self) -> dict[str, Any]:
+        """Plain dict of the fields; a shallow, much cheaper `asdict`."""
+        return {
+            "headline": self.headline,
+            "link": self.link,
+            "pub_date": self.pub_date,
+            "topic": self.topic,
+            "sentiment_label": self.sentiment_label,
+            "sentiment_score": self.sentiment_score,
+            "article_label": self.article_label,
+            "article_score": self.article_score,
+            "entities": list(self.entities),
+        }
+
+
+def headlines_to_records(headlines: Iterable[Headline]) -> list[dict[str, Any]]:
+    """Convert headlines to JSON-ready records in bulk."""
+    return [h.to_record() for h in headlines]
+
+
+def headlines_from_records(records: Iterable[dict[str, Any]]) -> list[Headline]:
+    """Build headlines from stored records in bulk, ignoring unknown keys."""
+    return [
+        Headline(
+            r["headline"],
+            r["link"],
+            r.get("pub_date"),
+            r["topic"],
+            r.get("sentiment_label"),
+            r.get("sentiment_score"),
+            r.get("article_label"),
+            r.get("article_score"),
+            tuple(r.get("entities") or ()),
+        )
+        for r in records
+    ]
 
 
 @dataclass
@@ -24,3 +85,30 @@ class RunningAggregate:
     sum_sentiment: float = 0.0
     count: int = 0
     average: float = 0.0
+
+
+def merge_aggregates(
+    aggregates: Iterable[RunningAggregate], date: str = ""
+) -> RunningAggregate:
+    """
+    Combine partial aggregates of the same day into one.
+
+    `sum_sentiment` and `count` are additive, so partials computed on
+    disjoint sets of headlines merge exactly, in any order.
+
+    Args:
+        aggregates (Iterable[RunningAggregate]): Partial aggregates to combine.
+        date (str): Day of the result; defaults to the first partial's date.
+
+    Returns:
+        RunningAggregate: The combined aggregate.
+    """
+    merged = RunningAggregate(date=date)
+    for aggregate in aggregates:
+        merged.date = merged.date or aggregate.date
+        merged.sum_sentiment += aggregate.sum_sentiment
+        merged.count += aggregate.count
+        merged.last_updated = max(merged.last_updated, aggregate.last_updated)
+
+    merged.average = merged.sum_sentiment / merged.count if merged.count else 0.0
+    return merged
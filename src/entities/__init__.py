@@ -0,0 +1,23 @@
+"""
+entities
+--------
+Attribution of headlines to the tickers and companies they mention.
+"""
+
+from ._automaton import Automaton
+from ._matcher import (
+    EntityDictionary,
+    EntityMatcher,
+    dictionary_fingerprint,
+    load_entity_matcher,
+    matcher_artifact,
+)
+
+__all__ = [
+    "Automaton",
+    "EntityDictionary",
+    "EntityMatcher",
+    "dictionary_fingerprint",
+    "load_entity_matcher",
+    "matcher_artifact",
+]
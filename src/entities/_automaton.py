@@ -0,0 +1,113 @@
+"""
+entities.automaton
+------------------
+Aho-Corasick multi-pattern string matching.
+
+The automaton is a trie of the patterns with failure links: on a mismatch the
+scan falls back to the longest proper suffix of the current match that is
+also a trie prefix, so the text is read once, and matching costs time linear
+in the text plus the number of matches, however many patterns there are.
+
+Outputs are merged along the failure links when the automaton is built, so
+each state lists every pattern ending there. Building is the expensive part;
+`to_dict` / `from_dict` give a JSON form of the built automaton, so it can be
+built once and then only loaded.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+class Automaton:
+    """A built Aho-Corasick automaton over a fixed list of patterns."""
+
+    def __init__(
+        self,
+        patterns: list[str],
+        goto: list[dict[str, int]],
+        fail: list[int],
+        out: list[list[int]],
+    ) -> None:
+        self.patterns = patterns
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    @staticmethod
+    def build(patterns: Iterable[str]) -> Automaton:
+        """
+        Build the automaton of `patterns`.
+
+        Args:
+            patterns (Iterable[str]): Non-empty patterns; a pattern's index in
+                this sequence is the id `iter_matches` reports for it.
+
+        Returns:
+            Automaton: The automaton.
+        """
+        patterns = list(patterns)
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                raise ValueError("Patterns must not be empty")
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = goto[state][char] = len(goto)
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pattern_id)
+
+        # Breadth first, so a state's failure target is finished before it.
+        # Depth-one states fail to the root, which the zero default covers.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[nxt] = goto[target].get(char, 0)
+                out[nxt].extend(out[fail[nxt]])
+        return Automaton(patterns, goto, fail, out)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Every occurrence of every pattern in `text`, overlaps included.
+
+        Yields:
+            tuple[int, int]: `(end, pattern_id)`, with the occurrence spanning
+            `text[end - len(pattern) : end]`.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in out[state]:
+                yield end, pattern_id
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form of the built automaton."""
+        return {
+            "patterns": self.patterns,
+            "goto": self._goto,
+            "fail": self._fail,
+            "out": self._out,
+        }
+
+    @staticmethod
+    def from_dict(raw: dict[str, Any]) -> Automaton:
+        return Automaton(raw["patterns"], raw["goto"], raw["fail"], raw["out"])
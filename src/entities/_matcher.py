@@ -0,0 +1,208 @@
+"""
+entities.matcher
+----------------
+Attribution of headlines to the entities (tickers) they mention.
+
+`Headline.topic` is only the query that returned an item, so a "stock market"
+headline about Tesla would never count towards TSLA. The `EntityMatcher`
+scans each headline once with an Aho-Corasick automaton of every ticker,
+company name and alias in the dictionary, and tags the headline with the
+symbols it mentions.
+
+Matching mirrors the Yahoo feed attribution: symbols match case-sensitively
+(`TSLA`, and `$TSLA` in any case), names and aliases case-insensitively, and
+only as whole words. Single-letter symbols only match in `$X` form, as a bare
+capital letter is almost always just a word.
+
+Building the automaton is the expensive part, so a built matcher is stored as
+an artifact named after a fingerprint of its dictionary, and loaded once per
+process. A changed dictionary gets a new fingerprint and is built anew.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import sys
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING
+
+from data_models import Headline
+
+from ._automaton import Automaton
+
+if TYPE_CHECKING:
+    from storage import StorageInterface
+
+ENTITY_ARTIFACT_PREFIX = "entities"
+FORMAT_VERSION = 1
+
+EntityDictionary = Mapping[str, Sequence[str]]
+
+# Loaded on first use by `load_entity_matcher`
+_matcher: EntityMatcher | None = None
+_matcher_lock = threading.Lock()
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _fold(text: str) -> str:
+    """Lower-case `text` without changing its length, so offsets still apply."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # A few characters lower-case to several (e.g. "İ"); keep those as they are
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def dictionary_fingerprint(dictionary: EntityDictionary) -> str:
+    """Stable hash of a dictionary, naming the matcher artifact built from it."""
+    canonical = json.dumps(
+        [FORMAT_VERSION, sorted((k, sorted(v)) for k, v in dictionary.items())],
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def matcher_artifact(fingerprint: str) -> str:
+    return f"{ENTITY_ARTIFACT_PREFIX}/matcher-{fingerprint}.json.gz"
+
+
+class EntityMatcher:
+    """Find the dictionary entities mentioned in a text."""
+
+    def __init__(
+        self,
+        automaton: Automaton,
+        symbols: list[str],
+        exact: list[str | None],
+        fingerprint: str = "",
+    ) -> None:
+        self.automaton = automaton
+        # Per pattern id: the entity it names, and the exact spelling required
+        # for case-sensitive patterns (None for case-insensitive ones)
+        self.symbols = [sys.intern(symbol) for symbol in symbols]
+        self.exact = exact
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def from_dictionary(dictionary: EntityDictionary) -> EntityMatcher:
+        """
+        Build a matcher.
+
+        Args:
+            dictionary (EntityDictionary): Symbol -> company names and aliases,
+                e.g. `{"TSLA": ("Tesla",)}`.
+
+        Returns:
+            EntityMatcher: The matcher.
+        """
+        patterns: list[str] = []
+        symbols: list[str] = []
+        exact: list[str | None] = []
+
+        def add(pattern: str, symbol: str, case_sensitive: bool) -> None:
+            if pattern:
+                patterns.append(_fold(pattern))
+                symbols.append(symbol)
+                exact.append(pattern if case_sensitive else None)
+
+        for symbol, aliases in dictionary.items():
+            if len(symbol) > 1:
+                add(symbol, symbol, True)
+            add(f"${symbol}", symbol, False)
+            for alias in aliases:
+                add(alias.strip(), symbol, False)
+
+        return EntityMatcher(
+            Automaton.build(patterns),
+            symbols,
+            exact,
+            dictionary_fingerprint(dictionary),
+        )
+
+    def match(self, text: str) -> tuple[str, ...]:
+        """
+        The entities `text` mentions.
+
+        Returns:
+            tuple[str, ...]: Symbols, in order of first mention.
+        """
+        found: dict[str, None] = {}
+        patterns = self.automaton.patterns
+        for end, pattern_id in self.automaton.iter_matches(_fold(text)):
+            start = end - len(patterns[pattern_id])
+            if start > 0 and _is_word(text[start - 1]):
+                continue
+            if end < len(text) and _is_word(text[end]):
+                continue
+            exact = self.exact[pattern_id]
+            if exact is not None and text[start:end] != exact:
+                continue
+            found.setdefault(self.symbols[pattern_id])
+        return tuple(found)
+
+    def tag(self, headlines: Iterable[Headline]) -> None:
+        """Set the `entities` of each headline from its title."""
+        for h in headlines:
+            h.entities = self.match(h.headline)
+
+    def to_bytes(self) -> bytes:
+        return gzip.compress(
+            json.dumps(
+                {
+                    "version": FORMAT_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "symbols": self.symbols,
+                    "exact": self.exact,
+                    "automaton": self.automaton.to_dict(),
+                },
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+
+    @staticmethod
+    def from_bytes(data: bytes) -> EntityMatcher:
+        raw = json.loads(gzip.decompress(data))
+        if raw.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported matcher version {raw.get('version')}")
+        return EntityMatcher(
+            Automaton.from_dict(raw["automaton"]),
+            raw["symbols"],
+            raw["exact"],
+            raw["fingerprint"],
+        )
+
+
+def load_entity_matcher(
+    storage: StorageInterface, dictionary: EntityDictionary
+) -> EntityMatcher:
+    """
+    The matcher of `dictionary`, once per process.
+
+    Loads the prebuilt matcher artifact of the dictionary, or builds and
+    stores it if this dictionary has not been seen before.
+
+    Args:
+        storage (StorageInterface): Backend holding the matcher artifacts.
+        dictionary (EntityDictionary): Symbol -> company names and aliases.
+
+    Returns:
+        EntityMatcher: The matcher.
+    """
+    global _matcher  # pylint: disable=global-statement
+    fingerprint = dictionary_fingerprint(dictionary)
+    with _matcher_lock:
+        if _matcher is None or _matcher.fingerprint != fingerprint:
+            artifact = matcher_artifact(fingerprint)
+            raw = storage.load_artifact(artifact)
+            if raw is not None:
+                _matcher = EntityMatcher.from_bytes(raw)
+            else:
+                _matcher = EntityMatcher.from_dictionary(dictionary)
+                storage.save_artifact(artifact, _matcher.to_bytes(), "application/gzip")
+        return _matcher
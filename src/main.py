@@ -1,8 +1,110 @@
-from automation import run_hourly_pipeline
+import argparse
 
+from automation import (
+    merge_shard_runs,
+    rebuild_aggregates,
+    run_backfill,
+    run_hourly_pipeline,
+)
 
-def main():
-    run_hourly_pipeline()
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Financial news sentiment jobs")
+    commands = parser.add_subparsers(dest="command")
+
+    hourly = commands.add_parser("hourly", help="Scrape, score and aggregate (default)")
+    hourly.add_argument(
+        "--shard", type=int, default=None, help="Run as this worker of --shards"
+    )
+    hourly.add_argument("--shards", type=int, default=1)
+    hourly.add_argument("--run-id", default=None, help="Defaults to the UTC hour")
+
+    merge = commands.add_parser(
+        "merge", help="Merge the partial outputs of a sharded hourly run"
+    )
+    merge.add_argument("--shards", type=int, required=True)
+    merge.add_argument("--run-id", default=None, help="Defaults to the UTC hour")
+
+    backfill = commands.add_parser(
+        "backfill", help="Re-score all stored headlines and rebuild aggregates"
+    )
+    backfill.add_argument("--workers", type=int, default=None)
+    backfill.add_argument("--batch-size", type=int, default=256)
+    backfill.add_argument(
+        "--restart", action="store_true", help="Ignore the resume checkpoint"
+    )
+
+    rebuild = commands.add_parser(
+        "rebuild", help="Recompute aggregates from stored, scored headlines"
+    )
+    rebuild.add_argument("--workers", type=int, default=None)
+    rebuild.add_argument(
+        "--date", action="append", dest="dates", help="Day to rebuild (repeatable)"
+    )
+
+    index = commands.add_parser(
+        "index-embeddings", help="Rebuild the IVF index over stored embeddings"
+    )
+    index.add_argument("--nlist", type=int, default=None, help="Defaults to sqrt(n)")
+
+    package = commands.add_parser(
+        "package-model", help="Write FinBERT as a memory-mappable local artifact"
+    )
+    package.add_argument("output_dir", help="Target directory (MODEL_ARTIFACT_DIR)")
+
+    serve = commands.add_parser(
+        "serve-inference", help="Serve FinBERT to local pipelines over HTTP"
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--max-batch", type=int, default=64)
+    serve.add_argument("--max-wait-ms", type=float, default=10.0)
+
+    dashboard = commands.add_parser(
+        "serve-dashboard", help="Serve the dashboard read API over HTTP"
+    )
+    dashboard.add_argument("--host", default="127.0.0.1")
+    dashboard.add_argument("--port", type=int, default=8080)
+    dashboard.add_argument("--ttl", type=float, default=30.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        run_backfill(
+            workers=args.workers, batch_size=args.batch_size, restart=args.restart
+        )
+    elif args.command == "merge":
+        merge_shard_runs(args.shards, run_id=args.run_id)
+    elif args.command == "rebuild":
+        rebuild_aggregates(dates=args.dates, workers=args.workers)
+    elif args.command == "index-embeddings":
+        from core.env import get_env
+        from storage import EmbeddingStore, IVFIndex
+
+        ivf = IVFIndex.build(EmbeddingStore(get_env().embedding_path), nlist=args.nlist)
+        print(f"Indexed {len(ivf)} embeddings in {len(ivf.centroids)} lists")
+    elif args.command == "package-model":
+        from sentiment._artifacts import package_model
+        from sentiment.analyzer import MODEL_NAME
+
+        print(f"Packaged {MODEL_NAME} to {package_model(MODEL_NAME, args.output_dir)}")
+    elif args.command == "serve-inference":
+        from sentiment._server import serve_inference
+
+        serve_inference(
+            host=args.host,
+            port=args.port,
+            max_batch=args.max_batch,
+            max_wait=args.max_wait_ms / 1000,
+        )
+    elif args.command == "serve-dashboard":
+        from dashboard._service import serve_dashboard
+
+        serve_dashboard(host=args.host, port=args.port, ttl=args.ttl)
+    elif args.command == "hourly":
+        run_hourly_pipeline(shard=args.shard, shards=args.shards, run_id=args.run_id)
+    else:
+        run_hourly_pipeline()
 
 
 if __name__ == "__main__":
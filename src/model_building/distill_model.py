@@ -1,60 +1,173 @@
 """
 Distill FinBERT (teacher) into TinyFinBERT (student) using your cleaned dataset.
+
+The dataset is tokenized once, without padding, and cached on disk as an Arrow
+dataset keyed by a hash of the tokenizer and the data file, so later runs skip
+tokenization entirely. Batches are drawn from length-grouped buckets and padded
+dynamically to their own longest sequence, and training logs report
+non-padding tokens per second.
+
+Teacher outputs never change, so the teacher scores the dataset once, in large
+length-sorted no-grad batches, into a float16 `.npy` file next to the tokenized
+dataset. Training reads those logits through a memory map by row index, and
+the teacher is released before the first training step.
 """
 
+import gc
+import hashlib
+import logging
+import os
+import time
 from pathlib import Path
 from typing import Any, Optional, Union
 
+import numpy as np
 import torch
-from datasets import Dataset
+from datasets import Dataset, load_from_disk
 from torch import nn
 from transformers import (
     AutoModelForSequenceClassification,
     AutoTokenizer,
+    DataCollatorWithPadding,
+    PreTrainedTokenizerBase,
     Trainer,
     TrainingArguments,
 )
 
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+
 # Paths
-DATA_FILE = Path(__file__).parent / "training_data/cleaned_dataset.csv"
+DATA_FILE = Path(__file__).parent / "training_data/cleaned_dataset.arrow"
+CACHE_DIR = Path(__file__).parent / "training_data/cache"
 MODEL_OUTPUT_DIR = Path(__file__).parent.parent / "model"
 
-# Step 1: Load tokenizer and models
 teacher_model_name = "ProsusAI/finbert"
 student_model_name = "huawei-noah/TinyBERT_General_4L_312D"
 
-teacher = AutoModelForSequenceClassification.from_pretrained(teacher_model_name) # type: ignore
-student = AutoModelForSequenceClassification.from_pretrained(student_model_name, num_labels=3) # type: ignore
-tokenizer = AutoTokenizer.from_pretrained(teacher_model_name) # type: ignore
+MAX_LENGTH = 512
+LOGGING_STEPS = 50
+TEACHER_BATCH_SIZE = 256
+TOKENIZED_FORMAT = "unpadded-idx-length-v1"
+MODEL_COLUMNS = ["input_ids", "token_type_ids", "attention_mask", "labels"]
+
+
+# Step 1: Tokenize once, cached on disk
+def _cache_key(tokenizer: PreTrainedTokenizerBase, data_file: Path) -> str:
+    """Hash of everything that determines the tokenized dataset."""
+    digest = hashlib.sha256()
+    digest.update(tokenizer.backend_tokenizer.to_str().encode("utf-8"))
+    digest.update(f"{TOKENIZED_FORMAT}:{MAX_LENGTH}".encode("utf-8"))
+    with open(data_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
 
+def tokenized_cache_path(
+    tokenizer: PreTrainedTokenizerBase, data_file: Optional[Path] = None
+) -> Path:
+    """Cache directory of the tokenized dataset for this tokenizer and data."""
+    return CACHE_DIR / f"tokenized-{_cache_key(tokenizer, data_file or DATA_FILE)}"
 
-# 1. Load CSV into HF Dataset
-dataset = Dataset.from_csv(str(DATA_FILE)) # type: ignore
 
-# 2. Drop any rows with missing text or label
-dataset = dataset.filter(lambda x: x["text"] is not None and x["label"] is not None) # type: ignore
+def load_tokenized_dataset(
+    tokenizer: PreTrainedTokenizerBase,
+    cache_path: Path,
+    data_file: Optional[Path] = None,
+) -> Dataset:
+    """Load the tokenized dataset from the cache, tokenizing it on a miss."""
+    data_file = data_file or DATA_FILE
+    if cache_path.exists():
+        logging.info(f"Loading tokenized dataset from {cache_path}")
+        return load_from_disk(str(cache_path))  # type: ignore
 
-dataset = dataset.rename_column("label", "labels")
+    # Memory-map the Arrow file written by prepare_dataset.py
+    dataset = Dataset.from_file(str(data_file))
+    dataset = dataset.filter(  # type: ignore
+        lambda x: x["text"] is not None and x["label"] is not None
+    )
+    dataset = dataset.rename_column("label", "labels")
 
-# 3. Split into train / validation / test (80 / 10 / 10)
-train_testvalid = dataset.train_test_split(test_size=0.2, seed=42) # type: ignore
-test_valid = train_testvalid["test"].train_test_split(test_size=0.5, seed=42) # type: ignore
+    def tokenize_fn(batch, indices):  # type: ignore
+        # No padding here: batches are padded dynamically by the collator
+        encoded = tokenizer(  # type: ignore
+            batch["text"], truncation=True, max_length=MAX_LENGTH
+        )
+        encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+        encoded["idx"] = indices  # row in the teacher-logit cache
+        return encoded
 
-train_dataset = train_testvalid["train"] # type: ignore
-validation_dataset = test_valid["train"] # type: ignore
-test_dataset = test_valid["test"] # type: ignore
+    tokenized = dataset.map(
+        tokenize_fn,
+        batched=True,
+        with_indices=True,
+        batch_size=1000,
+        remove_columns=[c for c in dataset.column_names if c != "labels"],
+    )
+    tokenized.save_to_disk(str(cache_path))
+    logging.info(f"Cached tokenized dataset at {cache_path}")
+    return tokenized
 
 
+# Step 2: Score the dataset with the teacher once, cached on disk
+def precompute_teacher_logits(
+    teacher: nn.Module,
+    tokenizer: PreTrainedTokenizerBase,
+    dataset: Dataset,
+    cache_path: Path,
+) -> np.ndarray:
+    """
+    Teacher logits for every row of `dataset`, memory-mapped from the cache.
+
+    Rows are scored in length-sorted batches of `TEACHER_BATCH_SIZE` so each
+    batch pads only to its own longest row; intra-op parallelism follows
+    `torch.get_num_threads()`.
+
+    Returns:
+        np.ndarray: Read-only float16 memmap of shape (rows, num_labels),
+        indexed by the dataset's `idx` column.
+    """
+    config_hash = hashlib.sha256(teacher.config.to_json_string().encode("utf-8"))
+    logits_file = cache_path / f"teacher_logits-{config_hash.hexdigest()[:16]}.npy"
+    if logits_file.exists():
+        logging.info(f"Loading teacher logits from {logits_file}")
+        return np.load(logits_file, mmap_mode="r")
 
-def tokenize_fn(batch): # type: ignore
-    return tokenizer(batch["text"], padding="max_length", truncation=True) # type: ignore
+    tmp_file = logits_file.with_suffix(".tmp")
+    logits = np.lib.format.open_memmap(
+        tmp_file,
+        mode="w+",
+        dtype=np.float16,
+        shape=(len(dataset), teacher.config.num_labels),
+    )
+    columns = [c for c in MODEL_COLUMNS if c != "labels" and c in dataset.column_names]
+    order = np.argsort(dataset["length"], kind="stable")
+    started = time.perf_counter()
 
+    with torch.inference_mode():
+        for start in range(0, len(order), TEACHER_BATCH_SIZE):
+            batch = dataset[order[start : start + TEACHER_BATCH_SIZE]]
+            inputs = tokenizer.pad(
+                {c: batch[c] for c in columns},
+                pad_to_multiple_of=8,
+                return_tensors="pt",
+            )
+            logits[batch["idx"]] = teacher(**inputs).logits.float().numpy()
 
-tokenized_train_dataset = train_dataset.map(tokenize_fn, batched=True) # type: ignore
-tokenized_validation_dataset = validation_dataset.map(tokenize_fn, batched=True) # type: ignore
-tokenized_test_dataset = test_dataset.map(tokenize_fn, batched=True) # type: ignore
+    logits.flush()
+    del logits
+    os.replace(tmp_file, logits_file)
+    logging.info(
+        f"Scored {len(dataset):,} rows with the teacher in "
+        f"{time.perf_counter() - started:.1f}s, cached at {logits_file}"
+    )
+    return np.load(logits_file, mmap_mode="r")
 
-# Step 4: Define distillation loss
+
+# Step 3: Define distillation loss
 def distillation_loss(
     teacher_logits, student_logits, temperature: float = 2.0, alpha: float = 0.5
 ):
@@ -70,22 +183,19 @@ def distillation_loss(
     return soft_loss * alpha
 
 
-# Step 5: Training loop using Hugging Face Trainer
-training_args = TrainingArguments(
-    output_dir=str(MODEL_OUTPUT_DIR),
-    num_train_epochs=3,
-    per_device_train_batch_size=16,
-    save_strategy="epoch",
-    logging_dir="./logs",
-    logging_steps=50,
-    learning_rate=5e-5,
-    eval_strategy="no",
-    remove_unused_columns=False,
-)
-
-
 # Custom Trainer to include distillation
 class DistillationTrainer(Trainer):
+    def __init__(self, *args: Any, teacher_logits: np.ndarray, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.teacher_logits = teacher_logits
+        self.num_tokens = 0
+        self.train_start = time.perf_counter()
+
+    def train(self, *args: Any, **kwargs: Any) -> Any:
+        self.num_tokens = 0
+        self.train_start = time.perf_counter()
+        return super().train(*args, **kwargs)
+
     def compute_loss(
         self,
         model: nn.Module,
@@ -93,26 +203,83 @@ class DistillationTrainer(Trainer):
         return_outputs: bool = False,
         num_items_in_batch: Optional[torch.Tensor] = None,
     ):
-        #labels = inputs.pop("labels")
+        rows = inputs["idx"].cpu().numpy()
+        inputs = {k: v for k, v in inputs.items() if k in MODEL_COLUMNS}
+        if model.training:
+            self.num_tokens += int(inputs["attention_mask"].sum())
+
         outputs_student = model(**inputs)
-        with torch.no_grad():
-            outputs_teacher = teacher(**inputs)
         student_logits = outputs_student.logits
-        teacher_logits = outputs_teacher.logits
+        teacher_logits = torch.from_numpy(
+            self.teacher_logits[rows].astype(np.float32)
+        ).to(student_logits.device)
 
         loss = distillation_loss(teacher_logits, student_logits)
         return (loss, outputs_student) if return_outputs else loss
 
+    def log(self, logs: dict[str, float], start_time: Optional[float] = None) -> None:
+        elapsed = time.perf_counter() - self.train_start
+        if self.num_tokens and elapsed > 0:
+            logs["tokens_per_second"] = round(self.num_tokens / elapsed, 1)
+        super().log(logs, start_time)
 
-trainer = DistillationTrainer(
-    model=student,  # type: ignore
-    args=training_args,
-    train_dataset=tokenized_train_dataset,
-    eval_dataset=tokenized_validation_dataset,
-)
 
-trainer.train()
+def main() -> None:
+    tokenizer = AutoTokenizer.from_pretrained(teacher_model_name)  # type: ignore
+    teacher = AutoModelForSequenceClassification.from_pretrained(  # type: ignore
+        teacher_model_name
+    ).eval()
+    student = AutoModelForSequenceClassification.from_pretrained(  # type: ignore
+        student_model_name, num_labels=3
+    )
+
+    cache_path = tokenized_cache_path(tokenizer)
+    dataset = load_tokenized_dataset(tokenizer, cache_path)
+    teacher_logits = precompute_teacher_logits(teacher, tokenizer, dataset, cache_path)
+
+    # The teacher is no longer needed: free its memory before training
+    del teacher
+    gc.collect()
+
+    # Split into train / validation / test (80 / 10 / 10)
+    train_testvalid = dataset.train_test_split(test_size=0.2, seed=42)  # type: ignore
+    test_valid = train_testvalid["test"].train_test_split(  # type: ignore
+        test_size=0.5, seed=42
+    )
+
+    train_dataset = train_testvalid["train"]  # type: ignore
+    validation_dataset = test_valid["train"]  # type: ignore
+
+    # Step 4: Training loop using Hugging Face Trainer
+    training_args = TrainingArguments(
+        output_dir=str(MODEL_OUTPUT_DIR),
+        num_train_epochs=3,
+        per_device_train_batch_size=16,
+        save_strategy="epoch",
+        logging_dir="./logs",
+        logging_steps=LOGGING_STEPS,
+        learning_rate=5e-5,
+        eval_strategy="no",
+        remove_unused_columns=False,
+        group_by_length=True,
+        length_column_name="length",
+    )
+
+    trainer = DistillationTrainer(
+        model=student,  # type: ignore
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=validation_dataset,
+        data_collator=DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8),
+        teacher_logits=teacher_logits,
+    )
+
+    trainer.train()
+
+    # Step 5: Save distilled model
+    trainer.save_model(str(MODEL_OUTPUT_DIR))
+    tokenizer.save_pretrained(str(MODEL_OUTPUT_DIR))  # type: ignore
+
 
-# Step 6: Save distilled model
-trainer.save_model(str(MODEL_OUTPUT_DIR))
-tokenizer.save_pretrained(str(MODEL_OUTPUT_DIR))  # type: ignore
+if __name__ == "__main__":
+    main()
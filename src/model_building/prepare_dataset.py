@@ -8,16 +8,27 @@ clean dataset ready for model training. It supports:
     2. FiQA 2018
     3. Forex News Dataset
 
+Source files are parsed in parallel worker processes, and text cleaning and
+label mapping are vectorised pandas string operations. The PhraseBank
+agreement levels overlap heavily (`Sentences_50Agree` contains `66Agree`,
+which contains `75Agree`, ...), so rows are deduplicated by a hash of their
+normalized text, keeping the label with the highest annotator agreement.
+
 Outputs:
-    - A cleaned CSV at src/model_building/training_data/cleaned_dataset.csv
+    - An Arrow IPC stream at src/model_building/training_data/cleaned_dataset.arrow,
+      which `datasets.Dataset.from_file` memory-maps without copying.
 """
 
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Literal
+from typing import Callable
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 # -------------------------------------------------------------------------
 # Configuration and Logging
@@ -38,12 +49,13 @@ FOREX_FILE = (
     TRAINING_DATA_DIRECTORY / "forex_news_dataset/sentiment_annotated_with_texts.csv"
 )
 
-PHRASEBANK_FILES = [
-    PHRASEBANK_DIR / "Sentences_50Agree.txt",
-    PHRASEBANK_DIR / "Sentences_66Agree.txt",
-    PHRASEBANK_DIR / "Sentences_75Agree.txt",
-    PHRASEBANK_DIR / "Sentences_AllAgree.txt",
-]
+# PhraseBank file -> fraction of annotators that agreed on the label
+PHRASEBANK_FILES = {
+    PHRASEBANK_DIR / "Sentences_50Agree.txt": 0.50,
+    PHRASEBANK_DIR / "Sentences_66Agree.txt": 0.66,
+    PHRASEBANK_DIR / "Sentences_75Agree.txt": 0.75,
+    PHRASEBANK_DIR / "Sentences_AllAgree.txt": 1.00,
+}
 
 FIQA_FILES = [
     FIQA_DIR / "task1_headline_ABSA_train.json",
@@ -52,120 +64,190 @@ FIQA_FILES = [
 
 LABEL_MAP_3CLASS = {"negative": 0, "neutral": 1, "positive": 2}
 NEUTRAL_THRESHOLD = 0.1
-OUTPUT_FILE = TRAINING_DATA_DIRECTORY / "cleaned_dataset.csv"
+OUTPUT_FILE = TRAINING_DATA_DIRECTORY / "cleaned_dataset.arrow"
+
+COLUMNS = ["text", "label", "source", "original_label", "agreement"]
+
+OUTPUT_SCHEMA = pa.schema(
+    [
+        ("text", pa.string()),
+        ("label", pa.int64()),
+        ("source", pa.string()),
+        ("original_label", pa.string()),
+        ("agreement", pa.float32()),
+    ]
+)
 
-COLUMNS = ["text", "label", "source", "original_label"]
+
+# -------------------------------------------------------------------------
+# Vectorised helpers
+# -------------------------------------------------------------------------
+def _clean_text(text: pd.Series) -> pd.Series:
+    """Normalize unicode and whitespace, and re-attach split punctuation."""
+    return (
+        text.astype("string")
+        .str.normalize("NFKC")
+        .str.replace(r"\s+", " ", regex=True)
+        .str.replace(r" ([.,;:!?%)\]'])", r"\1", regex=True)
+        .str.replace(r"([(\[$]) ", r"\1", regex=True)
+        .str.strip()
+    )
+
+
+def _normalized_key(text: pd.Series) -> np.ndarray:
+    """64-bit hash of case- and punctuation-insensitive text."""
+    normalized = (
+        text.str.lower()
+        .str.replace(r"[^0-9a-z]+", " ", regex=True)
+        .str.strip()
+        .astype(object)
+    )
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _finalize(df: pd.DataFrame) -> pd.DataFrame:
+    df["text"] = _clean_text(df["text"])
+    df = df[df["text"].str.len() > 0].dropna(subset=["text", "label"])
+    df = df.astype({"label": "int64", "agreement": "float32"})[COLUMNS]
+    return df.assign(key=_normalized_key(df["text"]))
 
 
 # -------------------------------------------------------------------------
 # Dataset Preparation Functions
 # -------------------------------------------------------------------------
-def prepare_phrasebank_data() -> pd.DataFrame:
-    """Loads and processes all versions of the Financial PhraseBank dataset."""
-
-    def _process_file(dataset_path: Path) -> pd.DataFrame:
-        lines = []
-        with open(dataset_path, "r", encoding="utf-8", errors="replace") as f:
-            for i, line in enumerate(f, 1):
-                parts = line.strip().split("@")
-                if len(parts) != 2:
-                    logging.warning(f"Malformed line {i} in {dataset_path}")
-                    continue
-                text, label_str = parts
-                text = _clean_text(text)
-                label_str = label_str.strip().lower()
-                label = LABEL_MAP_3CLASS.get(label_str)
-                if label is None:
-                    logging.warning(f"Unknown label '{label_str}' in {dataset_path}")
-                    continue
-                lines.append(
-                    {
-                        "text": text,
-                        "label": label,
-                        "source": str(dataset_path),
-                        "original_label": label_str,
-                    }
-                )
-        return pd.DataFrame(lines, columns=COLUMNS)
-
-    logging.info("Processing Financial PhraseBank datasets...")
-    dfs = [_process_file(p) for p in PHRASEBANK_FILES if p.exists()]
-    return pd.concat(dfs, ignore_index=True)
-
-
-def prepare_fiqa_data() -> pd.DataFrame:
-    """Loads and processes the FiQA 2018 datasets."""
-
-    def _process_file(dataset_path: Path) -> pd.DataFrame:
-        with open(dataset_path, "r", encoding="utf-8", errors="replace") as f:
-            json_data = json.load(f)
-
-        lines = []
-        for _, data in json_data.items():
-            text = _clean_text(data.get("sentence", ""))
-            score_str = str(data["info"][0]["sentiment_score"]).strip()
-            try:
-                score = float(score_str)
-            except ValueError:
-                logging.warning(
-                    f"Invalid sentiment score '{score_str}' in {dataset_path}"
-                )
-                continue
-
-            if abs(score) < NEUTRAL_THRESHOLD:
-                label = 1
-            elif score > 0:
-                label = 2
-            else:
-                label = 0
-
-            lines.append(
-                {
-                    "text": text,
-                    "label": label,
-                    "source": str(dataset_path),
-                    "original_label": score_str,
-                }
-            )
-        return pd.DataFrame(lines, columns=COLUMNS)
-
-    logging.info("Processing FiQA datasets...")
-    dfs = [_process_file(p) for p in FIQA_FILES if p.exists()]
-    return pd.concat(dfs, ignore_index=True)
-
-
-def prepare_forex_data() -> pd.DataFrame:
-    """Loads and processes the Forex news dataset."""
-    logging.info("Processing Forex dataset...")
-    df = pd.read_csv(FOREX_FILE, encoding="utf-8", on_bad_lines="skip")
-
-    df["text"] = df["text"].astype(str).apply(_clean_text)
-    df["true_sentiment"] = df["true_sentiment"].str.lower().str.strip()
-    df["label"] = df["true_sentiment"].map(LABEL_MAP_3CLASS)
-    df["original_label"] = df["true_sentiment"]
-    df["source"] = str(FOREX_FILE)
-
-    df = df.drop(columns=["true_sentiment"])
-    return df[COLUMNS]
+def parse_phrasebank_file(dataset_path: Path) -> pd.DataFrame:
+    """Parses one agreement level of the Financial PhraseBank dataset."""
+    raw = dataset_path.read_text(encoding="utf-8", errors="replace")
+    lines = pd.Series(raw.splitlines(), dtype="string")
+    lines = lines[lines.str.strip().str.len() > 0]
+
+    parts = lines.str.rsplit("@", n=1, expand=True)
+    if parts.shape[1] < 2:
+        parts[1] = pd.NA
+    malformed = parts[1].isna()
+    if malformed.any():
+        logging.warning(f"{malformed.sum()} malformed lines in {dataset_path}")
+
+    original_label = parts[1].str.strip().str.lower()
+    label = original_label.map(LABEL_MAP_3CLASS)
+    unknown = ~malformed & label.isna()
+    if unknown.any():
+        logging.warning(f"{unknown.sum()} unknown labels in {dataset_path}")
+
+    df = pd.DataFrame(
+        {
+            "text": parts[0],
+            "label": label,
+            "source": str(dataset_path),
+            "original_label": original_label,
+            "agreement": PHRASEBANK_FILES.get(dataset_path, np.nan),
+        }
+    )
+    return _finalize(df)
+
+
+def parse_fiqa_file(dataset_path: Path) -> pd.DataFrame:
+    """Parses one FiQA 2018 dataset file, mapping scores to three classes."""
+    with open(dataset_path, "r", encoding="utf-8", errors="replace") as f:
+        json_data = json.load(f)
+
+    records = list(json_data.values())
+    original_label = pd.Series(
+        [str(r["info"][0]["sentiment_score"]).strip() for r in records],
+        dtype="string",
+    )
+    score = pd.to_numeric(original_label, errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+    invalid = np.isnan(score)
+    if invalid.any():
+        logging.warning(f"{invalid.sum()} invalid sentiment scores in {dataset_path}")
+
+    label = pd.Series(
+        np.select([np.abs(score) < NEUTRAL_THRESHOLD, score > 0], [1, 2], 0)
+    ).mask(invalid)
+
+    df = pd.DataFrame(
+        {
+            "text": pd.Series([r.get("sentence", "") for r in records]),
+            "label": label,
+            "source": str(dataset_path),
+            "original_label": original_label,
+            "agreement": np.nan,
+        }
+    )
+    return _finalize(df)
+
+
+def parse_forex_file(dataset_path: Path) -> pd.DataFrame:
+    """Parses the Forex news dataset."""
+    df = pd.read_csv(dataset_path, encoding="utf-8", on_bad_lines="skip")
+    original_label = df["true_sentiment"].astype("string").str.lower().str.strip()
+
+    df = pd.DataFrame(
+        {
+            "text": df["text"],
+            "label": original_label.map(LABEL_MAP_3CLASS),
+            "source": str(dataset_path),
+            "original_label": original_label,
+            "agreement": np.nan,
+        }
+    )
+    return _finalize(df)
+
+
+def deduplicate(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep one row per normalized text, preferring the highest agreement.
+
+    Rows without an agreement level rank below every PhraseBank level; ties
+    keep the first row in input order.
+    """
+    ranked = df.sort_values(
+        "agreement", ascending=False, na_position="last", kind="stable"
+    )
+    unique = ranked.drop_duplicates(subset="key", keep="first")
+    return unique.sort_index().drop(columns="key").reset_index(drop=True)
+
+
+def write_arrow(df: pd.DataFrame, output_file: Path) -> None:
+    """Writes the dataset as an Arrow IPC stream, the format `datasets` maps."""
+    table = pa.Table.from_pandas(df, schema=OUTPUT_SCHEMA, preserve_index=False)
+    with pa.OSFile(str(output_file), "wb") as sink:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
 
 
 # -------------------------------------------------------------------------
 # Main
 # -------------------------------------------------------------------------
 def main() -> None:
-    """Combines and saves all datasets into one CSV."""
+    """Combines, deduplicates and saves all datasets into one Arrow file."""
     logging.info("Preparing combined dataset...")
 
-    phrasebank = prepare_phrasebank_data()
-    fiqa = prepare_fiqa_data()
-    forex = prepare_forex_data()
+    tasks: list[tuple[Callable[[Path], pd.DataFrame], Path]] = [
+        *((parse_phrasebank_file, p) for p in PHRASEBANK_FILES),
+        *((parse_fiqa_file, p) for p in FIQA_FILES),
+        (parse_forex_file, FOREX_FILE),
+    ]
+    tasks = [(parse, path) for parse, path in tasks if path.exists()]
+    if not tasks:
+        raise FileNotFoundError(f"No source datasets in {TRAINING_DATA_DIRECTORY}")
+
+    workers = min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse, path) for parse, path in tasks]
+        frames = [future.result() for future in futures]
 
-    combined_df = pd.concat([phrasebank, fiqa, forex], ignore_index=True)
-    combined_df.dropna(subset=["text", "label"], inplace=True)
+    combined_df = pd.concat(frames, ignore_index=True)
+    deduped_df = deduplicate(combined_df)
 
-    combined_df.to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
+    write_arrow(deduped_df, OUTPUT_FILE)
     logging.info(f"Combined dataset saved to {OUTPUT_FILE}")
-    logging.info(f"Total samples: {len(combined_df):,}")
+    logging.info(
+        f"Total samples: {len(deduped_df):,} "
+        f"({len(combined_df) - len(deduped_df):,} duplicates removed)"
+    )
 
 
 if __name__ == "__main__":
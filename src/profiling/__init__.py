@@ -0,0 +1,10 @@
+"""
+profiling
+---------
+Opt-in, environment driven profiling hooks for the hourly job.
+"""
+
+from profiling._profiler import Profiler
+from profiling._sampler import StackSampler
+
+__all__ = ["Profiler", "StackSampler"]
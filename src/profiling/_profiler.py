@@ -0,0 +1,177 @@
+"""
+profiling.profiler
+------------------
+Context managers that wrap pipeline stages in cProfile, the sampling
+profiler, tracemalloc or the torch profiler, depending on `EnvConfig`.
+
+Every artifact is written through the active storage backend under
+`artifacts/profiles/<run>/`, so profiles taken on Lambda end up in S3 and
+local runs end up in the data directory.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import tempfile
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core.env import EnvConfig, ProfileMode
+from storage import StorageInterface
+
+from ._sampler import StackSampler
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """Profile selected pipeline stages and persist the results."""
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        mode: ProfileMode = ProfileMode.OFF,
+        stages: tuple[str, ...] = ("pipeline",),
+        torch_enabled: bool = False,
+        tracemalloc_enabled: bool = False,
+        top_n: int = 25,
+    ) -> None:
+        self.storage = storage
+        self.mode = mode
+        self.stages = stages
+        self.torch_enabled = torch_enabled
+        self.tracemalloc_enabled = tracemalloc_enabled
+        self.top_n = top_n
+        self.run_label = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._cprofile_active = False
+
+    @staticmethod
+    def from_env(env: EnvConfig, storage: StorageInterface) -> Profiler:
+        """Build a profiler from the `PROFILE_*` environment settings."""
+        return Profiler(
+            storage=storage,
+            mode=env.profile_mode,
+            stages=env.profile_stages,
+            torch_enabled=env.profile_torch,
+            tracemalloc_enabled=env.profile_tracemalloc,
+            top_n=env.profile_top_n,
+        )
+
+    def _selected(self, stage: str) -> bool:
+        return stage in self.stages or "all" in self.stages
+
+    def _write(self, name: str, data: bytes, content_type: str) -> None:
+        artifact = f"profiles/{self.run_label}/{name}"
+        try:
+            self.storage.save_artifact(artifact, data, content_type=content_type)
+            logger.info("Wrote profiling artifact %s", artifact)
+        except Exception as e:  # profiling must never break the job
+            logger.error("Could not write profiling artifact %s: %s", artifact, e)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Profile a pipeline stage if it was selected through `PROFILE_STAGES`.
+
+        Args:
+            name (str): Stage name, e.g. "pipeline", "scrape", "analyze", "persist".
+        """
+        if not self._selected(name):
+            yield
+            return
+
+        with self._tracemalloc(name), self._cpu_profile(name):
+            yield
+
+    @contextmanager
+    def _cpu_profile(self, name: str) -> Iterator[None]:
+        if self.mode == ProfileMode.CPROFILE and self._cprofile_active:
+            # Only one deterministic profiler can be active per interpreter
+            logger.warning("Skipping cProfile for nested stage '%s'", name)
+            yield
+        elif self.mode == ProfileMode.CPROFILE:
+            profile = cProfile.Profile()
+            profile.enable()
+            self._cprofile_active = True
+            try:
+                yield
+            finally:
+                profile.disable()
+                self._cprofile_active = False
+                profile.create_stats()
+                self._write(
+                    f"{name}.pstats", marshal.dumps(profile.stats), "application/octet-stream"  # type: ignore
+                )
+                summary = io.StringIO()
+                stats = pstats.Stats(profile, stream=summary)
+                stats.sort_stats("cumulative").print_stats(self.top_n)
+                self._write(
+                    f"{name}.pstats.txt", summary.getvalue().encode(), "text/plain"
+                )
+        elif self.mode == ProfileMode.SAMPLING:
+            sampler = StackSampler()
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._write(f"{name}.folded", sampler.folded().encode(), "text/plain")
+        else:
+            yield
+
+    @contextmanager
+    def _tracemalloc(self, name: str) -> Iterator[None]:
+        if not self.tracemalloc_enabled:
+            yield
+            return
+
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_here:
+                tracemalloc.stop()
+
+            lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", ""]
+            lines += [
+                str(stat) for stat in after.compare_to(before, "lineno")[: self.top_n]
+            ]
+            self._write(
+                f"{name}.tracemalloc.txt", "\n".join(lines).encode(), "text/plain"
+            )
+
+    @contextmanager
+    def torch(self, name: str = "analyze") -> Iterator[None]:
+        """Wrap model inference in the torch profiler when `PROFILE_TORCH` is set."""
+        if not self.torch_enabled:
+            yield
+            return
+
+        from torch.profiler import ProfilerActivity, profile
+
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_file = Path(tmp) / "trace.json"
+            prof.export_chrome_trace(str(trace_file))
+            self._write(
+                f"{name}.torch_trace.json", trace_file.read_bytes(), "application/json"
+            )
+        table = prof.key_averages().table(
+            sort_by="self_cpu_time_total", row_limit=self.top_n
+        )
+        self._write(f"{name}.torch_ops.txt", table.encode(), "text/plain")
@@ -0,0 +1,68 @@
+"""
+profiling.sampler
+-----------------
+A small, dependency free sampling profiler.
+
+A background thread periodically captures the stacks of every other thread
+and counts identical stacks. The result is written in the "folded stacks"
+format understood by flamegraph.pl and speedscope.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+
+class StackSampler:
+    """Sample the stacks of all running threads at a fixed interval."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():  # pyright: ignore
+                if ident == own_ident:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                thread_name = names.get(ident, str(ident))
+                self.samples[_fold(thread_name, frame)] += 1
+
+    def folded(self) -> str:
+        """Return the collected samples in folded-stack format."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+def _fold(thread_name: str, frame: FrameType | None) -> str:
+    """Render a frame chain root-first as `thread;file:func;...`."""
+    parts: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_filename}:{code.co_name}:{code.co_firstlineno}")
+        frame = frame.f_back
+    parts.append(thread_name)
+    return ";".join(reversed(parts))
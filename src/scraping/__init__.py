@@ -1,3 +1,38 @@
-from ._run_scraper import scrape_headlines
+from ._articles import ArticleFetcher, extract_main_text
+from ._deadline import Deadline, DeadlineExceeded, HedgedCaller
+from ._run_scraper import (
+    ScrapeResult,
+    headline_fetchers,
+    scheduled_fetchers,
+    scheduled_polls,
+    scheduled_sources,
+    scrape_due_headlines,
+    scrape_headlines,
+    source_registry,
+    ticker_universe,
+)
+from ._scrape_yahoo import load_ticker_universe
+from ._scheduler import PollScheduler, poll_state_artifact
+from ._sharding import Shard, shard_of
 
-__all__ = ["scrape_headlines"]
+__all__ = [
+    "ArticleFetcher",
+    "Deadline",
+    "DeadlineExceeded",
+    "HedgedCaller",
+    "PollScheduler",
+    "ScrapeResult",
+    "Shard",
+    "extract_main_text",
+    "headline_fetchers",
+    "load_ticker_universe",
+    "poll_state_artifact",
+    "scheduled_fetchers",
+    "scheduled_polls",
+    "scheduled_sources",
+    "scrape_due_headlines",
+    "scrape_headlines",
+    "shard_of",
+    "source_registry",
+    "ticker_universe",
+]
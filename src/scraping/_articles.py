@@ -0,0 +1,261 @@
+"""
+scraping.articles
+-----------------
+Full-article fetching for headline enrichment.
+
+`ArticleFetcher.fetch_all` downloads the pages behind a run's headline links
+on a small thread pool. Requests to the same domain are paced by a
+per-domain token bucket, and the URLs are interleaved across domains so one
+slow site does not hold up the others. Downloads are capped in size, and
+only the extracted main text, itself capped, is kept.
+
+Extracted texts are cached in storage under a hash of the URL, so an article
+linked by several topics or runs is downloaded once.
+
+Links to redirect and consent pages are not fetched. Google News RSS links
+point to `news.google.com` redirect pages, not to the publisher, and the
+feed's `<source url>` only names the publisher's home page, so Google-sourced
+headlines are not enriched. A page that redirected to such a host is
+discarded, and an empty extraction after any redirect is not cached, so a
+later run can retry it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, zip_longest
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup, Tag
+
+from ._deadline import Deadline
+from ._rate_limit import RateLimiter
+
+if TYPE_CHECKING:
+    from storage import StorageInterface
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_CACHE_PREFIX = "articles"
+# Pages larger than this are cut off; article bodies are a small part of them
+MAX_ARTICLE_BYTES = 2_000_000
+# Text past this is dropped before tokenization, bounding inference per article
+MAX_ARTICLE_CHARS = 20_000
+# Shorter paragraphs are captions, bylines and link lists rather than body text
+MIN_PARAGRAPH_CHARS = 40
+BOILERPLATE_TAGS = (
+    "script",
+    "style",
+    "noscript",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "figure",
+)
+USER_AGENT = "Mozilla/5.0 (compatible; market-sentiment/1.0)"
+# Redirect and consent pages standing in front of the article
+INTERSTITIAL_HOSTS = frozenset(
+    {"news.google.com", "consent.google.com", "consent.yahoo.com", "guce.yahoo.com"}
+)
+
+
+def article_cache_key(url: str) -> str:
+    """Storage artifact holding the extracted text of `url`."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{ARTICLE_CACHE_PREFIX}/{digest}.txt.gz"
+
+
+def is_interstitial(url: str) -> bool:
+    """Whether `url` is a redirect or consent page rather than an article."""
+    return (urlsplit(url).hostname or "") in INTERSTITIAL_HOSTS
+
+
+def _paragraphs(node: Tag) -> list[str]:
+    texts = (p.get_text(" ", strip=True) for p in node.find_all("p"))
+    return [text for text in texts if len(text) >= MIN_PARAGRAPH_CHARS]
+
+
+def extract_main_text(html: str | bytes, max_chars: int = MAX_ARTICLE_CHARS) -> str:
+    """
+    The body text of an article page.
+
+    Prefers the page's `<article>` element; otherwise takes the element whose
+    direct paragraphs hold the most text, which on news pages is the story
+    container rather than navigation or teaser lists.
+
+    Args:
+        html (str | bytes): The page.
+        max_chars (int): Maximum length of the returned text.
+
+    Returns:
+        str: Paragraphs separated by newlines, or "" if none were found.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+
+    paragraphs: list[str] = []
+    for article in soup.find_all("article"):
+        paragraphs.extend(_paragraphs(article))
+
+    if not paragraphs:
+        text_by_parent: dict[int, int] = defaultdict(int)
+        parents = {}
+        for p in soup.find_all("p"):
+            text = p.get_text(" ", strip=True)
+            if len(text) >= MIN_PARAGRAPH_CHARS and p.parent is not None:
+                text_by_parent[id(p.parent)] += len(text)
+                parents[id(p.parent)] = p.parent
+        if text_by_parent:
+            best = parents[max(text_by_parent, key=text_by_parent.__getitem__)]
+            paragraphs = [
+                text
+                for p in best.find_all("p", recursive=False)
+                if len(text := p.get_text(" ", strip=True)) >= MIN_PARAGRAPH_CHARS
+            ]
+
+    return "\n".join(paragraphs)[:max_chars]
+
+
+def _interleave_by_domain(urls: Iterable[str]) -> list[str]:
+    """Round-robin over domains, so workers spread across sites."""
+    by_domain: dict[str, list[str]] = defaultdict(list)
+    for url in urls:
+        by_domain[urlsplit(url).netloc].append(url)
+    return [url for url in chain.from_iterable(zip_longest(*by_domain.values())) if url]
+
+
+class ArticleFetcher:
+    """Fetch and extract article texts, concurrently and politely."""
+
+    def __init__(
+        self,
+        storage: StorageInterface | None = None,
+        workers: int = 8,
+        rate_per_domain: float = 1.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self.storage = storage
+        self.workers = workers
+        self.rate_per_domain = rate_per_domain
+        self.timeout = timeout
+        self._limiters: dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, domain: str) -> RateLimiter:
+        with self._lock:
+            if domain not in self._limiters:
+                self._limiters[domain] = RateLimiter(self.rate_per_domain)
+            return self._limiters[domain]
+
+    def _download(self, url: str) -> tuple[bytes, str, bool]:
+        """The page's first bytes, its final URL and whether it redirected."""
+        with requests.get(
+            url,
+            timeout=self.timeout,
+            stream=True,
+            headers={"User-Agent": USER_AGENT},
+        ) as resp:
+            resp.raise_for_status()
+            redirected = bool(resp.history)
+            content_type = resp.headers.get("Content-Type", "text/html")
+            if "html" not in content_type or is_interstitial(resp.url):
+                return b"", resp.url, redirected
+            chunks: list[bytes] = []
+            size = 0
+            for chunk in resp.iter_content(chunk_size=65536):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_ARTICLE_BYTES:
+                    break
+            return b"".join(chunks)[:MAX_ARTICLE_BYTES], resp.url, redirected
+
+    def _load_cached(self, url: str) -> str | None:
+        if self.storage is None:
+            return None
+        raw = self.storage.load_artifact(article_cache_key(url))
+        return None if raw is None else gzip.decompress(raw).decode("utf-8")
+
+    def _save_cached(self, url: str, text: str) -> None:
+        if self.storage is not None:
+            self.storage.save_artifact(
+                article_cache_key(url),
+                gzip.compress(text.encode("utf-8")),
+                "application/gzip",
+            )
+
+    def fetch(self, url: str, deadline: Deadline | None = None) -> str:
+        """
+        The main text of one article, from the cache or the web.
+
+        Returns:
+            str: The text, or "" if the page failed, had no body text, is a
+            redirect or consent page, or the deadline passed before its turn
+            came.
+        """
+        if is_interstitial(url):
+            return ""
+        try:
+            cached = self._load_cached(url)
+            if cached is not None:
+                return cached
+            if deadline is not None and deadline.expired:
+                return ""
+
+            self._limiter(urlsplit(url).netloc).acquire()
+            if deadline is not None and deadline.expired:
+                return ""
+            page, final_url, redirected = self._download(url)
+            text = extract_main_text(page)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Could not fetch article %s: %s", url, e)
+            return ""
+
+        if is_interstitial(final_url):
+            logger.info("Article %s redirected to %s, skipping it", url, final_url)
+            return ""
+        # Empty extractions are cached too, refetching will not change them,
+        # unless a redirect led somewhere other than the article
+        if not text and redirected:
+            return ""
+        try:
+            self._save_cached(url, text)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Could not cache article %s: %s", url, e)
+        return text
+
+    def fetch_all(
+        self, urls: Sequence[str], deadline: Deadline | None = None
+    ) -> dict[str, str]:
+        """
+        The main texts of `urls`.
+
+        Args:
+            urls (Sequence[str]): Article links; duplicates are fetched once,
+                and redirect or consent page links are skipped.
+            deadline (Deadline | None): Articles not started by then are
+                skipped.
+
+        Returns:
+            dict[str, str]: Text by URL, for the articles that produced text.
+        """
+        ordered = _interleave_by_domain(
+            dict.fromkeys(url for url in urls if url and not is_interstitial(url))
+        )
+        if not ordered:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(self.workers, len(ordered)), thread_name_prefix="article"
+        ) as pool:
+            texts = pool.map(lambda url: self.fetch(url, deadline), ordered)
+            return {url: text for url, text in zip(ordered, texts) if text}
@@ -0,0 +1,191 @@
+"""
+scraping.deadline
+-----------------
+Deadline-bounded, hedged feed requests.
+
+A run gets an overall `Deadline`. Every request made through `HedgedCaller`
+waits at most the per-request timeout, and never past the run deadline. If a
+request has not answered after the upstream's recent p95 latency, an
+identical duplicate is sent and whichever answers first wins, so one slow
+connection does not cost a whole timeout. Requests that miss their time raise
+`DeadlineExceeded`; the caller skips and reports those sources.
+
+Latency samples are kept per upstream and persisted as a storage artifact, so
+the p95 is meaningful even though each run only makes a few requests.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from storage import StorageInterface
+
+T = TypeVar("T")
+
+LATENCY_ARTIFACT = "scheduler/latency.json"
+LATENCY_SAMPLES = 200
+# Below this many samples the p95 is a guess; hedge at half the timeout instead
+MIN_HEDGE_SAMPLES = 20
+
+
+class DeadlineExceeded(TimeoutError):
+    """A request did not answer within its share of the run's time budget."""
+
+
+class Deadline:
+    """A point in (monotonic) time by which work must be finished."""
+
+    def __init__(self, seconds: float) -> None:
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class HedgedCaller:
+    """Run requests with a timeout, hedging the slow ones."""
+
+    def __init__(
+        self,
+        deadline: Deadline,
+        timeout: float = 10.0,
+        hedge: bool = True,
+        latencies: dict[str, list[float]] | None = None,
+    ) -> None:
+        self.deadline = deadline
+        self.timeout = timeout
+        self.hedge = hedge
+        self._latencies = {
+            upstream: deque(samples, maxlen=LATENCY_SAMPLES)
+            for upstream, samples in (latencies or {}).items()
+        }
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, upstream: str) -> float:
+        """How long to wait for a request before sending a duplicate."""
+        with self._lock:
+            samples = list(self._latencies.get(upstream, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return self.timeout / 2
+        return statistics.quantiles(samples, n=20)[-1]
+
+    def _timed(
+        self,
+        upstream: str,
+        fn: Callable[..., T],
+        args: tuple[Any, ...],
+        before: Callable[[], None] | None,
+    ) -> T:
+        if before is not None:
+            before()
+        started = time.monotonic()
+        result = fn(*args)
+        with self._lock:
+            self._latencies.setdefault(upstream, deque(maxlen=LATENCY_SAMPLES)).append(
+                time.monotonic() - started
+            )
+        return result
+
+    def call(
+        self,
+        upstream: str,
+        fn: Callable[..., T],
+        *args: Any,
+        before: Callable[[], None] | None = None,
+    ) -> T:
+        """
+        Call `fn(*args)` with a deadline, hedging it if it is slow.
+
+        Args:
+            upstream (str): Latency bucket of the request (e.g. "google").
+            fn (Callable[..., T]): The request.
+            *args (Any): Arguments of `fn`.
+            before (Callable[[], None] | None): Run before each attempt and
+                not timed, e.g. acquiring a rate limiter token.
+
+        Returns:
+            T: The first successful result.
+
+        Raises:
+            DeadlineExceeded: If no attempt answered in time.
+        """
+        budget = min(self.timeout, self.deadline.remaining())
+        if budget <= 0:
+            raise DeadlineExceeded(f"No time left for {upstream}")
+        expires = time.monotonic() + budget
+
+        def submit() -> Future[T]:
+            # A daemon thread per attempt: abandoned requests may outlive the
+            # run, and must not keep the interpreter from exiting
+            future: Future[T] = Future()
+
+            def run() -> None:
+                try:
+                    future.set_result(self._timed(upstream, fn, args, before))
+                except BaseException as e:  # handed to the waiting caller
+                    future.set_exception(e)
+
+            threading.Thread(target=run, name=f"fetch-{upstream}", daemon=True).start()
+            return future
+
+        pending = {submit()}
+        hedge_at = time.monotonic() + self.hedge_delay(upstream)
+        hedged = not self.hedge
+        error: BaseException | None = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= expires:
+                break
+            until = expires if hedged else min(hedge_at, expires)
+            done, pending = wait(
+                pending, timeout=until - now, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            if not hedged and time.monotonic() >= hedge_at:
+                pending.add(submit())
+                hedged = True
+
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f"{upstream} did not answer within {budget:.1f}s")
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            data = {k: [round(v, 4) for v in d] for k, d in self._latencies.items()}
+        return json.dumps(data).encode("utf-8")
+
+    @staticmethod
+    def load(
+        storage: StorageInterface,
+        deadline: Deadline,
+        timeout: float = 10.0,
+        hedge: bool = True,
+    ) -> HedgedCaller:
+        """Create a caller seeded with the latencies of previous runs."""
+        raw = storage.load_artifact(LATENCY_ARTIFACT)
+        latencies: dict[str, list[float]] = {}
+        if raw:
+            try:
+                latencies = {k: list(map(float, v)) for k, v in json.loads(raw).items()}
+            except (ValueError, TypeError, AttributeError):
+                latencies = {}
+        return HedgedCaller(deadline, timeout, hedge, latencies)
+
+    def save(self, storage: StorageInterface) -> None:
+        storage.save_artifact(LATENCY_ARTIFACT, self.to_bytes(), "application/json")
@@ -1,20 +1,320 @@
+import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+
+from core.env import get_env
 from data_models import Headline
 
-from ._scrape_google import scrape_google_news_headlines
-from ._scrape_yahoo import scrape_yahoo_headlines
+from ._deadline import DeadlineExceeded, HedgedCaller
+from ._rate_limit import RateLimiter
+from ._scheduler import PollScheduler, SourceFetcher
+from ._sharding import Shard
+from ._scrape_google import (
+    GOOGLE_TOPICS,
+    _fetch_google_news_headlines,
+    scrape_google_news_headlines,
+)
+from ._scrape_yahoo import (
+    TickerAliases,
+    _fetch_yahoo_news_headlines,
+    _fetch_yahoo_rss_batch,
+    load_ticker_universe,
+    scrape_yahoo_headlines,
+)
+
+logger = logging.getLogger(__name__)
+
+# A poll's headlines, and the new-item count of each source it polled
+PollResult = tuple[list[Headline], dict[str, int]]
+
+
+def ticker_universe() -> dict[str, tuple[str, ...]]:
+    """The configured Yahoo ticker universe, ticker -> aliases."""
+    env = get_env()
+    return load_ticker_universe(env.yahoo_tickers, env.yahoo_tickers_file)
+
+
+def _yahoo_batches(tickers: Sequence[str]) -> list[Sequence[str]]:
+    size = get_env().yahoo_batch_size
+    return [tickers[i : i + size] for i in range(0, len(tickers), size)]
+
+
+def _yahoo_limiter() -> RateLimiter:
+    return RateLimiter(get_env().yahoo_rate_per_second)
 
 
 def scrape_headlines() -> list[Headline]:
-    """_summary_
+    """
+    Fetch every Google topic and the whole Yahoo ticker universe.
 
     Returns:
-        list[Headline]: _description_
+        list[Headline]: Headlines from the last hour.
     """
-
+    env = get_env()
     google_headlines = scrape_google_news_headlines()
-    yahoo_headlines = scrape_yahoo_headlines()
+    yahoo_headlines = scrape_yahoo_headlines(
+        ticker_universe(),
+        batch_size=env.yahoo_batch_size,
+        workers=env.yahoo_fetch_workers,
+        rate_per_second=env.yahoo_rate_per_second,
+    )
     return google_headlines + yahoo_headlines
 
 
+def _fetch_yahoo_batch(
+    batch: Sequence[str],
+    aliases: TickerAliases,
+    limiter: RateLimiter,
+    window: timedelta = timedelta(hours=1),
+) -> list[Headline]:
+    limiter.acquire()
+    grouped = _fetch_yahoo_rss_batch(batch, window, aliases)
+    return [h for headlines in grouped.values() for h in headlines]
+
+
+def headline_fetchers() -> list[Callable[[], list[Headline]]]:
+    """
+    One independent fetch callable per feed request, in the same order as
+    `scrape_headlines`, so callers can fetch feeds concurrently. Yahoo
+    tickers are grouped into multi-symbol requests sharing one rate limit.
+
+    Returns:
+        list[Callable[[], list[Headline]]]: Zero-argument fetchers.
+    """
+    universe = ticker_universe()
+    limiter = _yahoo_limiter()
+    fetchers: list[Callable[[], list[Headline]]] = [
+        partial(_fetch_google_news_headlines, topic) for topic in GOOGLE_TOPICS
+    ]
+    fetchers += [
+        partial(_fetch_yahoo_batch, batch, universe, limiter)
+        for batch in _yahoo_batches(list(universe))
+    ]
+    return fetchers
+
+
+def source_registry() -> dict[str, SourceFetcher]:
+    """
+    Every pollable feed, keyed by a stable source key.
+
+    Returns:
+        dict[str, SourceFetcher]: Fetchers taking the look-back window.
+    """
+    sources: dict[str, SourceFetcher] = {
+        f"google:{topic}": partial(_fetch_google_news_headlines, topic)
+        for topic in GOOGLE_TOPICS
+    }
+    sources.update(
+        {
+            f"yahoo:{ticker}": partial(_fetch_yahoo_news_headlines, [ticker])
+            for ticker in ticker_universe()
+        }
+    )
+    return sources
+
+
+def _poll_source(
+    scheduler: PollScheduler, key: str, fetch: SourceFetcher, now: datetime
+) -> PollResult:
+    """Fetch `key` for its window, without recording the poll yet."""
+    headlines = fetch(scheduler.window(key, now))
+    return headlines, {key: len(headlines)}
+
+
+def _poll_yahoo_batch(
+    scheduler: PollScheduler,
+    batch: Sequence[str],
+    aliases: TickerAliases,
+    limiter: RateLimiter,
+    now: datetime,
+    caller: HedgedCaller | None = None,
+) -> PollResult:
+    """Fetch due tickers in one request and count each ticker's new items."""
+    keys = {ticker: f"yahoo:{ticker}" for ticker in batch}
+    windows = {ticker: scheduler.window(key, now) for ticker, key in keys.items()}
+
+    request = (batch, max(windows.values()), aliases)
+    if caller is None:
+        limiter.acquire()
+        grouped = _fetch_yahoo_rss_batch(*request)
+    else:
+        grouped = caller.call(
+            "yahoo", _fetch_yahoo_rss_batch, *request, before=limiter.acquire
+        )
+
+    counts = {
+        key: sum(
+            1
+            for h in grouped[ticker]
+            if h.pub_date
+            and datetime.fromisoformat(h.pub_date) >= now - windows[ticker]
+        )
+        for ticker, key in keys.items()
+    }
+    return [h for headlines in grouped.values() for h in headlines], counts
+
+
+def _record(scheduler: PollScheduler, counts: dict[str, int], now: datetime) -> None:
+    for key, new_items in counts.items():
+        scheduler.record(key, new_items, now)
+
+
+def _recorded_poll(
+    scheduler: PollScheduler, poll: Callable[[], PollResult], now: datetime
+) -> list[Headline]:
+    headlines, counts = poll()
+    _record(scheduler, counts, now)
+    return headlines
+
+
+def scheduled_polls(
+    scheduler: PollScheduler,
+    now: datetime,
+    shard: Shard | None = None,
+    caller: HedgedCaller | None = None,
+) -> dict[str, Callable[[], PollResult]]:
+    """
+    Zero-argument polls of the sources that are due at `now`, by label.
+
+    Each poll asks its feed for items since the previous poll and returns the
+    headlines with the new-item count of every source it covered, leaving it
+    to the caller to `record` them once the headlines are actually used. Due
+    Yahoo tickers are grouped into multi-symbol requests (labelled
+    `yahoo:AAPL,MSFT,...`), but are still counted individually. With a
+    `shard`, only the sources that shard owns are considered. With a
+    `caller`, requests are deadline-bounded and hedged.
+    """
+    sources = source_registry()
+    keys = shard.select(sources) if shard else list(sources)
+    due = scheduler.due(keys, now)
+
+    polls: dict[str, Callable[[], PollResult]] = {}
+    for key in due:
+        if key.startswith("yahoo:"):
+            continue
+        fetch = sources[key]
+        if caller is not None:
+            fetch = partial(caller.call, key.split(":", 1)[0], fetch)
+        polls[key] = partial(_poll_source, scheduler, key, fetch, now)
+
+    universe = ticker_universe()
+    limiter = _yahoo_limiter()
+    due_tickers = [
+        key.removeprefix("yahoo:") for key in due if key.startswith("yahoo:")
+    ]
+    for batch in _yahoo_batches(due_tickers):
+        polls[f"yahoo:{','.join(batch)}"] = partial(
+            _poll_yahoo_batch, scheduler, batch, universe, limiter, now, caller
+        )
+    return polls
+
+
+def scheduled_sources(
+    scheduler: PollScheduler,
+    now: datetime,
+    shard: Shard | None = None,
+    caller: HedgedCaller | None = None,
+) -> dict[str, Callable[[], list[Headline]]]:
+    """
+    Zero-argument fetchers for the sources that are due at `now`, by label.
+
+    The polls of `scheduled_polls`, each recording its result in `scheduler`
+    as soon as it returns; for callers that use every fetcher's headlines. A
+    source is only recorded as polled once its request has answered.
+    """
+    return {
+        label: partial(_recorded_poll, scheduler, poll, now)
+        for label, poll in scheduled_polls(scheduler, now, shard, caller).items()
+    }
+
+
+@dataclass
+class ScrapeResult:
+    """Headlines of one scrape, and the sources that did not deliver."""
+
+    headlines: list[Headline]
+    skipped: list[str] = field(default_factory=list)  # missed the deadline
+    failed: list[str] = field(default_factory=list)  # request raised
+
+
+def _reported_fetch(
+    label: str, fetch: Callable[[], list[Headline]], report: ScrapeResult
+) -> list[Headline]:
+    try:
+        return fetch()
+    except DeadlineExceeded:
+        report.skipped.append(label)
+    except Exception as e:
+        logger.error("Source %s failed: %s", label, e)
+        report.failed.append(label)
+    return []
+
+
+def scheduled_fetchers(
+    scheduler: PollScheduler,
+    now: datetime,
+    shard: Shard | None = None,
+    caller: HedgedCaller | None = None,
+    report: ScrapeResult | None = None,
+) -> list[Callable[[], list[Headline]]]:
+    """
+    The fetchers of `scheduled_sources`, without their labels.
+
+    With a `report`, a source that misses the deadline or raises is added to
+    its `skipped` or `failed` labels, and its fetcher returns no headlines.
+    """
+    sources = scheduled_sources(scheduler, now, shard, caller)
+    if report is None:
+        return list(sources.values())
+    return [
+        partial(_reported_fetch, label, fetch, report)
+        for label, fetch in sources.items()
+    ]
+
+
+def scrape_due_headlines(
+    scheduler: PollScheduler,
+    now: datetime,
+    shard: Shard | None = None,
+    caller: HedgedCaller | None = None,
+) -> ScrapeResult:
+    """
+    Fetch every due source (of `shard`, if given), a few requests at a time.
+
+    With a `caller`, this returns by the caller's deadline whatever happens:
+    sources still outstanding then are skipped and stay due for the next run.
+    Only the polls whose headlines made it into the result are recorded in
+    `scheduler`; a request that answers after the deadline is ignored.
+
+    Returns:
+        ScrapeResult: Fetched headlines and the skipped and failed sources.
+    """
+    polls = scheduled_polls(scheduler, now, shard, caller)
+    workers = max(1, get_env().yahoo_fetch_workers)
+    timeout = caller.deadline.remaining() if caller is not None else None
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(poll): label for label, poll in polls.items()}
+    done, not_done = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    result = ScrapeResult(headlines=[], skipped=[futures[f] for f in not_done])
+    for future in done:
+        error = future.exception()
+        if isinstance(error, DeadlineExceeded):
+            result.skipped.append(futures[future])
+        elif error is not None:
+            logger.error("Source %s failed: %s", futures[future], error)
+            result.failed.append(futures[future])
+        else:
+            headlines, counts = future.result()
+            result.headlines.extend(headlines)
+            _record(scheduler, counts, now)
+    return result
+
+
 if __name__ == "__main__":
     scrape_headlines()
@@ -0,0 +1,183 @@
+"""
+scraping.scheduler
+------------------
+Adaptive per-source poll scheduling.
+
+Every feed (a Google News topic, a Yahoo ticker, ...) is registered under a
+source key. The scheduler keeps, per source, an exponentially weighted
+estimate of new items per hour, the last time it was polled and the last time
+it produced anything. After each poll the interval is set so that a poll is
+expected to return about `target_items` new items: busy feeds are polled as
+often as `min_interval` allows, while feeds that return nothing back off
+geometrically up to `max_interval`. Each poll asks the feed only for items
+published since the previous poll.
+
+State is persisted as a storage artifact between runs; sharded workers each
+keep their own artifact, since every source belongs to exactly one shard.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from data_models import Headline
+
+from ._sharding import Shard
+
+if TYPE_CHECKING:
+    from storage import StorageInterface
+
+POLL_STATE_ARTIFACT = "scheduler/sources.json"
+
+# Runs fire on a schedule with some jitter, so treat a source as due slightly
+# before its interval has fully elapsed
+DUE_SLACK = timedelta(minutes=5)
+BACKOFF_FACTOR = 2.0
+
+SourceFetcher = Callable[[timedelta], list[Headline]]
+
+
+def poll_state_artifact(shard: Shard | None = None) -> str:
+    """Artifact holding the poll state of all sources, or of one shard's."""
+    if shard is None:
+        return POLL_STATE_ARTIFACT
+    return f"scheduler/sources-{shard.label}.json"
+
+
+@dataclass
+class SourceState:
+    """Polling statistics of one source."""
+
+    interval_seconds: float
+    velocity: float = 0.0  # EWMA of new items per hour
+    last_polled: str | None = None
+    last_change: str | None = None
+
+
+def _parse_states(data: bytes) -> dict[str, SourceState]:
+    try:
+        return {key: SourceState(**value) for key, value in json.loads(data).items()}
+    except (ValueError, TypeError):
+        return {}
+
+
+class PollScheduler:
+    """Decide which sources are due and adapt their poll intervals."""
+
+    def __init__(
+        self,
+        min_interval: timedelta = timedelta(hours=1),
+        max_interval: timedelta = timedelta(hours=12),
+        target_items: float = 5.0,
+        smoothing: float = 0.3,
+        states: Mapping[str, SourceState] | None = None,
+        artifact: str = POLL_STATE_ARTIFACT,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_items = target_items
+        self.smoothing = smoothing
+        self.states: dict[str, SourceState] = dict(states or {})
+        self.artifact = artifact
+        self._lock = threading.Lock()
+
+    def _state(self, key: str) -> SourceState:
+        if key not in self.states:
+            self.states[key] = SourceState(self.min_interval.total_seconds())
+        return self.states[key]
+
+    def _clamp(self, seconds: float) -> float:
+        return min(
+            max(seconds, self.min_interval.total_seconds()),
+            self.max_interval.total_seconds(),
+        )
+
+    def due(self, keys: Iterable[str], now: datetime) -> list[str]:
+        """The sources among `keys` whose poll interval has elapsed."""
+        due: list[str] = []
+        for key in keys:
+            state = self._state(key)
+            if state.last_polled is None:
+                due.append(key)
+                continue
+            next_poll = datetime.fromisoformat(state.last_polled) + timedelta(
+                seconds=state.interval_seconds
+            )
+            if now + DUE_SLACK >= next_poll:
+                due.append(key)
+        return due
+
+    def window(self, key: str, now: datetime) -> timedelta:
+        """How far back a poll of `key` at `now` should look."""
+        state = self._state(key)
+        if state.last_polled is None:
+            return self.min_interval
+        elapsed = now - datetime.fromisoformat(state.last_polled)
+        return min(max(elapsed, self.min_interval), self.max_interval)
+
+    def record(self, key: str, new_items: int, now: datetime) -> None:
+        """Fold the result of a poll into the source's velocity and interval."""
+        with self._lock:
+            window = self.window(key, now)
+            state = self._state(key)
+
+            rate = new_items / (window.total_seconds() / 3600)
+            if state.last_polled is None:
+                state.velocity = rate  # seed the average with the first poll
+            else:
+                state.velocity = (
+                    self.smoothing * rate + (1 - self.smoothing) * state.velocity
+                )
+            if new_items:
+                state.last_change = now.isoformat()
+                state.interval_seconds = self._clamp(
+                    self.target_items / max(state.velocity, 1e-9) * 3600
+                )
+            else:
+                state.interval_seconds = self._clamp(
+                    state.interval_seconds * BACKOFF_FACTOR
+                )
+            state.last_polled = now.isoformat()
+
+    def poll(self, key: str, fetch: SourceFetcher, now: datetime) -> list[Headline]:
+        """Fetch `key` for its window and record how many items it returned."""
+        headlines = fetch(self.window(key, now))
+        self.record(key, len(headlines), now)
+        return headlines
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {key: asdict(state) for key, state in sorted(self.states.items())},
+            indent=2,
+        ).encode("utf-8")
+
+    @staticmethod
+    def load(
+        storage: StorageInterface,
+        min_interval: timedelta = timedelta(hours=1),
+        max_interval: timedelta = timedelta(hours=12),
+        target_items: float = 5.0,
+        artifact: str = POLL_STATE_ARTIFACT,
+    ) -> PollScheduler:
+        """Restore scheduler state from storage, starting fresh if absent."""
+        raw = storage.load_artifact(artifact)
+        return PollScheduler(
+            min_interval,
+            max_interval,
+            target_items,
+            states=_parse_states(raw) if raw else {},
+            artifact=artifact,
+        )
+
+    def restore(self, data: bytes) -> None:
+        """Replace the state with one from `to_bytes`, e.g. a run checkpoint's."""
+        with self._lock:
+            self.states = _parse_states(data)
+
+    def save(self, storage: StorageInterface) -> None:
+        storage.save_artifact(self.artifact, self.to_bytes(), "application/json")
@@ -2,24 +2,34 @@
 Module to hold code for scraping Google headlines.
 """
 
+import math
+from datetime import timedelta
+
 import requests
 from bs4 import BeautifulSoup
 
 from data_models import Headline
 
+# Finance-related topics polled on every run
+GOOGLE_TOPICS = ["stock market", "nasdaq", "interest rates", "inflation"]
+
 
-def _fetch_google_news_headlines(topic: str) -> list[Headline]:
+def _fetch_google_news_headlines(
+    topic: str, window: timedelta = timedelta(hours=1)
+) -> list[Headline]:
     """
     Function to pull google headlines for a given topic.
     Takes a topic as a parameter and returns a list of `Headline` options.
 
     Args:
         topic (str): Topic
+        window (timedelta): How far back to search, rounded up to whole hours.
 
     Returns:
         list[Headline]: Headlines
     """
-    url = f"https://news.google.com/rss/search?q={topic}+when:1h&hl=en-US&gl=US&ceid=US:en"
+    hours = max(1, math.ceil(window.total_seconds() / 3600))
+    url = f"https://news.google.com/rss/search?q={topic}+when:{hours}h&hl=en-US&gl=US&ceid=US:en"
     resp = requests.get(url, timeout=10)
     soup = BeautifulSoup(resp.content, features="xml")
 
@@ -41,10 +51,9 @@ def _fetch_google_news_headlines(topic: str) -> list[Headline]:
 
 def scrape_google_news_headlines() -> list[Headline]:
     # Fetch a few finance-related topics
-    topics = ["stock market", "nasdaq", "interest rates", "inflation"]
     all_headlines: list[Headline] = []
 
-    for topic in topics:
+    for topic in GOOGLE_TOPICS:
         headlines = _fetch_google_news_headlines(topic)
         all_headlines.extend(headlines)
 
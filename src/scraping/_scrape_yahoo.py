@@ -1,24 +1,64 @@
+import re
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any
 
 from yahoo_fin import news
 
 from data_models import Headline
 
+from ._rate_limit import RateLimiter
+
+# Default ticker universe, used when none is configured
+YAHOO_TICKERS = ["AAPL", "MSFT", "TSLA", "AMZN", "^GSPC"]
+
+# Topic for articles in a multi-ticker feed that mention none of its tickers
+YAHOO_GROUP_TOPIC = "market news"
+
+TickerAliases = Mapping[str, Sequence[str]]
+
+
+def load_ticker_universe(
+    tickers: Sequence[str] = (), tickers_file: str | None = None
+) -> dict[str, tuple[str, ...]]:
+    """
+    Resolve the ticker universe from configuration.
+
+    `tickers_file` takes precedence: one ticker per line, optionally followed
+    by comma separated aliases (e.g. `AAPL,Apple`) that help attribute
+    articles in multi-ticker feeds. Blank lines and `#` comments are ignored.
+    Otherwise `tickers` is used, falling back to `YAHOO_TICKERS`.
+
+    Returns:
+        dict[str, tuple[str, ...]]: Ticker -> aliases, in configured order.
+    """
+    if tickers_file:
+        universe: dict[str, tuple[str, ...]] = {}
+        for line in Path(tickers_file).read_text(encoding="utf-8").splitlines():
+            fields = [f.strip() for f in line.split("#", 1)[0].split(",")]
+            if fields[0]:
+                universe[fields[0].upper()] = tuple(f for f in fields[1:] if f)
+        return universe
+    return {ticker.upper(): () for ticker in (tickers or YAHOO_TICKERS)}
+
 
 def _fetch_yahoo_news_headlines(
     tickers: list[str],
+    window: timedelta = timedelta(hours=1),
 ) -> list[Headline]:
     """
     Fetch Yahoo Finance headlines for a list of tickers within a time window.
 
     Args:
         tickers (list[str]): List of stock tickers to scrape.
+        window (timedelta): Only keep articles published this recently.
 
     Returns:
         list[Headline]: List of recent headlines within the time window.
     """
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+    cutoff = datetime.now(timezone.utc) - window
     all_news: list[Headline] = []
 
     for ticker in tickers:
@@ -44,7 +84,116 @@ def _fetch_yahoo_news_headlines(
     return all_news
 
 
-def scrape_yahoo_headlines():
-    tickers = ["AAPL", "MSFT", "TSLA", "AMZN", "^GSPC"]
-    headlines = _fetch_yahoo_news_headlines(tickers)
-    return headlines
+def _mention_pattern(ticker: str, aliases: Sequence[str]) -> re.Pattern[str]:
+    symbol = rf"(?<![\w^$])\$?{re.escape(ticker)}(?!\w)"
+    # Symbols match case-sensitively, company names case-insensitively
+    names = [rf"(?i:\b{re.escape(alias)}\b)" for alias in aliases]
+    return re.compile("|".join([symbol, *names]))
+
+
+def _fetch_yahoo_rss_batch(
+    tickers: Sequence[str],
+    window: timedelta = timedelta(hours=1),
+    aliases: TickerAliases | None = None,
+) -> dict[str, list[Headline]]:
+    """
+    Fetch one multi-symbol Yahoo RSS feed and split it back out per ticker.
+
+    The feed does not say which symbol an item belongs to, so each article
+    is attributed to the first ticker (or alias) its title or summary
+    mentions. A single-ticker batch keeps every article; unattributed items
+    of a larger batch are returned under `YAHOO_GROUP_TOPIC`.
+
+    Args:
+        tickers (Sequence[str]): Tickers requested in one feed.
+        window (timedelta): Only keep articles published this recently.
+        aliases (TickerAliases | None): Extra names to match per ticker.
+
+    Returns:
+        dict[str, list[Headline]]: Headlines per ticker, plus the group topic.
+    """
+    cutoff = datetime.now(timezone.utc) - window
+    aliases = aliases or {}
+    patterns = {t: _mention_pattern(t, aliases.get(t, ())) for t in tickers}
+    grouped: dict[str, list[Headline]] = {t: [] for t in tickers}
+    grouped[YAHOO_GROUP_TOPIC] = []
+
+    articles: list[dict[str, Any]] = news.get_yf_rss(",".join(tickers))  # type: ignore
+    for art in articles:  # type: ignore
+        ts = art.get("providerPublishTime")
+        if not ts:
+            continue
+        pub_dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+        if pub_dt < cutoff:
+            continue
+
+        if len(tickers) == 1:
+            topic = tickers[0]
+        else:
+            text = f"{art.get('title', '')} {art.get('summary', '')}"
+            topic = next(
+                (t for t, p in patterns.items() if p.search(text)), YAHOO_GROUP_TOPIC
+            )
+        grouped[topic].append(
+            Headline(
+                headline=art["title"],  # type: ignore
+                link=art["link"],  # type: ignore
+                pub_date=pub_dt.isoformat(),
+                topic=topic,
+            )
+        )
+    return grouped
+
+
+def fetch_yahoo_universe(
+    tickers: Sequence[str],
+    window: timedelta = timedelta(hours=1),
+    aliases: TickerAliases | None = None,
+    batch_size: int = 20,
+    workers: int = 4,
+    limiter: RateLimiter | None = None,
+) -> dict[str, list[Headline]]:
+    """
+    Fetch many tickers as concurrent, rate-limited multi-symbol feed requests.
+
+    Args:
+        tickers (Sequence[str]): Ticker universe.
+        window (timedelta): Only keep articles published this recently.
+        aliases (TickerAliases | None): Extra names to match per ticker.
+        batch_size (int): Symbols per feed request.
+        workers (int): Concurrent requests.
+        limiter (RateLimiter | None): Paces requests across workers.
+
+    Returns:
+        dict[str, list[Headline]]: Headlines per ticker, plus the group topic.
+    """
+    batches = [tickers[i : i + batch_size] for i in range(0, len(tickers), batch_size)]
+
+    def fetch(batch: Sequence[str]) -> dict[str, list[Headline]]:
+        if limiter is not None:
+            limiter.acquire()
+        return _fetch_yahoo_rss_batch(batch, window, aliases)
+
+    grouped: dict[str, list[Headline]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for result in pool.map(fetch, batches):
+            for topic, headlines in result.items():
+                grouped.setdefault(topic, []).extend(headlines)
+    return grouped
+
+
+def scrape_yahoo_headlines(
+    universe: TickerAliases | None = None,
+    batch_size: int = 20,
+    workers: int = 4,
+    rate_per_second: float = 2.0,
+) -> list[Headline]:
+    universe = universe or load_ticker_universe()
+    grouped = fetch_yahoo_universe(
+        list(universe),
+        aliases=universe,
+        batch_size=batch_size,
+        workers=workers,
+        limiter=RateLimiter(rate_per_second),
+    )
+    return [h for headlines in grouped.values() for h in headlines]
@@ -0,0 +1,45 @@
+"""
+scraping.sharding
+-----------------
+Deterministic partitioning of the source universe across workers.
+
+A source key is assigned to shard `blake2b(key) % count`. The hash does not
+depend on the process (unlike the salted built-in `hash`), so every worker of
+a run computes the same partition without coordinating, and each source is
+owned by exactly one worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+def shard_of(key: str, count: int) -> int:
+    """The shard, in `[0, count)`, that owns source `key`."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One worker's slice of the source universe."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"Invalid shard {self.index} of {self.count}")
+
+    @property
+    def label(self) -> str:
+        return f"{self.index:03d}-of-{self.count:03d}"
+
+    def owns(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+    def select(self, keys: Iterable[str]) -> list[str]:
+        """The keys among `keys` owned by this shard, in input order."""
+        return [key for key in keys if self.owns(key)]
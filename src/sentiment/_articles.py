@@ -0,0 +1,121 @@
+"""
+sentiment.articles
+------------------
+Sentiment of long texts, scored over overlapping token windows.
+
+An article body is tokenized once, without special tokens, and cut into
+windows that fit the model, each overlapping the previous one so no sentence
+is only seen cut in half. The windows of many articles are scored together,
+so batches are full and length-sorted across articles rather than padded per
+article. Each article's window probabilities are then pooled, weighted by
+window length, into one label and score.
+
+Memory and CPU are bounded: at most `max_windows` windows per article (text
+past them is not tokenized at all), and articles are scored in groups of at
+most `max_batch_windows` windows.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+from data_models import Headline
+
+
+def token_windows(
+    ids: Sequence[int], size: int, overlap: int, max_windows: int
+) -> list[Sequence[int]]:
+    """
+    Split token ids into windows of `size` that overlap by `overlap` tokens.
+
+    Args:
+        ids (Sequence[int]): Token ids, without special tokens.
+        size (int): Window length.
+        overlap (int): Tokens shared by consecutive windows; below `size`.
+        max_windows (int): Windows past this many are dropped.
+
+    Returns:
+        list[Sequence[int]]: The windows; the last one may be shorter.
+    """
+    if not 0 <= overlap < size:
+        raise ValueError("overlap must be non-negative and smaller than size")
+    stride = size - overlap
+    windows: list[Sequence[int]] = []
+    for start in range(0, max(len(ids) - overlap, 1), stride):
+        if len(windows) == max_windows:
+            break
+        windows.append(ids[start : start + size])
+    return windows
+
+
+def score_articles(
+    classifier: Any,
+    headlines: Sequence[Headline],
+    texts: Mapping[str, str],
+    max_windows: int = 8,
+    overlap: int = 64,
+    max_batch_windows: int = 256,
+    batch_size: int | None = None,
+) -> list[Headline]:
+    """
+    Fill `article_label` / `article_score` of headlines with an article text.
+
+    Args:
+        classifier (Any): A `FinbertClassifier`.
+        headlines (Sequence[Headline]): Headlines to enrich.
+        texts (Mapping[str, str]): Article text by headline link.
+        max_windows (int): Windows scored per article.
+        overlap (int): Tokens shared by consecutive windows.
+        max_batch_windows (int): Windows held in memory at once.
+        batch_size (int | None): Forward-pass batch size.
+
+    Returns:
+        list[Headline]: The headlines; those without text are left unchanged.
+    """
+    tokenizer = classifier.tokenizer
+    size = classifier.max_length - 2  # room for [CLS] and [SEP]
+    stride = size - overlap
+    cls = np.array([tokenizer.cls_token_id], np.int32)
+    sep = np.array([tokenizer.sep_token_id], np.int32)
+
+    pending = [h for h in headlines if texts.get(h.link)]
+    # Each group of articles yields at most `max_batch_windows` windows
+    group_size = max(max_batch_windows // max_windows, 1)
+
+    for start in range(0, len(pending), group_size):
+        group = pending[start : start + group_size]
+        # Text past the last window is never tokenized
+        encoded = tokenizer(
+            [texts[h.link] for h in group],
+            add_special_tokens=False,
+            truncation=True,
+            max_length=max_windows * stride + overlap,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )["input_ids"]
+
+        windows: list[np.ndarray] = []
+        owners: list[int] = []
+        for owner, ids in enumerate(encoded):
+            for window in token_windows(ids, size, overlap, max_windows):
+                windows.append(np.concatenate((cls, window, sep), dtype=np.int32))
+                owners.append(owner)
+
+        # One pass over every window of the group, then length-weighted pooling
+        probs = classifier.classify_ids(windows, batch_size)
+        weights = np.array([len(w) - 2 for w in windows], np.float32)
+        pooled = np.zeros((len(group), probs.shape[1]), np.float32)
+        np.add.at(pooled, owners, probs * weights[:, None])
+        totals = pooled.sum(axis=1)
+
+        for h, p, total in zip(group, pooled, totals):
+            if total <= 0:
+                continue  # the text tokenized to nothing
+            label_id = int(p.argmax())
+            h.article_label = classifier.labels[label_id]
+            h.article_score = float(p[label_id] / total)
+
+    return list(headlines)
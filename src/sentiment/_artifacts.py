@@ -0,0 +1,163 @@
+"""
+sentiment.artifacts
+-------------------
+Self-contained, pre-converted model artifacts for fast cold starts.
+
+`save_model_artifact` writes a model's config, tokenizer and every tensor
+(parameters and buffers) into one directory, with the weights in a single
+safetensors file. `load_model_artifact` builds the model skeleton on the meta
+device and points every tensor straight into a private memory map of that
+file, so loading does no copying and no weight allocation. Clean pages stay
+in the page cache and are shared by every process on the host that loads the
+same artifact.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "manifest.json"
+ARTIFACT_FORMAT = "safetensors-mmap-v1"
+
+
+def save_model_artifact(model: Any, tokenizer: Any, output_dir: str | Path) -> Path:
+    """
+    Write a model, its tokenizer and a manifest into `output_dir`.
+
+    Args:
+        model (Any): A transformers `PreTrainedModel`.
+        tokenizer (Any): The matching tokenizer, saved with `save_pretrained`.
+        output_dir (str | Path): Target directory, created if missing.
+
+    Returns:
+        Path: The artifact directory.
+    """
+    from itertools import chain
+
+    from safetensors.torch import save_file
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Buffers are stored too (including non-persistent ones such as
+    # position_ids) so that nothing has to be re-initialised after loading.
+    tensors = {
+        name: tensor.detach().contiguous()
+        for name, tensor in chain(model.named_parameters(), model.named_buffers())
+    }
+    save_file(tensors, str(output_path / WEIGHTS_FILE), metadata={"format": "pt"})
+
+    model.config.save_pretrained(str(output_path))
+    tokenizer.save_pretrained(str(output_path))
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "model_name": getattr(model.config, "_name_or_path", ""),
+        "architectures": getattr(model.config, "architectures", None),
+        "tensors": len(tensors),
+        "created": datetime.now(timezone.utc).isoformat(),
+    }
+    (output_path / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return output_path
+
+
+def package_model(model_name: str, output_dir: str | Path) -> Path:
+    """Download `model_name` from the Hugging Face hub and package it."""
+    from transformers import BertForSequenceClassification, BertTokenizerFast
+
+    model = BertForSequenceClassification.from_pretrained(model_name, num_labels=3)
+    # Saving the fast tokenizer writes tokenizer.json, so no conversion at load
+    tokenizer = BertTokenizerFast.from_pretrained(model_name)
+    model.config.architectures = ["BertForSequenceClassification"]
+    return save_model_artifact(model, tokenizer, output_dir)
+
+
+def mmap_safetensors(path: str | Path) -> dict[str, Any]:
+    """
+    Map every tensor of a safetensors file without copying it.
+
+    The file is mapped privately (copy-on-write): tensors are backed directly
+    by the page cache, and writes, if any, never reach the file.
+
+    Args:
+        path (str | Path): A `.safetensors` file.
+
+    Returns:
+        dict[str, torch.Tensor]: Tensors viewing the mapped file.
+    """
+    import torch
+
+    dtypes = {
+        "F64": torch.float64,
+        "F32": torch.float32,
+        "F16": torch.float16,
+        "BF16": torch.bfloat16,
+        "I64": torch.int64,
+        "I32": torch.int32,
+        "I16": torch.int16,
+        "I8": torch.int8,
+        "U8": torch.uint8,
+        "BOOL": torch.bool,
+    }
+
+    path = Path(path)
+    with open(path, "rb") as f:
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header: dict[str, Any] = json.loads(f.read(header_len))
+    header.pop("__metadata__", None)
+
+    nbytes = path.stat().st_size
+    storage = torch.UntypedStorage.from_file(str(path), shared=False, nbytes=nbytes)
+    raw = torch.empty(0, dtype=torch.uint8).set_(storage, 0, (nbytes,))
+
+    data_start = 8 + header_len
+    tensors: dict[str, Any] = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        chunk = raw[data_start + begin : data_start + end]
+        tensors[name] = chunk.view(dtypes[info["dtype"]]).reshape(info["shape"])
+    return tensors
+
+
+def load_model_artifact(artifact_dir: str | Path) -> Any:
+    """
+    Load a model written by `save_model_artifact`, zero-copy.
+
+    Args:
+        artifact_dir (str | Path): Artifact directory.
+
+    Returns:
+        Any: The model in eval mode, with weights backed by the memory map.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    artifact_path = Path(artifact_dir)
+    config = AutoConfig.from_pretrained(str(artifact_path))
+    with torch.device("meta"):
+        model = AutoModelForSequenceClassification.from_config(config)
+
+    # pylint: disable=protected-access
+    for name, tensor in mmap_safetensors(artifact_path / WEIGHTS_FILE).items():
+        module_name, _, leaf = name.rpartition(".")
+        module = model.get_submodule(module_name)
+        if leaf in module._parameters:
+            module._parameters[leaf] = torch.nn.Parameter(tensor, requires_grad=False)
+        else:
+            module._buffers[leaf] = tensor
+
+    model.tie_weights()
+    missing = [
+        name
+        for name, tensor in [*model.named_parameters(), *model.named_buffers()]
+        if tensor.is_meta
+    ]
+    if missing:
+        raise ValueError(f"Artifact {artifact_path} is missing tensors: {missing}")
+
+    return model.eval()
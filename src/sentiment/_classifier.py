@@ -0,0 +1,133 @@
+"""
+sentiment.classifier
+--------------------
+Sequence classification over pre-tokenized, length-sorted micro-batches.
+
+Replaces the transformers `pipeline` so that tokenization can go through the
+fast tokenizer and the shared token-id cache, while returning the same
+`{"label": ..., "score": ...}` records.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from ._tokens import TokenCache, encode_texts
+
+
+class FinbertClassifier:
+    """Callable that scores texts with a sequence-classification model."""
+
+    def __init__(
+        self,
+        model: Any,
+        tokenizer: Any,
+        cache: TokenCache | None = None,
+        batch_size: int = 32,
+    ) -> None:
+        self.model = model
+        self.tokenizer = tokenizer
+        self.cache = cache
+        self.batch_size = batch_size
+        self.pad_id = tokenizer.pad_token_id or 0
+        self.labels = model.config.id2label
+        self.max_length = min(
+            getattr(tokenizer, "model_max_length", 512),
+            getattr(model.config, "max_position_embeddings", 512),
+        )
+
+    def _forward(
+        self, token_ids: Sequence[np.ndarray], batch_size: int | None, embed: bool
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        import torch
+
+        batch_size = batch_size or self.batch_size
+        probs = np.zeros((len(token_ids), len(self.labels)), np.float32)
+        embeddings: np.ndarray | None = None
+
+        # Sort by length so each batch only pads to its own longest input
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                indices = order[start : start + batch_size]
+                width = max(len(token_ids[i]) for i in indices)
+
+                input_ids = np.full((len(indices), width), self.pad_id, np.int64)
+                attention_mask = np.zeros((len(indices), width), np.int64)
+                for row, i in enumerate(indices):
+                    input_ids[row, : len(token_ids[i])] = token_ids[i]
+                    attention_mask[row, : len(token_ids[i])] = 1
+
+                mask = torch.from_numpy(attention_mask)
+                extra = {"output_hidden_states": True} if embed else {}
+                output = self.model(
+                    input_ids=torch.from_numpy(input_ids), attention_mask=mask, **extra
+                )
+                probs[indices] = torch.softmax(output.logits, dim=-1).float().numpy()
+
+                if embed:
+                    # Mean of the last layer over the real (unpadded) tokens
+                    hidden = output.hidden_states[-1].float()
+                    weights = mask.unsqueeze(-1).to(hidden.dtype)
+                    pooled = (hidden * weights).sum(1) / weights.sum(1)
+                    pooled = torch.nn.functional.normalize(pooled, dim=-1)
+                    if embeddings is None:
+                        embeddings = np.zeros(
+                            (len(token_ids), pooled.shape[-1]), np.float16
+                        )
+                    embeddings[indices] = pooled.numpy()
+
+        return probs, embeddings
+
+    def classify_ids(
+        self, token_ids: Sequence[np.ndarray], batch_size: int | None = None
+    ) -> np.ndarray:
+        """
+        Class probabilities of already tokenized inputs.
+
+        Args:
+            token_ids (Sequence[np.ndarray]): Token ids of each input,
+                including special tokens and at most `max_length` long.
+            batch_size (int | None): Forward-pass batch size.
+
+        Returns:
+            np.ndarray: A float32 `(len(token_ids), num_labels)` array.
+        """
+        return self._forward(token_ids, batch_size, embed=False)[0]
+
+    def _records(self, probs: np.ndarray) -> list[dict[str, Any]]:
+        label_ids = probs.argmax(axis=-1)
+        return [
+            {"label": self.labels[int(label_id)], "score": float(probs[i, label_id])}
+            for i, label_id in enumerate(label_ids)
+        ]
+
+    def __call__(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[dict[str, Any]]:
+        token_ids = encode_texts(self.tokenizer, texts, self.cache, self.max_length)
+        return self._records(self.classify_ids(token_ids, batch_size))
+
+    def classify_and_embed(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> tuple[list[dict[str, Any]], np.ndarray]:
+        """
+        Classify texts and embed them, in the same forward passes.
+
+        Embeddings are the attention-masked mean of the last hidden layer,
+        scaled to unit length, so a dot product is a cosine similarity.
+
+        Returns:
+            tuple[list[dict[str, Any]], np.ndarray]: The `{"label", "score"}`
+            records and a float16 `(len(texts), hidden_size)` array.
+        """
+        token_ids = encode_texts(self.tokenizer, texts, self.cache, self.max_length)
+        probs, embeddings = self._forward(token_ids, batch_size, embed=True)
+        if embeddings is None:  # no texts
+            hidden_size = getattr(self.model.config, "hidden_size", 0)
+            embeddings = np.zeros((0, hidden_size), np.float16)
+        return self._records(probs), embeddings
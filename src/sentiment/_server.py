@@ -0,0 +1,179 @@
+"""
+sentiment.server
+----------------
+Long-running local inference service.
+
+One process loads FinBERT once and serves every pipeline on the host over
+localhost HTTP. Concurrent requests are coalesced by a `MicroBatcher` into
+dynamic micro-batches: a batch is dispatched as soon as it holds `max_batch`
+texts or when the oldest waiting request reaches its `max_wait` deadline.
+
+Endpoints:
+    POST /analyze   {"texts": [...]}  ->  {"results": [{"label", "score"}, ...]}
+    GET  /health    ->  {"status": "ok"}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Classify = Callable[[list[str]], list[dict[str, Any]]]
+
+
+class MicroBatcher:
+    """Coalesce concurrent classification requests into micro-batches."""
+
+    def __init__(
+        self, classify: Classify, max_batch: int = 64, max_wait: float = 0.01
+    ) -> None:
+        self.classify = classify
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self._pending: queue.Queue[tuple[list[str], Future[Any]]] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, texts: list[str]) -> Future[list[dict[str, Any]]]:
+        """Queue texts for classification; the future resolves to their results."""
+        future: Future[list[dict[str, Any]]] = Future()
+        self._pending.put((texts, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            requests = [self._pending.get()]
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._pending.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            self._dispatch(requests)
+
+    def _dispatch(
+        self, requests: list[tuple[list[str], Future[list[dict[str, Any]]]]]
+    ) -> None:
+        texts = [text for request_texts, _ in requests for text in request_texts]
+        try:
+            results = self.classify(texts) if texts else []
+        except Exception as e:  # fail every request in the batch
+            logger.error("Inference batch of %d texts failed: %s", len(texts), e)
+            for _, future in requests:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        offset = 0
+        for request_texts, future in requests:
+            future.set_result(results[offset : offset + len(request_texts)])
+            offset += len(request_texts)
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """Threaded HTTP server that owns the shared micro-batcher."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], batcher: MicroBatcher) -> None:
+        super().__init__(address, InferenceHandler)
+        self.batcher = batcher
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """HTTP front end for the micro-batcher."""
+
+    server: InferenceServer
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if self.path != "/analyze":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+            texts = payload["texts"]
+            if not isinstance(texts, list):
+                raise ValueError("texts must be a list")
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            results = self.server.batcher.submit([str(t) for t in texts]).result()
+        except Exception as e:  # pylint: disable=broad-except
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug(format, *args)
+
+
+def make_inference_server(
+    classify: Classify,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    max_batch: int = 64,
+    max_wait: float = 0.01,
+) -> InferenceServer:
+    """Build (but do not start) an inference server around `classify`."""
+    batcher = MicroBatcher(classify, max_batch=max_batch, max_wait=max_wait)
+    return InferenceServer((host, port), batcher)
+
+
+def serve_inference(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    max_batch: int = 64,
+    max_wait: float = 0.01,
+) -> None:
+    """Load FinBERT once and serve it until interrupted."""
+    from .analyzer import load_classifier
+
+    server = make_inference_server(
+        load_classifier(), host=host, port=port, max_batch=max_batch, max_wait=max_wait
+    )
+    print(f"Serving FinBERT on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
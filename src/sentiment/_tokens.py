@@ -0,0 +1,110 @@
+"""
+sentiment.tokens
+----------------
+Batch tokenization with a bounded cache of token-id arrays.
+
+Headlines repeat across topics and hours, so token ids are cached by a
+64-bit hash of the text. The cache is bounded by the total number of cached
+tokens and evicts least-recently-used entries. It is process-wide and
+thread-safe, so every inference path in the process (in-process analysis,
+the local inference server) shares it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+
+def text_key(text: str) -> int:
+    """64-bit hash of a text, used as cache key."""
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class TokenCache:
+    """LRU cache of token-id arrays, bounded by the total number of tokens."""
+
+    def __init__(self, max_tokens: int = 2_000_000) -> None:
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int) -> np.ndarray | None:
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ids
+
+    def put(self, key: int, ids: np.ndarray) -> None:
+        if len(ids) > self.max_tokens:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.tokens -= len(previous)
+            self._entries[key] = ids
+            self.tokens += len(ids)
+            while self.tokens > self.max_tokens:
+                _, evicted = self._entries.popitem(last=False)
+                self.tokens -= len(evicted)
+
+
+def encode_texts(
+    tokenizer: Any,
+    texts: Sequence[str],
+    cache: TokenCache | None = None,
+    max_length: int = 512,
+) -> list[np.ndarray]:
+    """
+    Token ids for each text, encoding only cache misses in one batch call.
+
+    Args:
+        tokenizer (Any): A fast (Rust-backed) transformers tokenizer.
+        texts (Sequence[str]): Texts to encode.
+        cache (TokenCache | None): Optional token-id cache.
+        max_length (int): Truncation length, including special tokens.
+
+    Returns:
+        list[np.ndarray]: One int32 array of token ids per text.
+    """
+    keys = [text_key(t) for t in texts]
+    found: dict[int, np.ndarray] = {}
+    if cache is not None:
+        for key in keys:
+            ids = cache.get(key)
+            if ids is not None:
+                found[key] = ids
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    if missing:
+        encoded = tokenizer(
+            list(missing.values()),
+            truncation=True,
+            max_length=max_length,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )["input_ids"]
+        for key, ids in zip(missing, encoded):
+            array = np.asarray(ids, dtype=np.int32)
+            found[key] = array
+            if cache is not None:
+                cache.put(key, array)
+
+    return [found[key] for key in keys]
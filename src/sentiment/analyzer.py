@@ -1,27 +1,121 @@
-from transformers import BertForSequenceClassification, BertTokenizer, pipeline
+from __future__ import annotations
 
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from typing import TYPE_CHECKING, Any
+
+from core.env import get_env
 from data_models import Headline
 
-finbert = BertForSequenceClassification.from_pretrained(
-    "yiyanghkust/finbert-tone", num_labels=3
-)
-tokenizer = BertTokenizer.from_pretrained("yiyanghkust/finbert-tone")  # type: ignore
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "yiyanghkust/finbert-tone"
+
+# After a failed call to the inference server, stay in-process for a while
+SERVER_RETRY_SECONDS = 60.0
+_server_down_until = 0.0
+
+# Loaded on first use by `load_classifier`, so importing this module is cheap
+classifier: Any = None
+token_cache: Any = None
+
+
+def load_classifier() -> Any:
+    """
+    Load FinBERT and build the sentiment classifier, once per process.
+
+    Uses the packaged artifact in `MODEL_ARTIFACT_DIR` when configured,
+    otherwise resolves the model through the Hugging Face hub. Tokenization
+    goes through the fast tokenizer and, unless `TOKEN_CACHE_MAX_TOKENS=0`,
+    the process-wide token-id cache.
+
+    Returns:
+        Any: Callable mapping texts to `{"label", "score"}` records.
+    """
+    global classifier, token_cache  # pylint: disable=global-statement
+    if classifier is None:
+        from transformers import BertForSequenceClassification, BertTokenizerFast
+
+        from ._classifier import FinbertClassifier
+        from ._tokens import TokenCache
+
+        env = get_env()
+        if env.model_artifact_dir:
+            # Pre-packaged artifact: no hub lookup, weights memory-mapped
+            from ._artifacts import load_model_artifact
+
+            finbert = load_model_artifact(env.model_artifact_dir)
+            tokenizer = BertTokenizerFast.from_pretrained(env.model_artifact_dir)
+        else:
+            finbert = BertForSequenceClassification.from_pretrained(
+                MODEL_NAME, num_labels=3
+            ).eval()
+            tokenizer = BertTokenizerFast.from_pretrained(MODEL_NAME)
+
+        if env.token_cache_max_tokens > 0:
+            token_cache = TokenCache(max_tokens=env.token_cache_max_tokens)
+        classifier = FinbertClassifier(finbert, tokenizer, cache=token_cache)
+    return classifier
+
+
+def _classify_remote(texts: list[str]) -> list[dict[str, Any]] | None:
+    """
+    Score texts on the local inference server, if one is configured and up.
+
+    Returns:
+        list[dict[str, Any]] | None: Results, or None to fall back in-process.
+    """
+    global _server_down_until  # pylint: disable=global-statement
+    env = get_env()
+    if not env.inference_server_url or time.monotonic() < _server_down_until:
+        return None
 
-classifier = pipeline("sentiment-analysis", model=finbert, tokenizer=tokenizer)  # type: ignore
+    request = urllib.request.Request(
+        env.inference_server_url.rstrip("/") + "/analyze",
+        data=json.dumps({"texts": texts}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(
+            request, timeout=env.inference_server_timeout
+        ) as resp:
+            return json.loads(resp.read())["results"]
+    except (OSError, urllib.error.URLError, ValueError, KeyError) as e:
+        logger.warning("Inference server unavailable, running in-process: %s", e)
+        _server_down_until = time.monotonic() + SERVER_RETRY_SECONDS
+        return None
 
 
-def analyze_headlines(headlines: list[Headline]) -> list[Headline]:
+def analyze_headlines(
+    headlines: list[Headline], batch_size: int | None = None
+) -> list[Headline]:
     """
     Takes a list of Headline objects and adds sentiment analysis.
 
     Args:
         headlines (list[Headline])
+        batch_size (int | None): Forward-pass batch size, classifier default if None
 
     Returns:
         list[Headline]: same headlines with sentiment_score and sentiment_label filled
     """
     texts = [h.headline for h in headlines]
-    results = classifier(texts)
+
+    # Prefer the shared inference server (INFERENCE_SERVER_URL) when it is up
+    results = _classify_remote(texts) if texts else []
+    if results is None:
+        pipe = load_classifier()
+        if batch_size is None:
+            results = pipe(texts)
+        else:
+            results = pipe(texts, batch_size=batch_size)
 
     for h, r in zip(headlines, results):
         # FinBERT returns label and score
@@ -29,3 +123,60 @@ def analyze_headlines(headlines: list[Headline]) -> list[Headline]:
         h.sentiment_score = r["score"]
 
     return headlines
+
+
+def analyze_and_embed(
+    headlines: list[Headline], batch_size: int | None = None
+) -> tuple[list[Headline], np.ndarray]:
+    """
+    Adds sentiment analysis and returns an embedding of each headline.
+
+    The embeddings are the model's pooled hidden states from the same forward
+    pass, so they cost no extra inference. Always runs in-process: the
+    inference server only returns labels and scores.
+
+    Args:
+        headlines (list[Headline])
+        batch_size (int | None): Forward-pass batch size, classifier default if None
+
+    Returns:
+        tuple[list[Headline], np.ndarray]: the scored headlines and a float16,
+        unit-length embedding per headline, in the same order
+    """
+    results, embeddings = load_classifier().classify_and_embed(
+        [h.headline for h in headlines], batch_size=batch_size
+    )
+    for h, r in zip(headlines, results):
+        h.sentiment_label = r["label"]
+        h.sentiment_score = r["score"]
+    return headlines, embeddings
+
+
+def analyze_articles(
+    headlines: list[Headline], texts: dict[str, str], batch_size: int | None = None
+) -> list[Headline]:
+    """
+    Adds the sentiment of each headline's full article, when its text is known.
+
+    Articles are scored in-process over overlapping token windows; see
+    `sentiment._articles`.
+
+    Args:
+        headlines (list[Headline])
+        texts (dict[str, str]): Article text by headline link
+        batch_size (int | None): Forward-pass batch size, classifier default if None
+
+    Returns:
+        list[Headline]: same headlines with article_score and article_label filled
+    """
+    from ._articles import score_articles
+
+    if not any(texts.get(h.link) for h in headlines):
+        return headlines
+    return score_articles(
+        load_classifier(),
+        headlines,
+        texts,
+        max_windows=get_env().article_max_windows,
+        batch_size=batch_size,
+    )
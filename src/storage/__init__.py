@@ -1,4 +1,45 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from ._deltas import (
+    compact_aggregates,
+    load_live_aggregates,
+    record_aggregate_delta,
+    reset_compacted_aggregates,
+)
 from ._factory import get_storage
 from ._interface import StorageInterface
 
-__all__ = ["get_storage", "StorageInterface"]
+if TYPE_CHECKING:
+    from ._embeddings import EmbeddingMatch, EmbeddingStore, headline_ids
+    from ._ivf import IVFIndex
+
+# Resolved lazily: the embedding store needs NumPy, which the Lambda entry
+# point must not import at start-up
+_EXPORTS = {
+    "EmbeddingMatch": "storage._embeddings",
+    "EmbeddingStore": "storage._embeddings",
+    "headline_ids": "storage._embeddings",
+    "IVFIndex": "storage._ivf",
+}
+
+__all__ = [
+    "EmbeddingMatch",
+    "EmbeddingStore",
+    "IVFIndex",
+    "compact_aggregates",
+    "get_storage",
+    "headline_ids",
+    "load_live_aggregates",
+    "record_aggregate_delta",
+    "reset_compacted_aggregates",
+    "StorageInterface",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
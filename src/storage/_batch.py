@@ -0,0 +1,77 @@
+"""
+storage.batch
+-------------
+Unit of work for storage round trips.
+
+A `StorageBatch` collects a job's writes and commits them in stages. Writes
+in the same stage are independent and run concurrently; stages commit in
+ascending order, each only after every write of the previous stage has
+succeeded. Reads submitted with `read` start immediately, so they overlap
+with each other and with whatever the caller does before `result()`.
+
+With S3 every call is a network round trip, so a commit costs roughly one
+round trip per stage rather than one per call. Both backends are safe to call
+from several threads as long as concurrent writes touch different objects.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class StorageBatch:
+    """Concurrent reads and staged, ordered writes."""
+
+    def __init__(self, max_workers: int = 8) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+        self._stages: dict[int, list[tuple[Callable[..., Any], tuple[Any, ...]]]] = (
+            defaultdict(list)
+        )
+
+    def read(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        """Start `fn(*args)` now and return its future."""
+        return self._pool.submit(fn, *args)
+
+    def write(self, fn: Callable[..., Any], *args: Any, stage: int = 0) -> None:
+        """Queue `fn(*args)` to run, concurrently with its stage, on commit."""
+        self._stages[stage].append((fn, args))
+
+    def commit(self) -> None:
+        """
+        Run the queued writes, stage by stage.
+
+        Raises:
+            Exception: The first error of a stage; later stages are not run.
+        """
+        stages, self._stages = self._stages, defaultdict(list)
+        for stage in sorted(stages):
+            futures = [self._pool.submit(fn, *args) for fn, args in stages[stage]]
+            for future in futures:
+                future.result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> StorageBatch:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        # Commit only if the block completed; queued writes are dropped otherwise
+        try:
+            if exc_type is None:
+                self.commit()
+        finally:
+            self.close()
@@ -0,0 +1,113 @@
+"""
+storage.codecs
+--------------
+Encodings for headline and aggregate objects.
+
+Objects are serialised as compact JSON and optionally compressed with gzip
+(stdlib) or zstd (requires the optional `zstandard` package). JSON goes
+through `orjson` when it is installed, with the stdlib as fallback. Both are
+in the `fast` extra (`pip install .[fast]`).
+
+Decoding does not depend on the configured codec: the compression is detected
+from the leading magic bytes, so objects written by any codec, including the
+older pretty-printed uncompressed JSON, are read transparently.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+from core.env import StorageCodec
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None  # type: ignore[assignment]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises `ValueError` on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "The zstd storage codec requires the 'zstandard' package (the 'fast' extra)"
+        ) from e
+    return zstandard
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Serialises JSON-compatible values to bytes."""
+
+    name: StorageCodec
+    content_encoding: str | None = None
+    level: int | None = None
+
+    def encode(self, value: Any) -> bytes:
+        raw = dumps(value)
+        if self.name == StorageCodec.GZIP:
+            return gzip.compress(raw, compresslevel=self.level or 6, mtime=0)
+        if self.name == StorageCodec.ZSTD:
+            return _zstandard().ZstdCompressor(level=self.level or 3).compress(raw)
+        return raw
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode an object written by any codec.
+
+    Args:
+        data (bytes): Stored object body.
+
+    Returns:
+        Any: The decoded JSON value.
+
+    Raises:
+        ValueError: If the body is empty, truncated or corrupt, or not valid JSON.
+    """
+    if data.startswith(GZIP_MAGIC):
+        try:
+            data = gzip.decompress(data)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f"Corrupt gzip object: {e}") from e
+    elif data.startswith(ZSTD_MAGIC):
+        zstandard = _zstandard()
+        try:
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupt zstd object: {e}") from e
+    return loads(data)
+
+
+def get_codec(name: StorageCodec | str) -> Codec:
+    """Return the codec registered under `name`."""
+    codec = StorageCodec(name)
+    if codec == StorageCodec.ZSTD:
+        _zstandard()  # fail at startup rather than on the first write
+        return Codec(codec, content_encoding="zstd")
+    if codec == StorageCodec.GZIP:
+        return Codec(codec, content_encoding="gzip")
+    return Codec(codec)
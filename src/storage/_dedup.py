@@ -0,0 +1,178 @@
+"""
+storage.dedup
+-------------
+Persistent, cross-day dedup index for stored headlines.
+
+Every stored headline is represented by a 64-bit hash of its headline and
+link, kept in a sorted NumPy array together with the day it was first seen.
+Membership tests are a vectorised binary search, O(new headlines * log n),
+instead of hashing the whole day's records into a key set, and an article
+that crosses midnight UTC is still recognised. Entries older than the
+retention window are pruned on every save.
+
+The index is not resident: every `append_headlines` loads it, inserts the new
+hashes (`np.insert` copies both arrays), and rewrites it along with the whole
+day file. An append therefore costs O(day + index) in I/O and copying, paid
+once per micro-batch in streaming mode. The array is 12 bytes per headline,
+so this stays small next to the day file.
+
+Appends are a read-modify-write of `index/dedup.bin` and the day file with no
+lock around them; the compaction lock only serialises aggregate compaction.
+Two overlapping runs appending at the same time can each read the same state,
+and the later write wins: the other run's headlines and hashes are lost, and
+a headline both runs fetched is counted in both runs' aggregate deltas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import struct
+from collections.abc import Iterable, Sequence
+from datetime import date as Date
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from data_models import Headline
+
+if TYPE_CHECKING:
+    from ._interface import StorageInterface
+
+logger = logging.getLogger(__name__)
+
+DEDUP_ARTIFACT = "index/dedup.bin"
+_MAGIC = b"DDX1"
+_HEADER = struct.Struct("<4sQ")
+
+
+def headline_hash(headline: str, link: str) -> int:
+    """Stable 64-bit content hash of a headline/link pair."""
+    digest = hashlib.blake2b(
+        f"{headline}\x00{link}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _day(iso_date: str) -> int:
+    return Date.fromisoformat(iso_date).toordinal()
+
+
+class DedupIndex:
+    """Sorted array of headline hashes with the day each was first stored."""
+
+    def __init__(
+        self, hashes: np.ndarray | None = None, days: np.ndarray | None = None
+    ) -> None:
+        self.hashes = hashes if hashes is not None else np.empty(0, np.uint64)
+        self.days = days if days is not None else np.empty(0, np.int32)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Vectorised membership test for an array of hashes."""
+        if not len(self.hashes):
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(self.hashes, keys)
+        positions[positions == len(self.hashes)] = 0
+        return self.hashes[positions] == keys
+
+    def add(self, keys: np.ndarray, iso_date: str) -> None:
+        """Insert hashes (assumed absent) first seen on `iso_date`."""
+        keys = np.unique(keys)
+        positions = np.searchsorted(self.hashes, keys)
+        self.hashes = np.insert(self.hashes, positions, keys)
+        self.days = np.insert(self.days, positions, np.int32(_day(iso_date)))
+
+    def filter_new(
+        self, headlines: Sequence[Headline], iso_date: str
+    ) -> list[Headline]:
+        """
+        Return the headlines not seen before, in order, and record them.
+
+        Duplicates within `headlines` itself are dropped as well.
+        """
+        if not headlines:
+            return []
+        keys = np.fromiter(
+            (headline_hash(h.headline, h.link) for h in headlines),
+            dtype=np.uint64,
+            count=len(headlines),
+        )
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        first = first[~self.contains(keys[first])]
+
+        self.add(keys[first], iso_date)
+        return [headlines[i] for i in first]
+
+    def prune(self, oldest_date: str) -> None:
+        """Drop entries first seen before `oldest_date`."""
+        keep = self.days >= _day(oldest_date)
+        self.hashes = self.hashes[keep]
+        self.days = self.days[keep]
+
+    def to_bytes(self) -> bytes:
+        return (
+            _HEADER.pack(_MAGIC, len(self.hashes))
+            + self.hashes.astype("<u8").tobytes()
+            + self.days.astype("<i4").tobytes()
+        )
+
+    @staticmethod
+    def from_bytes(data: bytes) -> DedupIndex:
+        magic, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a dedup index")
+        offset = _HEADER.size
+        hashes = np.frombuffer(data, "<u8", count, offset).astype(np.uint64)
+        days = np.frombuffer(data, "<i4", count, offset + 8 * count).astype(np.int32)
+        return DedupIndex(hashes, days)
+
+    @staticmethod
+    def from_records(records: Iterable[tuple[str, str, str]]) -> DedupIndex:
+        """Build an index from `(headline, link, iso_date)` triples."""
+        index = DedupIndex()
+        by_date: dict[str, list[int]] = {}
+        for headline, link, iso_date in records:
+            by_date.setdefault(iso_date, []).append(headline_hash(headline, link))
+        for iso_date in sorted(by_date):
+            keys = np.unique(np.array(by_date[iso_date], dtype=np.uint64))
+            index.add(keys[~index.contains(keys)], iso_date)
+        return index
+
+
+def load_dedup_index(
+    storage: StorageInterface, retention_days: int, today: str
+) -> DedupIndex:
+    """
+    Load the persisted index, bootstrapping it from stored headlines if absent.
+
+    Args:
+        storage (StorageInterface): Backend holding headlines and the index.
+        retention_days (int): Days of history the index covers.
+        today (str): Date being appended to, used for the bootstrap window.
+    """
+    data = storage.load_artifact(DEDUP_ARTIFACT)
+    if data is not None:
+        try:
+            return DedupIndex.from_bytes(data)
+        except (ValueError, struct.error):
+            logger.warning("Dedup index is corrupt, rebuilding it")
+
+    oldest = Date.fromordinal(_day(today) - retention_days).isoformat()
+    dates = [d for d in storage.list_headline_dates() if oldest <= d <= today]
+    return DedupIndex.from_records(
+        (item["headline"], item["link"], d)
+        for d in dates
+        for item in storage.load_headline_records(d)
+    )
+
+
+def save_dedup_index(
+    storage: StorageInterface, index: DedupIndex, retention_days: int, today: str
+) -> None:
+    """Prune entries outside the retention window and persist the index."""
+    index.prune(Date.fromordinal(_day(today) - retention_days).isoformat())
+    storage.save_artifact(DEDUP_ARTIFACT, index.to_bytes())
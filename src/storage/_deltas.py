@@ -0,0 +1,254 @@
+"""
+storage.deltas
+--------------
+Contention-free aggregate updates.
+
+Runs never read-modify-write the shared aggregates. Each run writes its
+contribution as an immutable delta object keyed by day and run id; writing
+the same run again (a retry) is a no-op, so updates are idempotent.
+
+Deltas are folded into the aggregates by `compact_aggregates`, the only
+step that takes a lock: a file lock locally, a conditionally created lock
+object on S3. If the lock is busy compaction is simply skipped, and the
+deltas are folded by a later run. The compaction ledger (an artifact) keeps,
+per recent day, the compacted aggregate and the ids of the deltas folded into
+it, so a crash between updating the ledger and deleting the folded deltas
+never counts a delta twice.
+
+Readers call `load_live_aggregates`, which adds the outstanding deltas to the
+stored aggregates on the fly.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from datetime import date as Date
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from data_models import RunningAggregate, merge_aggregates
+
+if TYPE_CHECKING:
+    from ._interface import StorageInterface
+
+COMPACTION_ARTIFACT = "aggregates/compacted.json"
+LEDGER_RETENTION_DAYS = 7
+
+
+def delta_id(date: str, run_id: str) -> str:
+    """Storage key of a run's delta for one day."""
+    return f"{date}_{run_id}"
+
+
+def delta_date(key: str) -> str:
+    return key.split("_", 1)[0]
+
+
+@dataclass
+class CompactedDay:
+    """A day's compacted aggregate and the deltas already folded into it."""
+
+    aggregate: RunningAggregate
+    folded: set[str] = field(default_factory=set)
+
+
+def _load_ledger(storage: StorageInterface) -> dict[str, CompactedDay]:
+    raw = storage.load_artifact(COMPACTION_ARTIFACT)
+    if not raw:
+        return {}
+    try:
+        return {
+            date: CompactedDay(RunningAggregate(**day["aggregate"]), set(day["folded"]))
+            for date, day in json.loads(raw).items()
+        }
+    except (ValueError, TypeError, KeyError):
+        return {}
+
+
+def _save_ledger(storage: StorageInterface, ledger: Mapping[str, CompactedDay]) -> None:
+    if ledger:
+        newest = Date.fromisoformat(max(ledger))
+        oldest = (newest - timedelta(days=LEDGER_RETENTION_DAYS)).isoformat()
+        ledger = {date: day for date, day in ledger.items() if date >= oldest}
+    data = {
+        date: {"aggregate": asdict(day.aggregate), "folded": sorted(day.folded)}
+        for date, day in sorted(ledger.items())
+    }
+    storage.save_artifact(
+        COMPACTION_ARTIFACT, json.dumps(data).encode("utf-8"), "application/json"
+    )
+
+
+def _base_aggregate(
+    date: str,
+    ledger: Mapping[str, CompactedDay],
+    current: RunningAggregate,
+    daily: Mapping[str, RunningAggregate],
+) -> RunningAggregate:
+    """The aggregate a day's outstanding deltas are added to."""
+    if date in ledger:
+        return ledger[date].aggregate
+    # Days compacted before the ledger existed, or pruned from it
+    if date == current.date:
+        return current
+    return daily.get(date, RunningAggregate(date=date))
+
+
+def record_aggregate_delta(
+    storage: StorageInterface, run_id: str, delta: RunningAggregate
+) -> None:
+    """
+    Record a run's contribution to a day's aggregate.
+
+    Args:
+        storage (StorageInterface): Storage backend.
+        run_id (str): Stable id of the run; retries must reuse it.
+        delta (RunningAggregate): The aggregate of the run's headlines alone.
+    """
+    storage.save_aggregate_delta(delta_id(delta.date, run_id), delta)
+
+
+def load_live_aggregates(
+    storage: StorageInterface,
+) -> tuple[RunningAggregate, dict[str, RunningAggregate]]:
+    """
+    The current and daily aggregates, including deltas not yet compacted.
+
+    Returns:
+        tuple[RunningAggregate, dict[str, RunningAggregate]]: The current
+        (latest) day's aggregate and the earlier days' aggregates by date.
+    """
+    with storage.batch() as batch:
+        reads = (
+            batch.read(storage.load_current_aggregate),
+            batch.read(storage.load_daily_aggregates),
+            batch.read(storage.load_aggregate_deltas),
+            batch.read(_load_ledger, storage),
+        )
+        current, daily, deltas, ledger = (read.result() for read in reads)
+    if not deltas:
+        return current, daily
+
+    pending: dict[str, list[RunningAggregate]] = defaultdict(list)
+    for key, delta in deltas.items():
+        date = delta_date(key)
+        if key not in ledger.get(date, CompactedDay(RunningAggregate())).folded:
+            pending[date].append(delta)
+
+    for date in sorted(pending):
+        live = merge_aggregates(
+            [_base_aggregate(date, ledger, current, daily), *pending[date]], date
+        )
+        if not current.date or date >= current.date:
+            if current.date and date > current.date:
+                daily[current.date] = current
+            current = live
+        else:
+            daily[date] = live
+    return current, daily
+
+
+def _materialize(
+    ledger: Mapping[str, CompactedDay],
+    dates: list[str],
+    current: RunningAggregate,
+) -> tuple[dict[str, RunningAggregate], RunningAggregate | None]:
+    """
+    The daily and current aggregates to write for the ledger's `dates`.
+
+    Returns:
+        tuple[dict[str, RunningAggregate], RunningAggregate | None]: Daily
+        aggregates by date, and the new current aggregate if it changed.
+    """
+    daily: dict[str, RunningAggregate] = {}
+    new_current: RunningAggregate | None = None
+    for date in sorted(dates):
+        aggregate = ledger[date].aggregate
+        if not current.date or date >= current.date:
+            if current.date and date > current.date:
+                # Roll over exactly once: afterwards current.date == date
+                daily[current.date] = current
+            current = new_current = aggregate
+        else:
+            daily[date] = aggregate
+    return daily, new_current
+
+
+def compact_aggregates(storage: StorageInterface, wait: float = 0.0) -> bool:
+    """
+    Fold the outstanding deltas into the current and daily aggregates.
+
+    Args:
+        storage (StorageInterface): Storage backend.
+        wait (float): Seconds to wait for the compaction lock.
+
+    Returns:
+        bool: False if another compaction held the lock; the deltas then stay
+        outstanding until a later compaction.
+    """
+    with storage.compaction_lock(wait) as acquired, storage.batch() as batch:
+        if not acquired:
+            return False
+
+        reads = (
+            batch.read(storage.load_aggregate_deltas),
+            batch.read(_load_ledger, storage),
+            batch.read(storage.load_current_aggregate),
+            batch.read(storage.load_daily_aggregates),
+        )
+        deltas, ledger, current, daily = (read.result() for read in reads)
+        if not deltas:
+            return True
+
+        by_date: dict[str, dict[str, RunningAggregate]] = defaultdict(dict)
+        for key, delta in deltas.items():
+            by_date[delta_date(key)][key] = delta
+
+        for date, day_deltas in by_date.items():
+            day = ledger.get(date) or CompactedDay(
+                _base_aggregate(date, ledger, current, daily)
+            )
+            new = [delta for key, delta in day_deltas.items() if key not in day.folded]
+            day.aggregate = merge_aggregates([day.aggregate, *new], date)
+            day.folded.update(day_deltas)
+            ledger[date] = day
+
+        # Ledger first: once it lists a delta, the delta can never count twice.
+        # The daily history before the current aggregate, so an interrupted
+        # rollover is redone by the next compaction.
+        daily_updates, new_current = _materialize(ledger, list(by_date), current)
+        batch.write(_save_ledger, storage, ledger, stage=0)
+        if daily_updates:
+            batch.write(storage.save_daily_aggregates, daily_updates, stage=1)
+        if new_current is not None:
+            batch.write(storage.save_current_aggregate, new_current, stage=2)
+        batch.write(storage.delete_aggregate_deltas, list(deltas), stage=3)
+        return True
+
+
+def reset_compacted_aggregates(
+    storage: StorageInterface, aggregates: Mapping[str, RunningAggregate]
+) -> None:
+    """
+    Replace compacted days with aggregates recomputed from stored headlines.
+
+    Used by rebuild and backfill: outstanding deltas of those days are
+    already counted in the recomputed aggregates, so they are marked folded.
+    """
+    with storage.compaction_lock(wait=60.0) as acquired:
+        if not acquired:
+            raise TimeoutError("Could not take the aggregate compaction lock")
+
+        ledger = _load_ledger(storage)
+        deltas = storage.load_aggregate_deltas()
+        folded = [key for key in deltas if delta_date(key) in aggregates]
+        for date, aggregate in aggregates.items():
+            previous = ledger.get(date, CompactedDay(aggregate)).folded
+            ledger[date] = CompactedDay(
+                aggregate, previous | {key for key in folded if delta_date(key) == date}
+            )
+        _save_ledger(storage, ledger)
+        storage.delete_aggregate_deltas(folded)
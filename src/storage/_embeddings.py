@@ -0,0 +1,266 @@
+"""
+storage.embeddings
+------------------
+Append-only, memory-mapped store of headline embeddings.
+
+Each day is one segment of two flat files: `{date}.f16`, a row-major float16
+matrix with one unit-length vector per headline, and `{date}.ids`, the
+matching uint64 headline ids (`headline_hash` of headline and link). Rows
+are only ever appended, vectors first and ids second; a day's row count is
+its id count, so a crash between the two writes leaves at most a torn tail
+that readers ignore and the next append truncates.
+
+Readers map segments with `np.memmap`, so searching a day reads it straight
+from the page cache without loading or copying it. `search` is brute force
+over the days not covered by an `IVFIndex`, and uses the index for the rest.
+
+The store is a local directory (`EMBEDDING_PATH`): with `STORAGE_MODE=s3` it
+should live on a persistent filesystem, since memory maps need one.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from data_models import Headline
+
+from ._dedup import headline_hash
+
+if TYPE_CHECKING:
+    from ._ivf import IVFIndex
+
+# Rows scored per matrix product, bounding the float32 copy of a chunk
+SEARCH_CHUNK_ROWS = 65_536
+
+
+@dataclass(frozen=True)
+class EmbeddingMatch:
+    """A search hit: the headline `id` stored on `date`."""
+
+    date: str
+    id: int
+    score: float
+
+
+def headline_ids(headlines: Iterable[Headline]) -> np.ndarray:
+    """The embedding ids of headlines, the same hash the dedup index uses."""
+    return np.array(
+        [headline_hash(h.headline, h.link) for h in headlines], dtype=np.uint64
+    )
+
+
+def top_k(
+    vectors: np.ndarray, query: np.ndarray, k: int, start: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Brute-force top-k rows of `vectors[start:]` by dot product with `query`.
+
+    Args:
+        vectors (np.ndarray): An `(n, dim)` matrix, typically a memory map.
+        query (np.ndarray): A float32 `(dim,)` vector.
+        k (int): Number of rows to return.
+        start (int): First row to consider.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Scores and row numbers, best first.
+    """
+    best_scores = np.empty(0, np.float32)
+    best_rows = np.empty(0, np.int64)
+    for chunk_start in range(start, len(vectors), SEARCH_CHUNK_ROWS):
+        chunk = np.asarray(vectors[chunk_start : chunk_start + SEARCH_CHUNK_ROWS])
+        scores = chunk.astype(np.float32) @ query
+        if len(scores) > k:
+            keep = np.argpartition(scores, -k)[-k:]
+        else:
+            keep = np.arange(len(scores))
+        best_scores = np.concatenate((best_scores, scores[keep]))
+        best_rows = np.concatenate((best_rows, keep + chunk_start))
+        if len(best_scores) > k:
+            keep = np.argpartition(best_scores, -k)[-k:]
+            best_scores, best_rows = best_scores[keep], best_rows[keep]
+    order = np.argsort(-best_scores, kind="stable")
+    return best_scores[order], best_rows[order]
+
+
+def merge_matches(matches: Iterable[EmbeddingMatch], k: int) -> list[EmbeddingMatch]:
+    """The `k` best of several result lists, best first."""
+    return sorted(matches, key=lambda m: m.score, reverse=True)[:k]
+
+
+class EmbeddingStore:
+    """Per-day, append-only embedding segments under one directory."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._meta_file = self.root / "meta.json"
+        self._lock_file = self.root / ".append.lock"
+
+    @property
+    def dim(self) -> int | None:
+        """Vector width, fixed by the first append."""
+        if not self._meta_file.exists():
+            return None
+        return int(json.loads(self._meta_file.read_text())["dim"])
+
+    def _vectors_file(self, date: str) -> Path:
+        return self.root / f"{date}.f16"
+
+    def _ids_file(self, date: str) -> Path:
+        return self.root / f"{date}.ids"
+
+    def dates(self) -> list[str]:
+        return sorted(p.stem for p in self.root.glob("*.ids"))
+
+    def ids(self, date: str) -> np.ndarray:
+        """The ids of a day's rows, memory-mapped."""
+        path = self._ids_file(date)
+        if not path.exists() or path.stat().st_size < 8:
+            return np.empty(0, np.uint64)
+        count = path.stat().st_size // 8
+        return np.memmap(path, dtype=np.uint64, mode="r", shape=(count,))
+
+    def vectors(self, date: str) -> np.ndarray:
+        """A day's `(rows, dim)` float16 matrix, memory-mapped."""
+        dim = self.dim
+        count = len(self.ids(date))
+        if dim is None or count == 0:
+            return np.empty((0, dim or 0), np.float16)
+        return np.memmap(
+            self._vectors_file(date), dtype=np.float16, mode="r", shape=(count, dim)
+        )
+
+    def __len__(self) -> int:
+        return sum(len(self.ids(date)) for date in self.dates())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self._lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append(self, date: str, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """
+        Append a day's new embeddings.
+
+        Args:
+            date (str): Day the headlines are stored under.
+            ids (np.ndarray): uint64 headline ids, see `headline_ids`.
+            vectors (np.ndarray): `(len(ids), dim)` unit-length vectors.
+
+        Returns:
+            int: Rows appended; ids already stored for the day are skipped.
+        """
+        ids = np.asarray(ids, dtype=np.uint64)
+        vectors = np.asarray(vectors, dtype=np.float16)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if len(ids) == 0:
+            return 0
+
+        with self._locked():
+            dim = self.dim
+            if dim is None:
+                dim = vectors.shape[1]
+                self._meta_file.write_text(json.dumps({"dim": dim}))
+            if vectors.shape[1] != dim:
+                raise ValueError(f"Expected {dim}-dimensional vectors")
+
+            existing = np.array(self.ids(date))
+            # First occurrence of each id not stored yet
+            _, first = np.unique(ids, return_index=True)
+            first = np.sort(first)
+            new = first[~np.isin(ids[first], existing)]
+            if len(new) == 0:
+                return 0
+
+            vectors_file = self._vectors_file(date)
+            with open(vectors_file, "ab") as f:
+                # Drop a torn tail left by an append that died before its ids
+                f.truncate(len(existing) * dim * 2)
+                f.write(np.ascontiguousarray(vectors[new]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._ids_file(date), "ab") as f:
+                f.write(ids[new].tobytes())
+            return len(new)
+
+    def get(self, date: str, id: int) -> np.ndarray | None:
+        """The vector stored for headline `id` on `date`, if any."""
+        rows = np.flatnonzero(self.ids(date) == np.uint64(id))
+        return None if len(rows) == 0 else np.array(self.vectors(date)[rows[0]])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        dates: Sequence[str] | None = None,
+        index: IVFIndex | None = None,
+        nprobe: int = 8,
+    ) -> list[EmbeddingMatch]:
+        """
+        Top-k stored headlines by cosine similarity to `query`.
+
+        Rows covered by `index` are searched through it; everything appended
+        since it was built (recent days, and rows added to a covered day
+        afterwards) is searched exhaustively.
+
+        Args:
+            query (np.ndarray): A `(dim,)` vector.
+            k (int): Number of matches.
+            dates (Sequence[str] | None): Days to search, all if None.
+            index (IVFIndex | None): Index over the older history.
+            nprobe (int): Index lists probed, see `IVFIndex.search`.
+
+        Returns:
+            list[EmbeddingMatch]: Matches, best first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        dates = self.dates() if dates is None else list(dates)
+
+        matches: list[EmbeddingMatch] = []
+        indexed: dict[str, int] = {}
+        if index is not None:
+            wanted = set(dates)
+            indexed = {d: n for d, n in index.counts.items() if d in wanted}
+            restrict = len(indexed) < len(index.counts)
+            matches.extend(
+                index.search(query, k, nprobe, dates=indexed if restrict else None)
+            )
+
+        for date in dates:
+            ids = self.ids(date)
+            scores, rows = top_k(self.vectors(date), query, k, indexed.get(date, 0))
+            matches.extend(
+                EmbeddingMatch(date, int(ids[row]), float(score))
+                for score, row in zip(scores, rows)
+            )
+        return merge_matches(matches, k)
+
+    def related(
+        self,
+        date: str,
+        id: int,
+        k: int = 10,
+        index: IVFIndex | None = None,
+        nprobe: int = 8,
+    ) -> list[EmbeddingMatch]:
+        """Headlines most similar to the stored headline `id`, excluding itself."""
+        vector = self.get(date, id)
+        if vector is None:
+            return []
+        matches = self.search(vector, k + 1, index=index, nprobe=nprobe)
+        return [m for m in matches if (m.date, m.id) != (date, id)][:k]
@@ -1,15 +1,17 @@
 # src/storage/factory.py
-from core.env import ENV, StorageMode
+from core.env import StorageMode, get_env
 
+from ._codecs import get_codec
 from ._interface import StorageInterface
-from ._local_storage import LocalStorage
-from ._s3_storage import S3Storage
 
 
 def get_storage(backend: StorageMode) -> StorageInterface:
     """
     Factory function to get a storage backend.
 
+    Backend modules are imported only when selected, so LOCAL runs never
+    pay for importing boto3.
+
     Args:
         backend (str): "local" or "s3"
         kwargs: Additional keyword args for storage init
@@ -17,11 +19,24 @@ def get_storage(backend: StorageMode) -> StorageInterface:
     Returns:
         Storage: Instance of storage backend
     """
+    env = get_env()
     if backend == StorageMode.LOCAL:
-        return LocalStorage(data_dir=ENV.local_data_path)
+        from ._local_storage import LocalStorage
+
+        return LocalStorage(
+            data_dir=env.local_data_path,
+            dedup_retention_days=env.dedup_retention_days,
+            codec=get_codec(env.storage_codec),
+        )
     if backend == StorageMode.S3:
-        assert ENV.s3_bucket is not None
-        assert ENV.aws_region is not None
-        return S3Storage(bucket_name=ENV.s3_bucket, region_name=ENV.aws_region)
+        from ._s3_storage import S3Storage
+
+        assert env.s3_bucket is not None
+        return S3Storage(
+            bucket_name=env.s3_bucket,
+            region_name=env.aws_region,
+            dedup_retention_days=env.dedup_retention_days,
+            codec=get_codec(env.storage_codec),
+        )
 
     raise ValueError(f"Unknown storage backend: {backend}")
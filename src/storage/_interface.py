@@ -1,27 +1,69 @@
 # src/storage/storage.py
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from contextlib import AbstractContextManager
+from typing import Any
 
 from data_models import Headline, RunningAggregate
 
+from ._batch import StorageBatch
+
 
 class StorageInterface(ABC):
     """Abstract base class for storage backends."""
 
     @abstractmethod
-    def append_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
-        """Append new headlines to existing records."""
+    def append_headlines(
+        self, date: str, headlines: Iterable[Headline]
+    ) -> list[Headline]:
+        """Append new headlines to existing records; returns those stored."""
+
+    @abstractmethod
+    def new_headlines(self, date: str, headlines: Iterable[Headline]) -> list[Headline]:
+        """The headlines `append_headlines` would store now, without storing them."""
 
     @abstractmethod
     def load_headlines(self, date: str | None = None) -> Iterable[Headline]:
         """Load headlines for a given date or all if none provided."""
 
+    @abstractmethod
+    def load_headline_records(self, date: str) -> list[dict[str, Any]]:
+        """Load a day's headlines as raw records, skipping `Headline` construction."""
+
+    @abstractmethod
+    def list_headline_dates(self) -> list[str]:
+        """List the dates (YYYY-MM-DD) that have stored headlines, oldest first."""
+
+    @abstractmethod
+    def replace_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
+        """Atomically overwrite the stored headlines for a date."""
+
     @abstractmethod
     def save_daily_aggregate(
         self, date: str, aggregate_score: RunningAggregate
     ) -> None:
         """Save or update a daily sentiment aggregate."""
 
+    @abstractmethod
+    def load_daily_aggregates(self) -> dict[str, RunningAggregate]:
+        """Load the historical daily aggregates, keyed by date."""
+
+    @abstractmethod
+    def save_daily_aggregates(self, aggregates: Mapping[str, RunningAggregate]) -> None:
+        """Save or update many daily aggregates, keyed by date, in one write."""
+
+    @abstractmethod
+    def save_topic_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Save or update per-topic aggregates, keyed by date then topic."""
+
+    @abstractmethod
+    def save_entity_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Save or update per-entity aggregates, keyed by date then symbol."""
+
     @abstractmethod
     def save_current_aggregate(self, current_score: RunningAggregate) -> None:
         """Overwrite current day's aggregate sentiment."""
@@ -33,3 +75,38 @@ class StorageInterface(ABC):
     @abstractmethod
     def clear_current_aggregate(self) -> None:
         """Delete the file representing current aggregate."""
+
+    @abstractmethod
+    def save_aggregate_delta(self, key: str, delta: RunningAggregate) -> None:
+        """Write an immutable aggregate delta; rewriting an existing key is a no-op."""
+
+    @abstractmethod
+    def load_aggregate_deltas(self) -> dict[str, RunningAggregate]:
+        """Load the outstanding aggregate deltas, keyed by delta key."""
+
+    @abstractmethod
+    def delete_aggregate_deltas(self, keys: Iterable[str]) -> None:
+        """Delete compacted aggregate deltas."""
+
+    @abstractmethod
+    def compaction_lock(self, wait: float = 0.0) -> AbstractContextManager[bool]:
+        """Try to take the aggregate compaction lock; yields whether it was taken."""
+
+    @abstractmethod
+    def save_artifact(
+        self, name: str, data: bytes, content_type: str = "application/octet-stream"
+    ) -> None:
+        """Write an opaque artifact (profiles, reports, ...) under `artifacts/`."""
+
+    @abstractmethod
+    def load_artifact(self, name: str) -> bytes | None:
+        """Read an artifact written by `save_artifact`, or None if missing."""
+
+    def batch(self, max_workers: int = 8) -> StorageBatch:
+        """
+        Start a unit of work on this backend.
+
+        Use as a context manager: queued writes commit, stage by stage, when
+        the block exits without an error.
+        """
+        return StorageBatch(max_workers)
@@ -0,0 +1,253 @@
+"""
+storage.ivf
+-----------
+Inverted-file (IVF) index over the embedding history.
+
+Vectors are clustered with spherical k-means into `nlist` lists, and the
+index stores them grouped by list in one contiguous, memory-mapped float16
+matrix. A query is compared with the `nlist` centroids, and only the
+`nprobe` closest lists, each a contiguous slice of the matrix, are scored.
+With `nlist ~ sqrt(n)` a search reads about `nprobe / sqrt(n)` of the
+vectors, at the cost of missing neighbours filed under an unprobed list;
+`nprobe` trades recall for speed.
+
+The index is rebuilt offline (`main.py index-embeddings`) and records how
+many rows of each day it covers; `EmbeddingStore.search` scans whatever was
+appended since exhaustively.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import shutil
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date as Date
+from pathlib import Path
+
+import numpy as np
+
+from ._embeddings import EmbeddingMatch, EmbeddingStore, merge_matches, top_k
+
+INDEX_DIR = "ivf"
+# Rows assigned to centroids per matrix product while building
+ASSIGN_CHUNK_ROWS = 32_768
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """The closest centroid of each row, in chunks."""
+    lists = np.empty(len(vectors), np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK_ROWS):
+        chunk = np.asarray(vectors[start : start + ASSIGN_CHUNK_ROWS], np.float32)
+        lists[start : start + len(chunk)] = (chunk @ centroids.T).argmax(axis=1)
+    return lists
+
+
+def train_centroids(
+    sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """
+    Spherical k-means: unit-length centroids maximising cosine similarity.
+
+    Args:
+        sample (np.ndarray): `(n, dim)` training vectors, `n >= nlist`.
+        nlist (int): Number of centroids.
+        iterations (int): Lloyd iterations.
+        seed (int): Seed of the initial centroid choice.
+
+    Returns:
+        np.ndarray: A float32 `(nlist, dim)` array.
+    """
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(sample, np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        lists = _assign(sample, centroids)
+        sizes = np.bincount(lists, minlength=nlist)
+        bounds = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        filled = sizes > 0
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(
+            sample[np.argsort(lists, kind="stable")], bounds[filled]
+        )
+        # Re-seed empty lists with random sample vectors
+        sums[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+@dataclass
+class IVFIndex:
+    """Centroids plus the indexed vectors, grouped by list."""
+
+    centroids: np.ndarray
+    offsets: np.ndarray
+    vectors: np.ndarray
+    ids: np.ndarray
+    days: np.ndarray
+    counts: dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def build(
+        store: EmbeddingStore,
+        path: str | Path | None = None,
+        nlist: int | None = None,
+        sample_per_list: int = 64,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """
+        Index every vector currently in `store`.
+
+        Args:
+            store (EmbeddingStore): Source of the vectors.
+            path (str | Path | None): Index directory, `<store>/ivf` if None.
+            nlist (int | None): Lists; defaults to `sqrt(n)`.
+            sample_per_list (int): Training vectors per list for k-means.
+            iterations (int): k-means iterations.
+            seed (int): Seed of sampling and initialisation.
+
+        Returns:
+            IVFIndex: The saved index, memory-mapped.
+        """
+        path = Path(path) if path is not None else store.root / INDEX_DIR
+        dates = store.dates()
+        sources = [store.vectors(d) for d in dates]
+        counts = {d: len(v) for d, v in zip(dates, sources) if len(v)}
+        starts = np.cumsum([0] + [len(v) for v in sources])
+        total = int(starts[-1])
+        if total == 0:
+            raise ValueError("No embeddings to index")
+
+        nlist = min(nlist or max(int(math.sqrt(total)), 1), total)
+        rng = np.random.default_rng(seed)
+        picks = np.sort(
+            rng.choice(total, min(total, nlist * sample_per_list), replace=False)
+        )
+        sample = np.concatenate(
+            [
+                np.asarray(source[picks[(picks >= lo) & (picks < hi)] - lo])
+                for source, lo, hi in zip(sources, starts[:-1], starts[1:])
+            ]
+        )
+        centroids = train_centroids(sample, nlist, iterations, seed)
+
+        lists = np.concatenate([_assign(source, centroids) for source in sources])
+        order = np.argsort(lists, kind="stable")
+        offsets = np.searchsorted(lists[order], np.arange(nlist + 1)).astype(np.int64)
+
+        # Built next to the live index and swapped in, so readers that have
+        # the old files mapped keep a consistent (if stale) index
+        building = path.with_name(path.name + ".tmp")
+        shutil.rmtree(building, ignore_errors=True)
+        building.mkdir(parents=True)
+        dim = centroids.shape[1]
+        vectors = np.lib.format.open_memmap(
+            building / "vectors.npy", mode="w+", dtype=np.float16, shape=(total, dim)
+        )
+        ids = np.empty(total, np.uint64)
+        days = np.empty(total, np.int32)
+        # Copy rows into list order, a chunk at a time, one day segment at a time
+        for chunk_start in range(0, total, ASSIGN_CHUNK_ROWS):
+            rows = order[chunk_start : chunk_start + ASSIGN_CHUNK_ROWS]
+            owner = np.searchsorted(starts, rows, side="right") - 1
+            out = np.empty((len(rows), dim), np.float16)
+            for day in np.unique(owner):
+                mine = owner == day
+                local = rows[mine] - starts[day]
+                out[mine] = sources[day][local]
+                ids[chunk_start : chunk_start + len(rows)][mine] = store.ids(
+                    dates[day]
+                )[local]
+                days[chunk_start : chunk_start + len(rows)][mine] = Date.fromisoformat(
+                    dates[day]
+                ).toordinal()
+            vectors[chunk_start : chunk_start + len(rows)] = out
+        vectors.flush()
+        del vectors
+
+        np.save(building / "centroids.npy", centroids)
+        np.save(building / "offsets.npy", offsets)
+        np.save(building / "ids.npy", ids)
+        np.save(building / "days.npy", days)
+        (building / "meta.json").write_text(json.dumps({"counts": counts}))
+
+        retired = path.with_name(path.name + ".old")
+        shutil.rmtree(retired, ignore_errors=True)
+        if path.exists():
+            path.rename(retired)
+        building.rename(path)
+        shutil.rmtree(retired, ignore_errors=True)
+        return IVFIndex.load(path)
+
+    @staticmethod
+    def load(path: str | Path) -> IVFIndex:
+        path = Path(path)
+        return IVFIndex(
+            centroids=np.load(path / "centroids.npy"),
+            offsets=np.load(path / "offsets.npy"),
+            vectors=np.load(path / "vectors.npy", mmap_mode="r"),
+            ids=np.load(path / "ids.npy", mmap_mode="r"),
+            days=np.load(path / "days.npy", mmap_mode="r"),
+            counts=json.loads((path / "meta.json").read_text())["counts"],
+        )
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        nprobe: int = 8,
+        dates: Collection[str] | None = None,
+    ) -> list[EmbeddingMatch]:
+        """
+        Approximate top-k by cosine similarity.
+
+        Args:
+            query (np.ndarray): A unit-length `(dim,)` vector.
+            k (int): Number of matches.
+            nprobe (int): Closest lists scored; more is slower and more exact.
+            dates (Collection[str] | None): Only return matches of these
+                days; all indexed days if None.
+
+        Returns:
+            list[EmbeddingMatch]: Matches, best first.
+        """
+        query = np.asarray(query, np.float32)
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        allowed = (
+            None
+            if dates is None
+            else np.array([Date.fromisoformat(d).toordinal() for d in dates])
+        )
+
+        matches: list[EmbeddingMatch] = []
+        for probe in probes:
+            lo, hi = int(self.offsets[probe]), int(self.offsets[probe + 1])
+            rows = np.arange(lo, hi)
+            if allowed is not None:
+                rows = rows[np.isin(self.days[lo:hi], allowed)]
+            if len(rows) == 0:
+                continue
+            if len(rows) == hi - lo:
+                scores, hits = top_k(self.vectors[lo:hi], query, k)
+            else:
+                scores, hits = top_k(self.vectors[rows], query, k)
+            matches.extend(
+                EmbeddingMatch(
+                    Date.fromordinal(int(self.days[row])).isoformat(),
+                    int(self.ids[row]),
+                    float(score),
+                )
+                for score, row in zip(scores, rows[hits])
+            )
+        return merge_matches(matches, k)
@@ -1,56 +1,78 @@
-import json
+import fcntl
 import logging
-from collections.abc import Iterable
+import os
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from dataclasses import asdict
 from pathlib import Path
-
-from data_models import Headline, RunningAggregate
-
+from typing import Any
+
+from core.env import StorageCodec
+from data_models import (
+    Headline,
+    RunningAggregate,
+    headlines_from_records,
+    headlines_to_records,
+)
+
+from ._codecs import Codec, decode, get_codec
+from ._dedup import load_dedup_index, save_dedup_index
 from ._interface import StorageInterface
 
 logger = logging.getLogger(__name__)
 
 
 class LocalStorage(StorageInterface):
-    """Save data to local CSV or JSON files."""
+    """Save data to local JSON files, compressed with the configured codec."""
 
-    def __init__(self, data_dir: str) -> None:
+    def __init__(
+        self,
+        data_dir: str,
+        dedup_retention_days: int = 7,
+        codec: Codec | None = None,
+    ) -> None:
+        self.dedup_retention_days = dedup_retention_days
+        self.codec = codec or get_codec(StorageCodec.GZIP)
         data_dir_path = Path(data_dir)
         data_dir_path.mkdir(parents=True, exist_ok=True)
 
         self.headlines_dir = data_dir_path / "headlines"
         self.aggregates_file = data_dir_path / "daily_aggregates.json"
+        self.topic_aggregates_file = data_dir_path / "topic_aggregates.json"
+        self.entity_aggregates_file = data_dir_path / "entity_aggregates.json"
         self.current_aggregate_file = data_dir_path / "current_aggregate.json"
+        self.deltas_dir = data_dir_path / "aggregate_deltas"
+        self.lock_file = data_dir_path / ".compaction.lock"
+        self.artifacts_dir = data_dir_path / "artifacts"
 
         self.headlines_dir.mkdir(parents=True, exist_ok=True)
+        self.deltas_dir.mkdir(parents=True, exist_ok=True)
         self.aggregates_file.touch(exist_ok=True)
         self.current_aggregate_file.touch(exist_ok=True)
 
-    def append_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
-        """Append new headlines to existing records."""
+    def append_headlines(
+        self, date: str, headlines: Iterable[Headline]
+    ) -> list[Headline]:
+        """Append headlines not already stored on this or a recent day."""
+        index = load_dedup_index(self, self.dedup_retention_days, date)
+        new_headlines = index.filter_new(list(headlines), date)
+        if not new_headlines:
+            return []
 
         file_path = self.headlines_dir / f"{date}.json"
 
-        existing: list[dict[str, str | int | float]] = []
-        if file_path.exists():
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
-            except json.JSONDecodeError:
-                existing = []
-
-        new_items = [asdict(h) for h in headlines]
+        existing: list[dict[str, Any]] = self._read_json(file_path, [])
+        self._write_json(file_path, existing + headlines_to_records(new_headlines))
 
-        # Deduplicate by unique headline/link combination
-        existing_keys = {(item["headline"], item["link"]) for item in existing}
-        merged = existing + [
-            item
-            for item in new_items
-            if (item["headline"], item["link"]) not in existing_keys
-        ]
+        # Written after the headlines so a failed write never hides them
+        save_dedup_index(self, index, self.dedup_retention_days, date)
+        return new_headlines
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(merged, f, indent=2)
+    def new_headlines(self, date: str, headlines: Iterable[Headline]) -> list[Headline]:
+        """The headlines `append_headlines` would store, without storing them."""
+        index = load_dedup_index(self, self.dedup_retention_days, date)
+        return index.filter_new(list(headlines), date)
 
     def load_headlines(self, date: str | None = None) -> Iterable[Headline]:
         """Load headlines for a given date or all if none provided."""
@@ -62,49 +84,145 @@ class LocalStorage(StorageInterface):
 
         results: list[Headline] = []
         for file in files:
-            if not file.exists():
-                continue
-            with open(file, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    results.extend(Headline(**item) for item in data)
-                except json.JSONDecodeError:
-                    continue
+            results.extend(headlines_from_records(self._read_json(file, [])))
         return results
 
+    def load_headline_records(self, date: str) -> list[dict[str, Any]]:
+        """Load a day's headlines as raw JSON records."""
+        return self._read_json(self.headlines_dir / f"{date}.json", [])
+
+    def list_headline_dates(self) -> list[str]:
+        """List the dates that have a headlines file."""
+        return sorted(p.stem for p in self.headlines_dir.glob("*.json"))
+
+    def replace_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
+        """Overwrite a day's headlines via a temporary file and an atomic rename."""
+        file_path = self.headlines_dir / f"{date}.json"
+        tmp_path = file_path.with_suffix(".json.tmp")
+
+        self._write_json(tmp_path, headlines_to_records(headlines))
+        os.replace(tmp_path, file_path)
+
     def save_daily_aggregate(
         self, date: str, aggregate_score: RunningAggregate
     ) -> None:
         """Save or update a daily sentiment aggregate to historical aggregate data."""
-        data: dict[str, dict[str, str | int | float]] = {}
-        if self.aggregates_file.exists():
-            with open(self.aggregates_file, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    data = {}
+        data = self._read_json(self.aggregates_file, {})
         data[date] = asdict(aggregate_score)
-        with open(self.aggregates_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        self._write_json(self.aggregates_file, data)
+
+    def load_daily_aggregates(self) -> dict[str, RunningAggregate]:
+        """Load the historical daily aggregates, keyed by date."""
+        data = self._read_json(self.aggregates_file, {})
+        return {date: RunningAggregate(**agg) for date, agg in sorted(data.items())}
+
+    def save_daily_aggregates(self, aggregates: Mapping[str, RunningAggregate]) -> None:
+        """Merge many daily aggregates into the historical aggregate file."""
+        data = self._read_json(self.aggregates_file, {})
+        data.update({date: asdict(agg) for date, agg in aggregates.items()})
+        self._write_json(self.aggregates_file, data)
+
+    def save_topic_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Merge per-topic aggregates into the topic aggregate file."""
+        data = self._read_json(self.topic_aggregates_file, {})
+        for date, topics in aggregates.items():
+            data[date] = {topic: asdict(agg) for topic, agg in topics.items()}
+        self._write_json(self.topic_aggregates_file, data)
+
+    def save_entity_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Merge per-entity aggregates into the entity aggregate file."""
+        data = self._read_json(self.entity_aggregates_file, {})
+        for date, entities in aggregates.items():
+            data[date] = {symbol: asdict(agg) for symbol, agg in entities.items()}
+        self._write_json(self.entity_aggregates_file, data)
+
+    @staticmethod
+    def _read_json(file_path: Path, default: Any) -> Any:
+        """Decode a file written by any codec, or `default` if missing/invalid."""
+        if not file_path.exists():
+            return default
+        try:
+            return decode(file_path.read_bytes())
+        except (ValueError, OSError, EOFError):
+            return default
+
+    def _write_json(self, file_path: Path, value: Any) -> None:
+        file_path.write_bytes(self.codec.encode(value))
 
     def save_current_aggregate(self, current_score: RunningAggregate) -> None:
         """Overwrite current day's aggregate sentiment."""
 
-        with open(self.current_aggregate_file, "w", encoding="utf-8") as f:
-            json.dump(asdict(current_score), f, indent=2)
+        self._write_json(self.current_aggregate_file, asdict(current_score))
 
     def load_current_aggregate(self) -> RunningAggregate:
         """Load current aggregate aggregate."""
-        if not self.current_aggregate_file.exists():
+        current_aggregate = self._read_json(self.current_aggregate_file, None)
+        if not current_aggregate:
             return RunningAggregate()
-        with open(self.current_aggregate_file, "r", encoding="utf-8") as f:
-            try:
-                current_aggregate = json.load(f)
-                return RunningAggregate(**current_aggregate)
-            except json.JSONDecodeError:
-                return RunningAggregate()
+        return RunningAggregate(**current_aggregate)
 
     def clear_current_aggregate(self) -> None:
         """Delete the current aggregate file to start a new day."""
         if self.current_aggregate_file.exists():
             self.current_aggregate_file.unlink()
+
+    def save_aggregate_delta(self, key: str, delta: RunningAggregate) -> None:
+        """Write a delta file unless one already exists under `key`."""
+        file_path = self.deltas_dir / f"{key}.json"
+        if file_path.exists():
+            return
+        tmp_path = file_path.with_suffix(".json.tmp")
+        self._write_json(tmp_path, asdict(delta))
+        os.replace(tmp_path, file_path)
+
+    def load_aggregate_deltas(self) -> dict[str, RunningAggregate]:
+        """Load every delta file, keyed by file name."""
+        deltas: dict[str, RunningAggregate] = {}
+        for file_path in sorted(self.deltas_dir.glob("*.json")):
+            data = self._read_json(file_path, None)
+            if data:
+                deltas[file_path.stem] = RunningAggregate(**data)
+        return deltas
+
+    def delete_aggregate_deltas(self, keys: Iterable[str]) -> None:
+        """Delete delta files."""
+        for key in keys:
+            (self.deltas_dir / f"{key}.json").unlink(missing_ok=True)
+
+    @contextmanager
+    def compaction_lock(self, wait: float = 0.0) -> Iterator[bool]:
+        """Exclusive `flock` on a lock file, released even if the process dies."""
+        with open(self.lock_file, "a") as f:
+            deadline = time.monotonic() + wait
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(0.1)
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def save_artifact(
+        self, name: str, data: bytes, content_type: str = "application/octet-stream"
+    ) -> None:
+        """Write an artifact file below the local artifacts directory."""
+        file_path = self.artifacts_dir / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+
+    def load_artifact(self, name: str) -> bytes | None:
+        """Read an artifact file, or None if it does not exist."""
+        file_path = self.artifacts_dir / name
+        if not file_path.exists():
+            return None
+        return file_path.read_bytes()
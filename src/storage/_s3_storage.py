@@ -1,25 +1,49 @@
-import json
 import logging
-from collections.abc import Iterable
+import time
+import uuid
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import boto3
 from botocore.exceptions import ClientError
 
-from data_models import Headline, RunningAggregate
+from core.env import StorageCodec
+from data_models import (
+    Headline,
+    RunningAggregate,
+    headlines_from_records,
+    headlines_to_records,
+)
 
+from ._codecs import JSON_CONTENT_TYPE, Codec, decode, get_codec
+from ._dedup import load_dedup_index, save_dedup_index
 from ._interface import StorageInterface
 
 logger = logging.getLogger(__name__)
 
+# A compaction that has not released its lock after this long is presumed dead
+COMPACTION_LOCK_TTL = timedelta(minutes=5)
+
 
 class S3Storage(StorageInterface):
     """Save and load data from an S3 bucket."""
 
-    def __init__(self, bucket_name: str, prefix: str = "data") -> None:
+    def __init__(
+        self,
+        bucket_name: str,
+        prefix: str = "data",
+        region_name: str | None = None,
+        dedup_retention_days: int = 7,
+        codec: Codec | None = None,
+    ) -> None:
+        self.dedup_retention_days = dedup_retention_days
+        self.codec = codec or get_codec(StorageCodec.GZIP)
         self.bucket_name = bucket_name
         self.prefix = prefix.strip("/")
-        self.s3 = boto3.client("s3")  # type: ignore
+        self.s3 = boto3.client("s3", region_name=region_name)  # type: ignore
 
         # Test connectivity
         try:
@@ -39,7 +63,7 @@ class S3Storage(StorageInterface):
     ) -> dict[str, str | int | float] | list[str | int | float] | None:
         try:
             resp = self.s3.get_object(Bucket=self.bucket_name, Key=key)
-            return json.loads(resp["Body"].read().decode("utf-8"))
+            return decode(resp["Body"].read())
         except self.s3.exceptions.NoSuchKey:
             return None
         except ClientError as e:
@@ -53,42 +77,56 @@ class S3Storage(StorageInterface):
                 return None
             logger.warning("Error fetching %s: %s", key, e)
             return None
-        except json.JSONDecodeError:
+        except ValueError:
             return None
 
     def _put_object_json(
-        self, key: str, data: dict[str, str | int | float] | list[str | int | float]
-    ) -> None:
+        self,
+        key: str,
+        data: dict[str, str | int | float] | list[str | int | float],
+        **conditions: str,
+    ) -> str:
+        """Write `data` with the codec; returns the new object's ETag."""
+        extra: dict[str, str] = dict(conditions)
+        if self.codec.content_encoding:
+            extra["ContentEncoding"] = self.codec.content_encoding
         try:
-            self.s3.put_object(
+            resp = self.s3.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=json.dumps(data, indent=2).encode("utf-8"),
-                ContentType="application/json",
+                Body=self.codec.encode(data),
+                ContentType=JSON_CONTENT_TYPE,
+                **extra,
             )
         except ClientError as e:
             logger.error("Error writing to %s: %s", key, e)
             raise
+        return resp["ETag"]
 
     # ---------- Main interface ----------
 
-    def append_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
-        """Append new headlines to an S3 JSON object for the given date."""
-        key = self._object_key("headlines", f"{date}.json")
+    def append_headlines(
+        self, date: str, headlines: Iterable[Headline]
+    ) -> list[Headline]:
+        """Append headlines not already stored on this or a recent day."""
+        index = load_dedup_index(self, self.dedup_retention_days, date)
+        new_headlines = index.filter_new(list(headlines), date)
+        if not new_headlines:
+            return []
 
+        key = self._object_key("headlines", f"{date}.json")
         existing: list[dict[str, str | int | float]] = self._get_object_json(key) or []
-        new_items = [asdict(h) for h in headlines]
-
-        # Deduplicate by headline + link
-        existing_keys = {(item["headline"], item["link"]) for item in existing}
-        merged = existing + [
-            item
-            for item in new_items
-            if (item["headline"], item["link"]) not in existing_keys
-        ]
+        self._put_object_json(key, existing + headlines_to_records(new_headlines))
+        logger.info("Appended %d headlines to %s", len(new_headlines), key)
 
-        self._put_object_json(key, merged)
-        logger.info("Appended %d headlines to %s", len(new_items), key)
+        # Written after the headlines so a failed write never hides them
+        save_dedup_index(self, index, self.dedup_retention_days, date)
+        return new_headlines
+
+    def new_headlines(self, date: str, headlines: Iterable[Headline]) -> list[Headline]:
+        """The headlines `append_headlines` would store, without storing them."""
+        index = load_dedup_index(self, self.dedup_retention_days, date)
+        return index.filter_new(list(headlines), date)
 
     def load_headlines(self, date: str | None = None) -> Iterable[Headline]:
         """Load headlines for a given date or all available."""
@@ -97,7 +135,7 @@ class S3Storage(StorageInterface):
             key = self._object_key("headlines", f"{date}.json")
             data = self._get_object_json(key)
             if isinstance(data, list):
-                results.extend(Headline(**item) for item in data)
+                results.extend(headlines_from_records(data))
             return results
 
         # If no date provided, list all objects under 'headlines/'
@@ -107,9 +145,33 @@ class S3Storage(StorageInterface):
             key = obj["Key"]
             data = self._get_object_json(key)
             if isinstance(data, list):
-                results.extend(Headline(**item) for item in data)
+                results.extend(headlines_from_records(data))
         return results
 
+    def load_headline_records(self, date: str) -> list[dict[str, Any]]:
+        """Load a day's headlines as raw JSON records."""
+        key = self._object_key("headlines", f"{date}.json")
+        data = self._get_object_json(key)
+        return data if isinstance(data, list) else []  # type: ignore
+
+    def list_headline_dates(self) -> list[str]:
+        """List the dates that have a headlines object."""
+        prefix = self._object_key("headlines") + "/"
+        paginator = self.s3.get_paginator("list_objects_v2")
+
+        dates: list[str] = []
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                name = obj["Key"].rsplit("/", 1)[-1]
+                if name.endswith(".json"):
+                    dates.append(name.removesuffix(".json"))
+        return sorted(dates)
+
+    def replace_headlines(self, date: str, headlines: Iterable[Headline]) -> None:
+        """Overwrite a day's headlines; a single PUT is atomic in S3."""
+        key = self._object_key("headlines", f"{date}.json")
+        self._put_object_json(key, headlines_to_records(headlines))
+
     def save_daily_aggregate(
         self, date: str, aggregate_score: RunningAggregate
     ) -> None:
@@ -120,6 +182,40 @@ class S3Storage(StorageInterface):
         self._put_object_json(key, data)
         logger.info("Saved daily aggregate for %s: %.3f", date, aggregate_score)
 
+    def load_daily_aggregates(self) -> dict[str, RunningAggregate]:
+        """Load the historical daily aggregates, keyed by date."""
+        key = self._object_key("daily_aggregates.json")
+        data: dict[str, Any] = self._get_object_json(key) or {}  # type: ignore
+        return {date: RunningAggregate(**agg) for date, agg in sorted(data.items())}
+
+    def save_daily_aggregates(self, aggregates: Mapping[str, RunningAggregate]) -> None:
+        """Merge many daily aggregates into the historical aggregate object."""
+        key = self._object_key("daily_aggregates.json")
+        data: dict[str, Any] = self._get_object_json(key) or {}  # type: ignore
+        data.update({date: asdict(agg) for date, agg in aggregates.items()})
+        self._put_object_json(key, data)
+        logger.info("Saved %d daily aggregates", len(aggregates))
+
+    def save_topic_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Merge per-topic aggregates into the topic aggregate object."""
+        key = self._object_key("topic_aggregates.json")
+        data: dict[str, Any] = self._get_object_json(key) or {}  # type: ignore
+        for date, topics in aggregates.items():
+            data[date] = {topic: asdict(agg) for topic, agg in topics.items()}
+        self._put_object_json(key, data)
+
+    def save_entity_aggregates(
+        self, aggregates: Mapping[str, Mapping[str, RunningAggregate]]
+    ) -> None:
+        """Merge per-entity aggregates into the entity aggregate object."""
+        key = self._object_key("entity_aggregates.json")
+        data: dict[str, Any] = self._get_object_json(key) or {}  # type: ignore
+        for date, entities in aggregates.items():
+            data[date] = {symbol: asdict(agg) for symbol, agg in entities.items()}
+        self._put_object_json(key, data)
+
     def save_current_aggregate(self, current_score: RunningAggregate) -> None:
         """Overwrite the current day's live aggregate sentiment."""
         key = self._object_key("current_aggregate.json")
@@ -130,7 +226,7 @@ class S3Storage(StorageInterface):
         """Load current day's aggregate."""
         key = self._object_key("current_aggregate.json")
         data = self._get_object_json(key)
-        return RunningAggregate(**data) or RunningAggregate()
+        return RunningAggregate(**data) if data else RunningAggregate()
 
     def clear_current_aggregate(self) -> None:
         """Delete the S3 object representing current aggregate."""
@@ -141,3 +237,125 @@ class S3Storage(StorageInterface):
             pass
         except Exception as e:
             logger.error("Error deleting current aggregate from S3: %s", e)
+
+    @staticmethod
+    def _precondition_failed(e: ClientError) -> bool:
+        code = e.response.get("Error", {}).get("Code")
+        return code in ("PreconditionFailed", "ConditionalRequestConflict")
+
+    def save_aggregate_delta(self, key: str, delta: RunningAggregate) -> None:
+        """Create a delta object; `If-None-Match` makes rewrites a no-op."""
+        object_key = self._object_key("aggregate_deltas", f"{key}.json")
+        try:
+            self._put_object_json(object_key, asdict(delta), IfNoneMatch="*")
+        except ClientError as e:
+            if not self._precondition_failed(e):
+                raise
+
+    def load_aggregate_deltas(self) -> dict[str, RunningAggregate]:
+        """Load every delta object, keyed by object name."""
+        prefix = self._object_key("aggregate_deltas") + "/"
+        paginator = self.s3.get_paginator("list_objects_v2")
+
+        deltas: dict[str, RunningAggregate] = {}
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                data = self._get_object_json(obj["Key"])
+                if isinstance(data, dict):
+                    name = obj["Key"].rsplit("/", 1)[-1].removesuffix(".json")
+                    deltas[name] = RunningAggregate(**data)  # type: ignore
+        return deltas
+
+    def delete_aggregate_deltas(self, keys: Iterable[str]) -> None:
+        """Delete delta objects, up to 1000 per request."""
+        object_keys = [
+            {"Key": self._object_key("aggregate_deltas", f"{key}.json")} for key in keys
+        ]
+        for start in range(0, len(object_keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": object_keys[start : start + 1000], "Quiet": True},
+            )
+
+    def _try_lock(self, key: str, owner: str) -> str | None:
+        """
+        Create the lock object, or take it over if its holder expired.
+
+        Returns:
+            str | None: The ETag of the lock object written, None if busy.
+        """
+        body = {
+            "owner": owner,
+            "expires": (datetime.now(timezone.utc) + COMPACTION_LOCK_TTL).isoformat(),
+        }
+        try:
+            return self._put_object_json(key, body, IfNoneMatch="*")
+        except ClientError as e:
+            if not self._precondition_failed(e):
+                raise
+
+        try:
+            resp = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+            held = decode(resp["Body"].read())
+        except self.s3.exceptions.NoSuchKey:
+            return None  # released meanwhile; retry on the next attempt
+        if datetime.fromisoformat(held["expires"]) > datetime.now(timezone.utc):
+            return None
+
+        # Only one contender can replace the expired lock object it read
+        try:
+            return self._put_object_json(key, body, IfMatch=resp["ETag"])
+        except ClientError as e:
+            if not self._precondition_failed(e):
+                raise
+            return None
+
+    def _release_lock(self, key: str, etag: str) -> None:
+        """Delete the lock object, unless another holder has taken it over."""
+        try:
+            self.s3.delete_object(Bucket=self.bucket_name, Key=key, IfMatch=etag)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if not self._precondition_failed(e) and code not in ("NoSuchKey", "404"):
+                raise
+            logger.warning("Lock %s expired and was taken over before release", key)
+
+    @contextmanager
+    def compaction_lock(self, wait: float = 0.0) -> Iterator[bool]:
+        """Lock object created with a conditional write, with a TTL."""
+        key = self._object_key("locks", "compaction.json")
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        while (etag := self._try_lock(key, owner)) is None:
+            if time.monotonic() >= deadline:
+                yield False
+                return
+            time.sleep(0.5)
+        try:
+            yield True
+        finally:
+            # Conditional, so a holder that outlived the TTL never deletes the
+            # lock of the compactor that took it over
+            self._release_lock(key, etag)
+
+    def save_artifact(
+        self, name: str, data: bytes, content_type: str = "application/octet-stream"
+    ) -> None:
+        """Upload an artifact object below `artifacts/`."""
+        key = self._object_key("artifacts", name)
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket_name, Key=key, Body=data, ContentType=content_type
+            )
+        except ClientError as e:
+            logger.error("Error writing artifact %s: %s", key, e)
+            raise
+
+    def load_artifact(self, name: str) -> bytes | None:
+        """Download an artifact object, or None if it does not exist."""
+        key = self._object_key("artifacts", name)
+        try:
+            resp = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+            return resp["Body"].read()
+        except self.s3.exceptions.NoSuchKey:
+            return None
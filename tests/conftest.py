@@ -1,7 +1,40 @@
 import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
+
+import pytest
 
 # Add src/ to sys.path
 project_root = Path(__file__).resolve().parent.parent
 src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
+
+TINY_BERT_VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "up", "down", "stocks"]
+
+
+@dataclass
+class TinyBert:
+    """Vocabulary file, fast tokenizer and config of a one-layer test BERT."""
+
+    vocab_file: Path
+    tokenizer: Any
+    config: Any
+
+
+@pytest.fixture
+def tiny_bert(tmp_path: Path) -> TinyBert:
+    """A BERT small enough to build and run in tests, over `TINY_BERT_VOCAB`."""
+    from transformers import BertConfig, BertTokenizerFast
+
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(TINY_BERT_VOCAB))
+    config = BertConfig(
+        vocab_size=len(TINY_BERT_VOCAB),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        num_labels=3,
+    )
+    return TinyBert(vocab_file, BertTokenizerFast(str(vocab_file)), config)
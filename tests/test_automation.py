@@ -113,3 +113,301 @@ def test_update_running_aggregate(
     assert isinstance(aapl["average"], float)
     assert aapl["sum_sentiment"] > 0.0
     assert tech["count"] == 1
+
+
+def test_stream_headlines_batches_and_writes(sample_headlines: List[Headline]) -> None:
+    """Streaming mode scores every fetched headline in bounded micro-batches."""
+    from automation._streaming import stream_headlines
+
+    def failing_fetcher() -> List[Headline]:
+        raise RuntimeError("feed down")
+
+    fetchers = [lambda: list(sample_headlines)] * 5 + [failing_fetcher]
+    batches: List[List[Headline]] = []
+
+    def analyze(batch: List[Headline]) -> List[Headline]:
+        assert len(batch) <= 3
+        return batch
+
+    written = stream_headlines(
+        fetchers,
+        analyze=analyze,
+        write=batches.append,
+        batch_size=3,
+        flush_seconds=0.05,
+        queue_size=2,
+    )
+
+    assert len(written) == 10
+    assert sum(len(b) for b in batches) == 10
+
+
+def test_stream_headlines_stops_when_the_writer_fails(
+    sample_headlines: List[Headline],
+) -> None:
+    """A failing write ends the stream even while a feed is still downloading."""
+    import threading
+    import time
+
+    from automation._streaming import stream_headlines
+
+    def slow_fetcher() -> List[Headline]:
+        time.sleep(0.5)
+        return list(sample_headlines)
+
+    def failing_write(batch: List[Headline]) -> None:
+        raise OSError("bucket unavailable")
+
+    errors: List[BaseException] = []
+
+    def run() -> None:
+        try:
+            stream_headlines(
+                [lambda: list(sample_headlines), slow_fetcher],
+                analyze=lambda batch: batch,
+                write=failing_write,
+                batch_size=1,
+                flush_seconds=0.05,
+            )
+        except BaseException as e:
+            errors.append(e)
+
+    stream = threading.Thread(target=run, daemon=True)
+    stream.start()
+    stream.join(timeout=5)
+
+    assert not stream.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], OSError)
+
+
+def test_rescore_day_replaces_headlines(
+    mocker, tmp_path, sample_headlines: List[Headline]  # type: ignore
+) -> None:
+    """Backfill workers re-score a stored day and return its aggregate."""
+    from automation import _backfill
+    from storage._local_storage import LocalStorage
+
+    storage = LocalStorage(str(tmp_path))
+    storage.append_headlines("2025-10-08", sample_headlines)
+    mocker.patch.object(_backfill, "_worker_storage", storage)
+
+    def fake_analyze(headlines: List[Headline], batch_size: int) -> List[Headline]:
+        for h in headlines:
+            h.sentiment_label, h.sentiment_score = "Positive", 0.5
+        return headlines
+
+    mocker.patch("sentiment.analyzer.analyze_headlines", side_effect=fake_analyze)
+
+    date, aggregate = _backfill._rescore_day("2025-10-08", batch_size=64)
+
+    assert date == "2025-10-08"
+    assert storage.list_headline_dates() == ["2025-10-08"]
+    stored = list(storage.load_headlines("2025-10-08"))
+    assert [h.sentiment_label for h in stored] == ["Positive", "Positive"]
+    assert aggregate.count == 2
+    assert aggregate.sum_sentiment == 1.0
+
+
+def test_aggregate_records_matches_running_aggregate() -> None:
+    """Vectorised rebuild agrees with the incremental aggregate update."""
+    from dataclasses import asdict
+
+    from automation._helpers import update_running_aggregate
+    from automation._rebuild import aggregate_records
+    from data_models import RunningAggregate
+
+    headlines = [
+        Headline("a", "l1", None, "AAPL", "Positive", 0.9),
+        Headline("b", "l2", None, "AAPL", "Negative", 0.4),
+        Headline("c", "l3", None, "TSLA", "Neutral", 0.8),
+        Headline("d", "l4", None, "TSLA", None, None),
+    ]
+
+    rebuilt = aggregate_records("2025-10-08", [asdict(h) for h in headlines])
+    expected = update_running_aggregate(RunningAggregate(date="2025-10-08"), headlines)
+
+    assert rebuilt.total.count == expected.count == 3
+    assert rebuilt.total.sum_sentiment == pytest.approx(expected.sum_sentiment)
+    assert rebuilt.total.average == pytest.approx(expected.average)
+    assert rebuilt.topics["AAPL"].sum_sentiment == pytest.approx(0.5)
+    assert rebuilt.topics["TSLA"].count == 1
+
+
+def test_sharded_partials_merge_into_aggregates(
+    mocker, tmp_path, sample_headlines: List[Headline]  # type: ignore
+) -> None:
+    """Shards partition sources disjointly; their partials merge exactly once."""
+    from automation import _sharding
+    from data_models import RunningAggregate
+    from scraping._sharding import Shard
+    from storage._local_storage import LocalStorage
+
+    keys = [f"yahoo:T{i}" for i in range(200)]
+    owned = [Shard(i, 3).select(keys) for i in range(3)]
+    assert sorted(k for part in owned for k in part) == sorted(keys)
+    assert owned == [Shard(i, 3).select(keys) for i in range(3)]
+
+    storage = LocalStorage(str(tmp_path))
+    storage.save_current_aggregate(
+        RunningAggregate(date="2025-10-08", sum_sentiment=1.0, count=2)
+    )
+    mocker.patch.object(_sharding, "get_storage", return_value=storage)
+
+    for h in sample_headlines:
+        h.sentiment_label = "Positive"
+    _sharding.save_partial(storage, "run", 0, 2, "2025-10-08", sample_headlines[:1])
+    assert not _sharding.merge_shard_runs(2, run_id="run")
+
+    _sharding.save_partial(storage, "run", 1, 2, "2025-10-09", sample_headlines[1:])
+    assert _sharding.merge_shard_runs(2, run_id="run")
+    assert _sharding.merge_shard_runs(2, run_id="run")  # already merged
+
+    daily = storage.load_daily_aggregates()["2025-10-08"]
+    assert daily.count == 3
+    assert daily.sum_sentiment == pytest.approx(1.91)
+    current = storage.load_current_aggregate()
+    assert (current.date, current.count) == ("2025-10-09", 1)
+    assert current.average == pytest.approx(0.42)
+    assert len(list(storage.load_headlines("2025-10-08"))) == 1
+
+    # Two shards returning the same article store and count it once
+    shared = Headline("Chipmakers rally", "l-shared", None, "NVDA", "Positive", 0.5)
+    for shard in range(2):
+        _sharding.save_partial(storage, "run2", shard, 2, "2025-10-09", [shared])
+    assert _sharding.merge_shard_runs(2, run_id="run2")
+    current = storage.load_current_aggregate()
+    assert (current.count, len(list(storage.load_headlines("2025-10-09")))) == (2, 2)
+
+
+def test_retried_run_resumes_from_its_checkpoint(
+    mocker, tmp_path, sample_headlines: List[Headline]  # type: ignore
+) -> None:
+    """A retry skips scraping and scoring and never counts a headline twice."""
+    import scraping
+    from automation import _hourly
+    from dashboard import publish_snapshots
+    from profiling import Profiler
+    from scraping import PollScheduler, ScrapeResult
+    from storage import load_live_aggregates
+    from storage._local_storage import LocalStorage
+
+    storage = LocalStorage(str(tmp_path))
+    for h in sample_headlines:
+        h.sentiment_label = "Positive"
+    scrape = mocker.patch.object(
+        scraping,
+        "scrape_due_headlines",
+        return_value=ScrapeResult(headlines=list(sample_headlines)),
+    )
+    analyze = mocker.patch.object(
+        _hourly, "_analyze", side_effect=lambda env, headlines: (headlines, None)
+    )
+    mocker.patch.object(_hourly, "_load_entity_matcher")
+    mocker.patch.object(
+        _hourly,
+        "publish_snapshots",
+        side_effect=[RuntimeError("snapshot write failed"), publish_snapshots],
+    )
+
+    def run() -> None:
+        _hourly._run_stages(
+            storage, Profiler(storage), PollScheduler(), MagicMock(), "run"
+        )
+
+    with pytest.raises(RuntimeError):
+        run()
+    assert len(list(storage.load_headlines())) == 2
+
+    mocker.patch.object(_hourly, "publish_snapshots", side_effect=publish_snapshots)
+    run()
+    run()  # already complete
+
+    assert scrape.call_count == analyze.call_count == 1
+    assert len(list(storage.load_headlines())) == 2
+    current, _ = load_live_aggregates(storage)
+    assert current.count == 2
+    assert current.sum_sentiment == pytest.approx(0.91 + 0.42)
+
+
+def test_runs_sharing_a_headline_count_it_once(
+    mocker, tmp_path, sample_headlines: List[Headline]  # type: ignore
+) -> None:
+    """A headline returned again by an overlapping poll window is not recounted."""
+    import scraping
+    from automation import _hourly
+    from profiling import Profiler
+    from scraping import PollScheduler, ScrapeResult
+    from storage import load_live_aggregates
+    from storage._local_storage import LocalStorage
+
+    storage = LocalStorage(str(tmp_path))
+    for h in sample_headlines:
+        h.sentiment_label = "Positive"
+    later = Headline("Banks gain on rate outlook", "l3", None, "JPM", "Positive", 0.5)
+    mocker.patch.object(
+        scraping,
+        "scrape_due_headlines",
+        side_effect=[
+            ScrapeResult(headlines=list(sample_headlines)),
+            ScrapeResult(headlines=[sample_headlines[1], later]),
+        ],
+    )
+    mocker.patch.object(
+        _hourly, "_analyze", side_effect=lambda env, headlines: (headlines, None)
+    )
+    mocker.patch.object(_hourly, "_load_entity_matcher")
+
+    for run_id in ("run-1", "run-2"):
+        _hourly._run_stages(
+            storage, Profiler(storage), PollScheduler(), MagicMock(), run_id
+        )
+
+    assert len(list(storage.load_headlines())) == 3
+    current, _ = load_live_aggregates(storage)
+    assert current.count == 3
+    assert current.sum_sentiment == pytest.approx(0.91 + 0.42 + 0.5)
+
+
+def test_streaming_batches_share_the_article_budget(
+    mocker, tmp_path, sample_headlines: List[Headline]  # type: ignore
+) -> None:
+    """Every streamed batch is enriched by the run's one fetcher and deadline."""
+    import dataclasses
+
+    import scraping
+    from automation import _hourly
+    from core.env import get_env
+    from profiling import Profiler
+    from scraping import PollScheduler
+    from storage._local_storage import LocalStorage
+
+    storage = LocalStorage(str(tmp_path))
+    env = dataclasses.replace(
+        get_env(),
+        article_enrichment=True,
+        entity_attribution=False,
+        stream_batch_size=1,
+    )
+    mocker.patch.object(
+        scraping,
+        "scheduled_fetchers",
+        return_value=[lambda h=h: [h] for h in sample_headlines],
+    )
+    mocker.patch.object(
+        _hourly, "_analyze", side_effect=lambda env, headlines: (headlines, None)
+    )
+    articles = (MagicMock(), MagicMock())
+    make_fetcher = mocker.patch.object(
+        _hourly, "_article_fetcher", return_value=articles
+    )
+    enrich = mocker.patch.object(
+        _hourly, "_enrich_articles", side_effect=lambda headlines, *_: headlines
+    )
+
+    _hourly._run_streaming(
+        env, storage, Profiler(storage), PollScheduler(), MagicMock(), "run"
+    )
+
+    assert make_fetcher.call_count == 1
+    assert enrich.call_count == len(sample_headlines)
+    assert all(call.args[1:] == articles for call in enrich.call_args_list)
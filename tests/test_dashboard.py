@@ -0,0 +1,68 @@
+# tests/test_dashboard.py
+import gzip
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from dashboard import publish_snapshots
+from dashboard._service import make_dashboard_server
+from data_models import Headline, RunningAggregate
+from storage._local_storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> LocalStorage:
+    storage = LocalStorage(str(tmp_path))
+    storage.append_headlines(
+        "2025-10-08",
+        [
+            Headline("Apple rises", "l1", None, "AAPL", "Positive", 0.9),
+            Headline("Tesla falls", "l2", None, "TSLA", "Negative", 0.7),
+        ],
+    )
+    storage.save_daily_aggregates(
+        {"2025-10-07": RunningAggregate("2025-10-07", "", 1.0, 2, 0.5)}
+    )
+    storage.save_current_aggregate(RunningAggregate("2025-10-08", "", 0.2, 2, 0.1))
+    return storage
+
+
+def test_dashboard_serves_cached_snapshots(storage: LocalStorage):
+    publish_snapshots(storage)
+    server = make_dashboard_server(storage, port=0, ttl=60)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/api"
+
+    try:
+        request = urllib.request.Request(
+            f"{base}/headlines", headers={"Accept-Encoding": "gzip"}
+        )
+        with urllib.request.urlopen(request) as resp:
+            assert resp.headers["Content-Encoding"] == "gzip"
+            etag = resp.headers["ETag"]
+            payload = json.loads(gzip.decompress(resp.read()))
+        # Newest headlines first
+        assert [h["headline"] for h in payload["headlines"]] == [
+            "Tesla falls",
+            "Apple rises",
+        ]
+
+        with urllib.request.urlopen(f"{base}/history") as resp:
+            assert "2025-10-07" in json.loads(resp.read())["days"]
+
+        request = urllib.request.Request(
+            f"{base}/headlines", headers={"If-None-Match": etag}
+        )
+        with pytest.raises(urllib.error.HTTPError) as not_modified:
+            urllib.request.urlopen(request)
+        assert not_modified.value.code == 304
+
+        # Each snapshot is read from storage once per TTL
+        assert server.cache.reads == 2
+    finally:
+        server.shutdown()
+        server.server_close()
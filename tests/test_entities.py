@@ -0,0 +1,85 @@
+# tests/test_entities.py
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from data_models import Headline, headlines_from_records, headlines_to_records
+from entities import Automaton, EntityMatcher, load_entity_matcher
+from storage._local_storage import LocalStorage
+
+DICTIONARY = {
+    "TSLA": ["Tesla"],
+    "AAPL": ["Apple", "Apple Inc"],
+    "META": ["Meta Platforms", "Facebook"],
+    "F": ["Ford", "Ford Motor"],
+}
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = Automaton.build(["he", "she", "his", "hers"])
+    matches = sorted(automaton.iter_matches("ushers"))
+    assert [(end, automaton.patterns[i]) for end, i in matches] == [
+        (4, "he"),
+        (4, "she"),
+        (6, "hers"),
+    ]
+
+    loaded = Automaton.from_dict(automaton.to_dict())
+    assert sorted(loaded.iter_matches("ushers")) == matches
+
+
+def test_entity_matcher_tags_whole_word_mentions():
+    matcher = EntityMatcher.from_dictionary(DICTIONARY)
+
+    # Names in any case, symbols case-sensitively, in order of first mention
+    assert matcher.match("Tesla and $aapl lead; APPLE INC slips") == ("TSLA", "AAPL")
+    assert matcher.match("META beats as facebook grows") == ("META",)
+    assert matcher.match("Teslas, pineapple and metadata") == ()
+    assert matcher.match("meta analysis of a F grade") == ()
+    assert matcher.match("$F and Ford Motor rally") == ("F",)
+
+    headline = Headline(
+        "Stock market rallies as Tesla soars", "l1", None, "stock market"
+    )
+    matcher.tag([headline])
+    assert headline.entities == ("TSLA",)
+    assert headlines_from_records(headlines_to_records([headline])) == [headline]
+
+
+def test_entity_matcher_is_built_once_per_dictionary(tmp_path: Path, mocker):  # type: ignore
+    storage = LocalStorage(str(tmp_path))
+    mocker.patch("entities._matcher._matcher", None)
+    build = mocker.spy(EntityMatcher, "from_dictionary")
+
+    first = load_entity_matcher(storage, DICTIONARY)
+    assert load_entity_matcher(storage, DICTIONARY) is first
+    assert build.call_count == 1
+
+    # A new process loads the stored automaton instead of rebuilding it
+    mocker.patch("entities._matcher._matcher", None)
+    loaded = load_entity_matcher(storage, DICTIONARY)
+    assert loaded is not first and build.call_count == 1
+    assert loaded.match("Apple and Tesla") == ("AAPL", "TSLA")
+
+    changed = load_entity_matcher(storage, {**DICTIONARY, "NVDA": ["Nvidia"]})
+    assert build.call_count == 2
+    assert changed.match("Nvidia") == ("NVDA",)
+
+
+def test_aggregates_roll_up_per_entity():
+    from automation._rebuild import aggregate_records
+
+    headlines = [
+        Headline("a", "l1", None, "stock market", "Positive", 0.9, entities=("AAPL",)),
+        Headline("b", "l2", None, "AAPL", "Negative", 0.4, entities=("AAPL", "TSLA")),
+        Headline("c", "l3", None, "TSLA", None, None, entities=("TSLA",)),
+        Headline("d", "l4", None, "inflation", "Neutral", 0.7),
+    ]
+
+    rebuilt = aggregate_records("2025-10-08", [asdict(h) for h in headlines])
+    assert rebuilt.total.count == 3
+    assert rebuilt.entities["AAPL"].count == 2
+    assert rebuilt.entities["AAPL"].sum_sentiment == pytest.approx(0.5)
+    assert rebuilt.entities["TSLA"].count == 1
+    assert rebuilt.entities["TSLA"].sum_sentiment == pytest.approx(-0.4)
@@ -0,0 +1,46 @@
+# tests/test_model_building.py
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from model_building import prepare_dataset  # noqa: E402
+
+
+def test_prepare_dataset_dedups_by_normalized_text(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    low = tmp_path / "Sentences_50Agree.txt"
+    high = tmp_path / "Sentences_AllAgree.txt"
+    low.write_text("Profit rose , says CEO .@positive\nSales fell@negative\nno label\n")
+    high.write_text("profit rose, says CEO.@neutral\n")
+    fiqa = tmp_path / "fiqa.json"
+    fiqa.write_text(
+        json.dumps(
+            {
+                "1": {"sentence": "Stock  up", "info": [{"sentiment_score": "0.5"}]},
+                "2": {"sentence": "Sales fell", "info": [{"sentiment_score": "x"}]},
+            }
+        )
+    )
+    monkeypatch.setattr(prepare_dataset, "PHRASEBANK_FILES", {low: 0.5, high: 1.0})
+
+    combined = pd.concat(
+        [
+            prepare_dataset.parse_phrasebank_file(low),
+            prepare_dataset.parse_phrasebank_file(high),
+            prepare_dataset.parse_fiqa_file(fiqa),
+        ],
+        ignore_index=True,
+    )
+    deduped = prepare_dataset.deduplicate(combined)
+
+    assert deduped["text"].tolist() == [
+        "Sales fell",
+        "profit rose, says CEO.",
+        "Stock up",
+    ]
+    assert deduped["label"].tolist() == [0, 1, 2]
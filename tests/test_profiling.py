@@ -0,0 +1,53 @@
+# tests/test_profiling.py
+import marshal
+import time
+from pathlib import Path
+
+from core.env import ProfileMode
+from profiling import Profiler
+from storage._local_storage import LocalStorage
+
+
+def _busy_work() -> int:
+    deadline = time.perf_counter() + 0.05
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def _profiles_dir(tmp_path: Path) -> Path:
+    run_dirs = list((tmp_path / "artifacts" / "profiles").iterdir())
+    assert len(run_dirs) == 1
+    return run_dirs[0]
+
+
+def test_cprofile_stage_writes_pstats(tmp_path: Path):
+    profiler = Profiler(LocalStorage(str(tmp_path)), mode=ProfileMode.CPROFILE)
+
+    with profiler.stage("pipeline"):
+        # Nested stages must not fail even though only one cProfile can run
+        with profiler.stage("pipeline"):
+            _busy_work()
+
+    stats = marshal.loads((_profiles_dir(tmp_path) / "pipeline.pstats").read_bytes())
+    assert any(func[2] == "_busy_work" for func in stats)
+
+
+def test_sampling_and_tracemalloc(tmp_path: Path):
+    profiler = Profiler(
+        LocalStorage(str(tmp_path)),
+        mode=ProfileMode.SAMPLING,
+        stages=("scrape",),
+        tracemalloc_enabled=True,
+    )
+
+    with profiler.stage("scrape"):
+        _busy_work()
+    with profiler.stage("analyze"):  # not selected, so nothing is written
+        _busy_work()
+
+    written = {p.name for p in _profiles_dir(tmp_path).iterdir()}
+    assert written == {"scrape.folded", "scrape.tracemalloc.txt"}
+    folded = (_profiles_dir(tmp_path) / "scrape.folded").read_text()
+    assert "_busy_work" in folded
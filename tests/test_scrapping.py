@@ -107,3 +107,227 @@ class TestScraping:
         assert first.link == "https://news.google.com/news/apple-earnings-123"
         assert first.pub_date == "Mon, 07 Oct 2025 12:00:00 GMT"
         assert first.topic == topic
+
+    def test_poll_scheduler_adapts_intervals(self):
+        from datetime import datetime, timedelta, timezone
+
+        from scraping import PollScheduler
+
+        scheduler = PollScheduler(
+            min_interval=timedelta(hours=1),
+            max_interval=timedelta(hours=8),
+            target_items=5,
+            smoothing=1.0,
+        )
+        now = datetime(2025, 10, 8, 12, tzinfo=timezone.utc)
+        assert scheduler.due(["busy", "quiet"], now) == ["busy", "quiet"]
+
+        windows: list[timedelta] = []
+
+        def fetch(items: int):
+            def _fetch(window: timedelta) -> list[Headline]:
+                windows.append(window)
+                return [Headline(f"h{i}", f"l{i}", None, "x") for i in range(items)]
+
+            return _fetch
+
+        scheduler.poll("busy", fetch(50), now)
+        scheduler.poll("quiet", fetch(0), now)
+
+        # Busy feeds stay at the minimum interval; quiet ones back off
+        later = now + timedelta(hours=1)
+        assert scheduler.due(["busy", "quiet"], later) == ["busy"]
+        assert scheduler.due(["quiet"], now + timedelta(hours=2)) == ["quiet"]
+
+        # The next poll only looks back to the previous one
+        scheduler.poll("quiet", fetch(0), now + timedelta(hours=2))
+        assert windows[-1] == timedelta(hours=2)
+        assert scheduler.states["quiet"].interval_seconds == 4 * 3600
+
+    def test_yahoo_batches_split_per_ticker(self, mock_yahoo_fin_news, tmp_path):
+        from datetime import timedelta
+
+        from scraping._scrape_yahoo import (
+            YAHOO_GROUP_TOPIC,
+            fetch_yahoo_universe,
+            load_ticker_universe,
+        )
+
+        universe_file = tmp_path / "tickers.txt"
+        universe_file.write_text("# universe\nAAPL, Apple\nMSFT,Microsoft\nGOOG\n")
+        universe = load_ticker_universe(tickers_file=str(universe_file))
+        assert list(universe) == ["AAPL", "MSFT", "GOOG"]
+
+        grouped = fetch_yahoo_universe(
+            list(universe),
+            window=timedelta(days=365 * 100),
+            aliases=universe,
+            batch_size=2,
+        )
+
+        # One request per batch of symbols
+        assert [c.args[0] for c in mock_yahoo_fin_news.call_args_list] == [
+            "AAPL,MSFT",
+            "GOOG",
+        ]
+        assert [h.headline for h in grouped["AAPL"]] == [
+            "Apple stock rises on strong earnings"
+        ]
+        assert [h.headline for h in grouped["MSFT"]] == [
+            "Microsoft hits new all-time high"
+        ]
+        assert len(grouped[YAHOO_GROUP_TOPIC]) == 2
+        assert len(grouped["GOOG"]) == 4
+
+    def test_hedged_caller_hedges_slow_requests_and_enforces_deadline(self):
+        import threading
+        import time
+
+        from scraping._deadline import Deadline, DeadlineExceeded, HedgedCaller
+
+        attempts: list[int] = []
+        lock = threading.Lock()
+
+        def slow_first_attempt() -> str:
+            with lock:
+                attempts.append(len(attempts))
+                attempt = attempts[-1]
+            time.sleep(1.0 if attempt == 0 else 0.01)
+            return "primary" if attempt == 0 else "hedge"
+
+        # Recent p95 is ~10ms, so the stalled first attempt gets hedged
+        caller = HedgedCaller(Deadline(5), timeout=2.0, latencies={"feed": [0.01] * 50})
+        started = time.monotonic()
+        assert caller.call("feed", slow_first_attempt) == "hedge"
+        assert time.monotonic() - started < 0.5
+        assert len(attempts) == 2
+
+        # The run deadline caps every request, hedged or not
+        caller = HedgedCaller(Deadline(0.2), timeout=2.0, hedge=False)
+        with pytest.raises(DeadlineExceeded):
+            caller.call("feed", time.sleep, 1.0)
+        with pytest.raises(DeadlineExceeded):
+            caller.call("feed", time.sleep, 0)  # no budget left
+
+    def test_polls_answering_after_the_deadline_are_not_recorded(self, mocker):  # type: ignore
+        import time
+        from datetime import datetime, timezone
+
+        import scraping._run_scraper as run_scraper
+        from scraping import PollScheduler, scrape_due_headlines
+
+        def slow(window):
+            time.sleep(0.5)
+            return [Headline("late", "l2", None, "slow")]
+
+        mocker.patch.object(
+            run_scraper,
+            "source_registry",
+            return_value={
+                "google:fast": lambda window: [Headline("on time", "l1", None, "fast")],
+                "google:slow": slow,
+            },
+        )
+        mocker.patch.object(run_scraper, "ticker_universe", return_value={})
+        caller = MagicMock()
+        caller.deadline.remaining.return_value = 0.2
+        caller.call.side_effect = lambda label, fn, *args, **kwargs: fn(*args)
+
+        scheduler = PollScheduler()
+        now = datetime(2025, 10, 8, 12, tzinfo=timezone.utc)
+        result = scrape_due_headlines(scheduler, now, caller=caller)
+        time.sleep(0.6)  # the slow source answers after the scrape returned
+
+        assert [h.headline for h in result.headlines] == ["on time"]
+        assert result.skipped == ["google:slow"]
+        assert scheduler.states["google:fast"].last_polled is not None
+        assert scheduler.states["google:slow"].last_polled is None
+        assert scheduler.due(["google:fast", "google:slow"], now) == ["google:slow"]
+
+    def test_streaming_fetchers_report_skipped_and_failed_sources(self, mocker):  # type: ignore
+        from datetime import datetime, timezone
+
+        import scraping._run_scraper as run_scraper
+        from scraping import (
+            DeadlineExceeded,
+            PollScheduler,
+            ScrapeResult,
+            scheduled_fetchers,
+        )
+
+        def late(window):
+            raise DeadlineExceeded("google did not answer")
+
+        def broken(window):
+            raise RuntimeError("feed down")
+
+        mocker.patch.object(
+            run_scraper,
+            "source_registry",
+            return_value={
+                "google:fast": lambda window: [Headline("on time", "l1", None, "fast")],
+                "google:late": late,
+                "google:broken": broken,
+            },
+        )
+        mocker.patch.object(run_scraper, "ticker_universe", return_value={})
+
+        report = ScrapeResult(headlines=[])
+        now = datetime(2025, 10, 8, 12, tzinfo=timezone.utc)
+        fetched = [
+            h.headline
+            for fetch in scheduled_fetchers(PollScheduler(), now, report=report)
+            for h in fetch()
+        ]
+
+        assert fetched == ["on time"]
+        assert report.skipped == ["google:late"]
+        assert report.failed == ["google:broken"]
+
+    def test_article_fetcher_extracts_and_caches_main_text(self, mocker, tmp_path):  # type: ignore
+        from scraping._articles import ArticleFetcher, extract_main_text
+        from storage._local_storage import LocalStorage
+
+        body = "Shares of Apple rose sharply after the company beat estimates."
+        page = f"""
+        <html><body>
+            <nav><p>Markets | Tech | Opinion | Subscribe to our newsletter today</p></nav>
+            <div class="teasers"><p>Short teaser</p></div>
+            <div class="story"><p>{body}</p><p>{body}</p></div>
+            <script>var tracking = "ignore me please, this is not text at all";</script>
+        </body></html>
+        """
+        assert extract_main_text(page) == f"{body}\n{body}"
+        assert (
+            extract_main_text(f"<article><p>{body}</p></article><p>{body}x</p>") == body
+        )
+
+        response = MagicMock()
+        response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        response.iter_content.return_value = [page.encode("utf-8")]
+        response.url, response.history = "https://a.com/1", []
+        response.__enter__.return_value = response
+        get = mocker.patch("scraping._articles.requests.get", return_value=response)
+
+        fetcher = ArticleFetcher(LocalStorage(str(tmp_path)), rate_per_domain=1000)
+        urls = ["https://a.com/1", "https://b.com/2", "https://a.com/1"]
+        texts = fetcher.fetch_all(urls)
+        assert texts == {url: f"{body}\n{body}" for url in urls}
+        assert get.call_count == 2
+
+        # Second run is served from the storage cache
+        assert fetcher.fetch_all(urls) == texts
+        assert get.call_count == 2
+
+        # Google News redirect links are never downloaded
+        assert fetcher.fetch_all(["https://news.google.com/rss/articles/x"]) == {}
+        assert get.call_count == 2
+
+        # Pages reached through a redirect to a consent wall are not cached
+        response.url, response.history = "https://consent.yahoo.com/v2", [MagicMock()]
+        assert fetcher.fetch("https://c.com/3") == ""
+        response.iter_content.return_value = [b"<html><p>Cookie settings</p></html>"]
+        response.url = "https://d.com/4"
+        assert fetcher.fetch("https://d.com/4") == ""
+        assert fetcher._load_cached("https://c.com/3") is None
+        assert fetcher._load_cached("https://d.com/4") is None
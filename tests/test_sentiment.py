@@ -64,3 +64,169 @@ def test_analyze_headlines(sample_headlines: list[Headline], mock_pipeline: Magi
 
     # Check mock pipeline was called once
     mock_pipeline.assert_called_once()
+
+
+def test_model_artifact_round_trip(tmp_path, tiny_bert):  # type: ignore
+    """A packaged artifact loads zero-copy and predicts like the original."""
+    import torch
+    from transformers import BertForSequenceClassification, BertTokenizer
+
+    from sentiment._artifacts import load_model_artifact, save_model_artifact
+
+    model = BertForSequenceClassification(tiny_bert.config).eval()
+    tokenizer = BertTokenizer(str(tiny_bert.vocab_file))
+    save_model_artifact(model, tokenizer, tmp_path / "artifact")
+
+    loaded = load_model_artifact(tmp_path / "artifact")
+
+    input_ids = torch.tensor([[2, 4, 3]])
+    with torch.no_grad():
+        assert torch.allclose(model(input_ids).logits, loaded(input_ids).logits)
+    # Every weight views the same memory-mapped file
+    storages = {p.untyped_storage().data_ptr() for p in loaded.parameters()}
+    assert len(storages) == 1
+
+
+def test_token_cache_reuses_and_evicts(tiny_bert):  # type: ignore
+    """Repeated texts are served from the cache, which stays within its budget."""
+    from sentiment._tokens import TokenCache, encode_texts
+
+    tokenizer = tiny_bert.tokenizer
+    cache = TokenCache(max_tokens=8)
+
+    first = encode_texts(tokenizer, ["stocks", "stocks stocks"], cache)
+    assert [list(ids) for ids in first] == [[2, 6, 3], [2, 6, 6, 3]]
+    assert cache.misses == 2
+
+    again = encode_texts(tokenizer, ["stocks"], cache)
+    assert cache.hits == 1
+    assert again[0] is first[0]
+
+    encode_texts(tokenizer, ["stocks stocks stocks"], cache)
+    assert cache.tokens <= 8
+
+
+def test_inference_server_micro_batches_and_client_fallback(
+    sample_headlines: list[Headline], monkeypatch  # type: ignore
+):
+    """Concurrent requests share batches; the client falls back when the server is gone."""
+    import dataclasses
+    import threading
+    import urllib.error
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    import sentiment.analyzer as analyzer
+    from core.env import get_env
+    from sentiment._server import make_inference_server
+
+    def fake_classify(texts: list[str]) -> list[dict[str, str | float]]:
+        return [{"label": "Positive", "score": float(len(t))} for t in texts]
+
+    server = make_inference_server(fake_classify, port=0, max_wait=0.05)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(
+        analyzer,
+        "get_env",
+        lambda: dataclasses.replace(get_env(), inference_server_url=url),
+    )
+    monkeypatch.setattr(analyzer, "_server_down_until", 0.0)
+
+    batches = [[dataclasses.replace(h) for h in sample_headlines] for _ in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(analyze_headlines, batches))
+
+    assert all(h.sentiment_label == "Positive" for batch in results for h in batch)
+    assert results[0][0].sentiment_score == float(len(sample_headlines[0].headline))
+    assert server.batcher.batches < 8
+
+    # Malformed bodies are rejected without taking the handler down
+    for body in (b"[1, 2]", b'"texts"', b'{"texts": "up"}', b"not json"):
+        request = urllib.request.Request(f"{url}/analyze", data=body, method="POST")
+        with pytest.raises(urllib.error.HTTPError) as rejected:
+            urllib.request.urlopen(request, timeout=5)
+        assert rejected.value.code == 400
+
+    server.shutdown()
+    server.server_close()
+
+    local = MagicMock(return_value=[{"label": "NEUTRAL", "score": 0.5}] * 3)
+    monkeypatch.setattr(analyzer, "classifier", local)
+    fallback = analyze_headlines(sample_headlines)
+
+    local.assert_called_once()
+    assert fallback[0].sentiment_label == "NEUTRAL"
+
+
+def test_long_articles_are_scored_over_pooled_windows(tiny_bert):  # type: ignore
+    """Articles are split into overlapping windows, batched together and pooled."""
+    from types import SimpleNamespace
+
+    import torch
+
+    from sentiment._articles import score_articles, token_windows
+    from sentiment._classifier import FinbertClassifier
+
+    assert [list(w) for w in token_windows(list(range(10)), 4, 1, 8)] == [
+        [0, 1, 2, 3],
+        [3, 4, 5, 6],
+        [6, 7, 8, 9],
+    ]
+    assert len(token_windows(list(range(100)), 4, 1, 8)) == 8
+
+    batch_shapes: list[tuple[int, ...]] = []
+
+    def model(input_ids, attention_mask):  # type: ignore
+        # Logit of each label: how often its word appears in the window
+        batch_shapes.append(tuple(input_ids.shape))
+        counts = torch.stack([(input_ids == 4).sum(1), (input_ids == 5).sum(1)], 1)
+        return SimpleNamespace(logits=counts.float() * 10)
+
+    model.config = SimpleNamespace(  # type: ignore[attr-defined]
+        id2label={0: "Positive", 1: "Negative"}, max_position_embeddings=8
+    )
+    classifier = FinbertClassifier(model, tiny_bert.tokenizer, batch_size=64)
+
+    headlines = [
+        Headline("Mixed day", "https://a/1", None, "stocks"),
+        Headline("Sell-off", "https://b/2", None, "stocks"),
+        Headline("No article", "https://c/3", None, "stocks"),
+    ]
+    texts = {
+        # Windows of 6 tokens: mostly "up", with one "down" window
+        "https://a/1": " ".join(["up"] * 12 + ["down"] * 6),
+        "https://b/2": "down down up",
+    }
+    score_articles(classifier, headlines, texts, max_windows=8, overlap=0)
+
+    # Every window of both articles went through one forward pass
+    assert batch_shapes == [(4, 8)]
+    assert headlines[0].article_label == "Positive"
+    assert headlines[0].article_score == pytest.approx(2 / 3, abs=1e-3)
+    assert headlines[1].article_label == "Negative"
+    assert headlines[2].article_label is None
+    assert headlines[2].article_score is None
+
+
+def test_classify_and_embed_shares_the_forward_pass(tiny_bert):  # type: ignore
+    """Embeddings come with the sentiment, unaffected by batch padding."""
+    import numpy as np
+    import torch
+    from transformers import BertForSequenceClassification
+
+    from sentiment._classifier import FinbertClassifier
+
+    torch.manual_seed(0)
+    model = BertForSequenceClassification(tiny_bert.config).eval()
+    classifier = FinbertClassifier(model, tiny_bert.tokenizer)
+
+    texts = ["up", "down down up up down"]
+    results, embeddings = classifier.classify_and_embed(texts)
+    assert results == classifier(texts)
+    assert embeddings.shape == (2, 16) and embeddings.dtype == np.float16
+    norms = np.linalg.norm(embeddings.astype(np.float32), axis=1)
+    assert np.allclose(norms, 1, atol=1e-2)
+
+    alone = classifier.classify_and_embed(["up"])[1]
+    assert np.allclose(alone[0], embeddings[0], atol=1e-3)
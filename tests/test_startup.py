@@ -0,0 +1,49 @@
+# tests/test_startup.py
+"""Cold-start budget for the Lambda entry point, measured with -X importtime."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous enough for a loaded CI box; eager torch/transformers imports take seconds
+IMPORT_TIME_BUDGET_US = 500_000
+IMPORTED_MODULE_BUDGET = 250
+HEAVY_MODULES = ["torch", "transformers", "boto3", "bs4", "yahoo_fin", "numpy"]
+
+
+def _import_handler() -> tuple[dict[str, int], str]:
+    """Import the handler in a fresh interpreter; return cumulative us per module."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PROJECT_ROOT / "src"), str(PROJECT_ROOT / "lambda_handler")]
+    )
+    probe = (
+        "import hourly_handler, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[12:].split("|"))
+        cumulative[name] = int(cumulative_us)
+    return cumulative, result.stdout.strip()
+
+
+def test_lambda_handler_import_budget():
+    cumulative, heavy_loaded = _import_handler()
+
+    assert heavy_loaded == "", f"Heavy modules imported eagerly: {heavy_loaded}"
+    assert cumulative["hourly_handler"] < IMPORT_TIME_BUDGET_US
+    assert len(cumulative) < IMPORTED_MODULE_BUDGET
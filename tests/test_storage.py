@@ -0,0 +1,212 @@
+# tests/test_storage.py
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from core.env import StorageCodec
+from data_models import (
+    Headline,
+    RunningAggregate,
+    headlines_from_records,
+    headlines_to_records,
+)
+from storage import compact_aggregates, load_live_aggregates, record_aggregate_delta
+from storage._codecs import decode, get_codec
+from storage._dedup import DEDUP_ARTIFACT, DedupIndex
+from storage._local_storage import LocalStorage
+
+
+def _headline(title: str, link: str) -> Headline:
+    return Headline(title, link, None, "AAPL", "Positive", 0.9)
+
+
+def test_append_headlines_dedups_across_days(tmp_path: Path):
+    storage = LocalStorage(str(tmp_path), dedup_retention_days=2)
+    storage.append_headlines(
+        "2025-10-08", [_headline("A", "l1"), _headline("B", "l2"), _headline("A", "l1")]
+    )
+    pending = [_headline("A", "l1"), _headline("C", "l3")]
+    assert [h.headline for h in storage.new_headlines("2025-10-09", pending)] == ["C"]
+    stored = storage.append_headlines("2025-10-09", pending)
+
+    # Only what was actually stored is returned, for the aggregates to count
+    assert [h.headline for h in stored] == ["C"]
+    assert storage.append_headlines("2025-10-09", pending) == []
+    assert [h.headline for h in storage.load_headlines("2025-10-08")] == ["A", "B"]
+    assert [h.headline for h in storage.load_headlines("2025-10-09")] == ["C"]
+
+    # Entries older than the retention window are pruned
+    storage.append_headlines("2025-10-11", [_headline("D", "l4")])
+    index = DedupIndex.from_bytes(storage.load_artifact(DEDUP_ARTIFACT) or b"")
+    assert len(index) == 2
+
+    # A missing index is rebuilt from the stored headlines
+    (storage.artifacts_dir / DEDUP_ARTIFACT).unlink()
+    storage.append_headlines("2025-10-11", [_headline("D", "l4"), _headline("C", "l3")])
+    assert [h.headline for h in storage.load_headlines("2025-10-11")] == ["D"]
+
+
+@pytest.mark.parametrize("name", list(StorageCodec))
+def test_codecs_round_trip_and_read_legacy_json(tmp_path: Path, name: StorageCodec):
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} codec is not installed")
+
+    # Objects written before the codec layer are pretty-printed plain JSON
+    (tmp_path / "headlines").mkdir()
+    legacy = [{"headline": "A", "link": "l1", "pub_date": None, "topic": "AAPL"}]
+    (tmp_path / "headlines" / "2025-10-08.json").write_text(
+        json.dumps(legacy, indent=2)
+    )
+
+    storage = LocalStorage(str(tmp_path), codec=codec)
+    storage.append_headlines("2025-10-08", [_headline("B", "l2")])
+    storage.save_current_aggregate(RunningAggregate("2025-10-08", "", 0.2, 2, 0.1))
+
+    assert [h.headline for h in storage.load_headlines("2025-10-08")] == ["A", "B"]
+    assert storage.load_current_aggregate().count == 2
+
+    # A truncated or corrupt gzip body reads as missing instead of raising
+    gzipped = get_codec(StorageCodec.GZIP).encode(asdict(RunningAggregate(count=3)))
+    for corrupt in (gzipped[:-4], gzipped[:12] + b"\x00" * 8 + gzipped[20:]):
+        with pytest.raises(ValueError):
+            decode(corrupt)
+        storage.current_aggregate_file.write_bytes(corrupt)
+        assert storage.load_current_aggregate() == RunningAggregate()
+
+
+def test_headline_records_round_trip_with_interned_fields():
+    records = [
+        json.loads(json.dumps(_headline(f"H{i}", f"l{i}").to_record()))
+        for i in range(2)
+    ]
+    first, second = headlines_from_records(records)
+
+    assert headlines_to_records([first, second]) == records
+    assert first.topic is second.topic
+    assert first.sentiment_label is second.sentiment_label
+
+
+def test_aggregate_deltas_are_idempotent_and_compact_once(tmp_path: Path):
+    storage = LocalStorage(str(tmp_path))
+    storage.save_current_aggregate(
+        RunningAggregate(date="2025-10-08", sum_sentiment=1.0, count=2)
+    )
+
+    def delta(date: str, total: float) -> RunningAggregate:
+        return RunningAggregate(date=date, sum_sentiment=total, count=1)
+
+    record_aggregate_delta(storage, "run-a", delta("2025-10-08", 0.5))
+    record_aggregate_delta(storage, "run-a", delta("2025-10-08", 0.5))  # retry
+    record_aggregate_delta(storage, "run-b", delta("2025-10-09", -0.2))
+
+    # Readers see outstanding deltas before any compaction
+    current, daily = load_live_aggregates(storage)
+    assert (current.date, current.count) == ("2025-10-09", 1)
+    assert daily["2025-10-08"].count == 3
+
+    # A busy lock skips compaction instead of waiting
+    with storage.compaction_lock() as held:
+        assert held
+        assert not compact_aggregates(storage)
+
+    assert compact_aggregates(storage)
+    assert storage.load_aggregate_deltas() == {}
+    assert storage.load_daily_aggregates()["2025-10-08"].sum_sentiment == 1.5
+    assert storage.load_current_aggregate().sum_sentiment == pytest.approx(-0.2)
+
+    # A retried run after compaction is recognised as already folded
+    record_aggregate_delta(storage, "run-b", delta("2025-10-09", -0.2))
+    assert compact_aggregates(storage)
+    assert storage.load_current_aggregate().count == 1
+    assert storage.load_daily_aggregates()["2025-10-08"].count == 3
+
+
+def test_storage_batch_commits_stages_in_order(tmp_path: Path):
+    import threading
+
+    storage = LocalStorage(str(tmp_path))
+    order: list[str] = []
+    started = threading.Barrier(2, timeout=5)
+
+    def concurrent(name: str) -> None:
+        started.wait()  # both writes of stage 0 run at the same time
+        order.append(name)
+
+    with storage.batch() as batch:
+        batch.write(order.append, "snapshot", stage=2)
+        batch.write(concurrent, "headlines")
+        batch.write(concurrent, "delta")
+        batch.write(order.append, "compact", stage=1)
+        current = batch.read(storage.load_current_aggregate)
+        assert order == []  # writes wait for the commit, reads do not
+        assert current.result() == RunningAggregate()
+
+    assert sorted(order[:2]) == ["delta", "headlines"]
+    assert order[2:] == ["compact", "snapshot"]
+
+    def fail() -> None:
+        raise OSError("write failed")
+
+    with pytest.raises(OSError):
+        with storage.batch() as batch:
+            batch.write(fail)
+            batch.write(order.append, "after failure", stage=1)
+    assert "after failure" not in order
+
+
+def test_embedding_store_appends_and_searches(tmp_path: Path):
+    import numpy as np
+
+    from storage import EmbeddingStore, IVFIndex, headline_ids
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 16))
+    vectors = centers[rng.integers(0, 20, 2000)] + rng.normal(size=(2000, 16)) * 0.1
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = np.arange(2000, dtype=np.uint64)
+
+    store = EmbeddingStore(tmp_path / "embeddings")
+    assert store.append("2025-10-07", ids[:1500], vectors[:1500]) == 1500
+    # Retries and duplicate ids are skipped
+    assert store.append("2025-10-07", ids[1000:1500], vectors[1000:1500]) == 0
+
+    # A torn tail (vectors written, ids not) is ignored, then truncated
+    with open(tmp_path / "embeddings" / "2025-10-08.f16", "ab") as f:
+        f.write(b"\x00" * 16 * 2 * 3)
+    assert len(store.vectors("2025-10-08")) == 0
+    assert store.append("2025-10-08", ids[1500:], vectors[1500:]) == 500
+    assert np.array_equal(store.ids("2025-10-08"), ids[1500:])
+    assert np.allclose(store.vectors("2025-10-08"), vectors[1500:], atol=1e-3)
+
+    query = vectors[1700]
+    exact = store.search(query, k=5)
+    assert (exact[0].date, exact[0].id) == ("2025-10-08", 1700)
+    assert exact[0].score == pytest.approx(1.0, abs=1e-3)
+    assert [m.id for m in store.related("2025-10-08", 1700, k=4)] == [
+        m.id for m in exact[1:]
+    ]
+
+    # The index covers what was stored when it was built; later rows are
+    # scanned exhaustively
+    index = IVFIndex.build(store, nlist=20)
+    assert len(index) == 2000
+    assert index.counts == {"2025-10-07": 1500, "2025-10-08": 500}
+    extra = np.array([2000], np.uint64)
+    store.append("2025-10-08", extra, vectors[1700:1701])
+    approx = store.search(
+        query, k=5, index=IVFIndex.load(tmp_path / "embeddings" / "ivf")
+    )
+    assert {m.id for m in approx} >= {1700, 2000}
+    assert len({m.id for m in approx} & {m.id for m in exact}) >= 4
+
+    assert store.search(query, k=3, dates=["2025-10-07"], index=index)[0].date == (
+        "2025-10-07"
+    )
+    same = headline_ids(
+        [_headline("a", "l1"), _headline("a", "l1"), _headline("b", "l1")]
+    )
+    assert same[0] == same[1] != same[2]